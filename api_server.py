@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""Async HTTP API over the fetch / indicator / news / analysis core.
+
+    python api_server.py --port 8080
+    gunicorn api_server:create_app --worker-class aiohttp.GunicornWebWorker -w 4
+
+Endpoints (all GET unless noted; add ?format=arrow or
+``Accept: application/vnd.apache.arrow.stream`` for Arrow IPC where a table
+is returned, when pyarrow is installed):
+
+    /health
+    /v1/quote/{symbol}                   latest snapshot fields
+    /v1/quotes?symbols=AAPL,MSFT          batch quotes (table)
+    /v1/history/{symbol}?period=1y&timeframe=1W  OHLCV columns (table), daily or resampled 1W / 1M
+    /v1/indicators/{symbol}?series=1      indicator snapshot, optionally full series (table)
+    /v1/news/{symbol}?max=10&days=7       articles plus local sentiment score
+    /v1/analysis/{symbol}                 Gemini recommendation
+    POST /v1/batch                        {"symbols": [...], "fields": ["quote", "indicators", "news", "analysis"]}
+
+Blocking core calls run in a thread pool, so one worker serves many
+concurrent clients. Symbols with no real data (every source failed and only
+generated mock data is left) get a 404 instead of random prices; last-good
+copies are served with ``source`` and ``stale`` set. Snapshots come from the process-wide caches
+(last-good snapshots, history store) and are refreshed at most every
+API_CACHE_TTL seconds per symbol.
+"""
+
+import argparse
+import asyncio
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import numpy as np
+from aiohttp import web
+
+from arrow_io import ARROW_STREAM_MIME, ipc_stream_bytes, pa
+from config import API_CACHE_TTL, API_HOST, API_MAX_BATCH, API_PORT, API_WORKER_THREADS, FETCH_BUDGET
+from gemini_analyzer import GeminiAnalyzer
+from news_collector import NewsCollector
+from resample import TIMEFRAMES, get_resample_cache
+from stock_data import YFINANCE_PERIODS, StockDataFetcher
+
+BATCH_FIELDS = ('quote', 'indicators', 'news', 'analysis')
+QUOTE_FIELDS = (
+    'symbol', 'name', 'current_price', 'previous_close', 'price_change', 'price_change_pct',
+    'volume', 'avg_volume', 'high_52w', 'low_52w', 'market_cap', 'pe_ratio',
+    'source', 'stale', 'fetched_at'
+)
+
+_SYMBOL = re.compile(r'^[A-Z0-9.^=-]{1,15}$')
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def _dumps(data):
+    return json.dumps(data, separators=(',', ':'), default=_json_default)
+
+
+def _error(status, message):
+    return web.json_response({'error': message}, status=status, dumps=_dumps)
+
+
+def _not_found(symbols):
+    return web.HTTPNotFound(
+        text=_dumps({'error': f"No market data for {', '.join(symbols)}"}), content_type='application/json'
+    )
+
+
+def _wants_arrow(request):
+    return request.query.get('format') == 'arrow' or ARROW_STREAM_MIME in request.headers.get('Accept', '')
+
+
+def _column(values, digits=4):
+    """Float column as a JSON list with NaN -> null"""
+    rounded = np.round(np.asarray(values, dtype=np.float64), digits).tolist()
+    return [value if value == value else None for value in rounded]
+
+
+def _frame_columns(frame, digits=4):
+    """Columnar JSON for a date-indexed DataFrame"""
+    columns = {'date': frame.index.strftime('%Y-%m-%d').tolist()}
+    for name in frame.columns:
+        key = name.lower()
+        if frame[name].dtype.kind in 'iu':
+            columns[key] = frame[name].tolist()
+        else:
+            columns[key] = _column(frame[name].to_numpy(), digits)
+    return columns
+
+
+def _table_response(request, columns, envelope=None):
+    """Columnar dict as Arrow IPC (if requested and available) or compact JSON"""
+    if _wants_arrow(request):
+        if pa is None:
+            return _error(406, "Arrow output requires pyarrow")
+        return web.Response(body=ipc_stream_bytes(columns), content_type=ARROW_STREAM_MIME)
+    body = dict(envelope or {})
+    body.update(columns)
+    return web.json_response(body, dumps=_dumps)
+
+
+def _quote(stock):
+    return {field: stock[field] for field in QUOTE_FIELDS}
+
+
+def _indicators(stock):
+    tech = stock['technical_analysis'] or {}
+    return {key: value for key, value in tech.items()}
+
+
+class StockAPI:
+    """Request handlers sharing one fetcher, news collector and analyzer per worker"""
+
+    def __init__(self, fetcher=None, news_collector=None, analyzer=None, max_workers=API_WORKER_THREADS):
+        self.fetcher = fetcher or StockDataFetcher()
+        self.news_collector = news_collector or NewsCollector()
+        self._analyzer = analyzer
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='api')
+
+    @property
+    def analyzer(self):
+        if self._analyzer is None:
+            self._analyzer = GeminiAnalyzer()  # ValueError when no API key is configured
+        return self._analyzer
+
+    async def _run(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(fn, *args, **kwargs))
+
+    async def _stock(self, symbol, period='1y', allow_mock=False):
+        """Snapshot for symbol; raises 404 for generated mock data unless allow_mock"""
+        stock = await self._run(
+            self.fetcher.get_stock_data, symbol, period, budget=FETCH_BUDGET, max_age=API_CACHE_TTL
+        )
+        if stock['source'] == 'mock' and not allow_mock:
+            raise _not_found([symbol])
+        return stock
+
+    async def _news(self, stock, max_results=10, days=None):
+        news = await self._run(
+            self.news_collector.get_stock_specific_news, stock['symbol'], stock['name'],
+            max_results=max_results, days=days
+        )
+        return {
+            'sentiment': round(self.news_collector.score_news(news), 4),
+            # True when no real article was found and placeholder headlines are returned
+            'mock': any(article.get('mock') for article in news),
+            'articles': [
+                {
+                    'title': article['title'],
+                    'source': article['source'],
+                    'date': article['date'],
+                    'link': article['link'],
+                    'summary': article.get('summary', '')
+                }
+                for article in news
+            ]
+        }
+
+    async def _analysis(self, stock):
+        news = await self._run(
+            self.news_collector.get_stock_specific_news, stock['symbol'], stock['name']
+        )
+        analysis = await self._run(self.analyzer.analyze_stock, stock, news)
+        return {key: value for key, value in analysis.items() if key != 'raw_response'}
+
+    # Handlers
+
+    async def health(self, request):
+        return web.json_response({'status': 'ok'})
+
+    async def quote(self, request):
+        stock = await self._stock(request['symbol'])
+        return web.json_response(_quote(stock), dumps=_dumps)
+
+    async def quotes(self, request):
+        symbols = _parse_symbols(request.query.get('symbols', ''))
+        stocks = await asyncio.gather(*(self._stock(symbol, allow_mock=True) for symbol in symbols))
+        missing = [stock['symbol'] for stock in stocks if stock['source'] == 'mock']
+        if missing:
+            raise _not_found(missing)
+        quotes = [_quote(stock) for stock in stocks]
+        columns = {field: [quote[field] for quote in quotes] for field in QUOTE_FIELDS}
+        return _table_response(request, columns)
+
+    async def history(self, request):
+        period = request.query.get('period', '1y')
+        timeframe = request.query.get('timeframe', '1D').upper()
+        if period not in YFINANCE_PERIODS:
+            return _error(400, f"period must be one of {', '.join(YFINANCE_PERIODS)}")
+        if timeframe not in TIMEFRAMES:
+            return _error(400, f"timeframe must be one of {', '.join(TIMEFRAMES)}")
+        stock = await self._stock(request['symbol'], period)
+        history = stock['price_history']
+        if history is None or not len(history):
+            return _error(404, f"No price history for {request['symbol']}")
+        if timeframe != '1D':
+            history = get_resample_cache().get(stock['symbol'], timeframe, history)
+        return _table_response(
+            request, _frame_columns(history), {'symbol': stock['symbol'], 'period': period, 'timeframe': timeframe}
+        )
+
+    async def indicators(self, request):
+        stock = await self._stock(request['symbol'])
+        series = stock['indicator_series']
+        if request.query.get('series') in ('1', 'true') and series is not None:
+            return _table_response(request, _frame_columns(series), {'symbol': stock['symbol']})
+        return web.json_response({'symbol': stock['symbol'], **_indicators(stock)}, dumps=_dumps)
+
+    async def news(self, request):
+        try:
+            max_results = min(int(request.query.get('max', 10)), 100)
+            days = int(request.query['days']) if 'days' in request.query else None
+        except ValueError:
+            return _error(400, "max and days must be integers")
+        stock = await self._stock(request['symbol'])
+        news = await self._news(stock, max_results, days)
+        return web.json_response({'symbol': stock['symbol'], **news}, dumps=_dumps)
+
+    async def analysis(self, request):
+        stock = await self._stock(request['symbol'])
+        try:
+            analysis = await self._analysis(stock)
+        except ValueError as e:
+            return _error(503, str(e))
+        return web.json_response({'symbol': stock['symbol'], **analysis}, dumps=_dumps)
+
+    async def batch(self, request):
+        try:
+            payload = await request.json()
+            symbols = _parse_symbols(payload.get('symbols', []))
+        except (ValueError, AttributeError) as e:
+            return _error(400, f"Invalid batch request: {e}")
+        fields = payload.get('fields') or ['quote', 'indicators']
+        unknown = set(fields) - set(BATCH_FIELDS)
+        if unknown:
+            return _error(400, f"Unknown fields: {', '.join(sorted(unknown))}")
+
+        async def one(symbol):
+            stock = await self._stock(symbol, allow_mock=True)
+            if stock['source'] == 'mock':
+                return {'symbol': symbol, 'error': f"No market data for {symbol}"}
+            result = {'symbol': symbol}
+            if 'quote' in fields:
+                result['quote'] = _quote(stock)
+            if 'indicators' in fields:
+                result['indicators'] = _indicators(stock)
+            if 'news' in fields:
+                result['news'] = await self._news(stock)
+            if 'analysis' in fields:
+                try:
+                    result['analysis'] = await self._analysis(stock)
+                except ValueError as e:
+                    result['analysis'] = {'error': str(e)}
+            return result
+
+        results = await asyncio.gather(*(one(symbol) for symbol in symbols))
+        return web.json_response({'results': results}, dumps=_dumps)
+
+    def make_app(self):
+        app = web.Application(middlewares=[_symbol_middleware])
+        app.add_routes([
+            web.get('/health', self.health),
+            web.get('/v1/quote/{symbol}', self.quote),
+            web.get('/v1/quotes', self.quotes),
+            web.get('/v1/history/{symbol}', self.history),
+            web.get('/v1/indicators/{symbol}', self.indicators),
+            web.get('/v1/news/{symbol}', self.news),
+            web.get('/v1/analysis/{symbol}', self.analysis),
+            web.post('/v1/batch', self.batch)
+        ])
+        app.on_cleanup.append(self._shutdown)
+        return app
+
+    async def _shutdown(self, app):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _parse_symbols(raw):
+    symbols = raw.split(',') if isinstance(raw, str) else list(raw)
+    symbols = list(dict.fromkeys(symbol.strip().upper() for symbol in symbols if symbol.strip()))
+    if not symbols:
+        raise web.HTTPBadRequest(text=_dumps({'error': "No symbols given"}), content_type='application/json')
+    if len(symbols) > API_MAX_BATCH:
+        raise web.HTTPBadRequest(
+            text=_dumps({'error': f"At most {API_MAX_BATCH} symbols per request"}), content_type='application/json'
+        )
+    invalid = [symbol for symbol in symbols if not _SYMBOL.match(symbol)]
+    if invalid:
+        raise web.HTTPBadRequest(
+            text=_dumps({'error': f"Invalid symbols: {', '.join(invalid)}"}), content_type='application/json'
+        )
+    return symbols
+
+
+@web.middleware
+async def _symbol_middleware(request, handler):
+    """Validate and normalize the {symbol} path segment"""
+    symbol = request.match_info.get('symbol')
+    if symbol is not None:
+        symbol = symbol.upper()
+        if not _SYMBOL.match(symbol):
+            return _error(400, f"Invalid symbol: {symbol}")
+        request['symbol'] = symbol
+    return await handler(request)
+
+
+async def create_app():
+    """Application factory (also usable with gunicorn's aiohttp worker)"""
+    return StockAPI().make_app()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stock analysis HTTP API")
+    parser.add_argument('--host', default=API_HOST)
+    parser.add_argument('--port', type=int, default=API_PORT)
+    args = parser.parse_args()
+    web.run_app(create_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,11 +5,27 @@ import pandas as pd
 from datetime import datetime
 import time
 import os
+import uuid
 
 from stock_data import StockDataFetcher
 from news_collector import NewsCollector
 from gemini_analyzer import GeminiAnalyzer
-from config import DEFAULT_TECH_STOCKS, GEMINI_API_KEY, NANCY_PELOSI_TRADES
+from config import (
+    DEFAULT_TECH_STOCKS, GEMINI_API_KEY, NANCY_PELOSI_TRADES, QUOTE_POLL_INTERVAL,
+    SESSION_CACHE_TTL, NEWS_INGEST_INTERVAL, RISK_BENCHMARKS, RISK_CONFIDENCE
+)
+from sentiment import sentiment_label
+from screener import SCREENER_COLUMNS
+from backtest import load_closes, run_backtest
+from param_sweep import PARAMETER_GRIDS, ParameterSweep
+from quote_stream import get_quote_stream
+from portfolio import CorrelationEngine, average_correlation
+from risk import BENCHMARK_NAMES, get_risk_metrics
+from recommendation_store import get_recommendation_store, inputs_hash
+from resample import TIMEFRAME_NAMES, get_resample_cache
+
+# Sidebar news range -> days of news shown
+NEWS_RANGE_DAYS = {"Last 3 days": 3, "Last 7 days": 7, "Last 30 days": 30}
 
 # Page configuration
 st.set_page_config(
@@ -197,6 +213,22 @@ class StockRecommendationApp:
                 return None
         return self.gemini_analyzer
         
+    def _session_cached(self, key, loader, ttl=SESSION_CACHE_TTL):
+        """Value cached in session state, reloaded when older than ttl seconds.
+
+        Empty results and stale stock data aren't cached, so the next rerun
+        picks up the background refresh.
+        """
+        cached = st.session_state.get(key)
+        if cached is None or time.time() - cached[0] > ttl:
+            value = loader()
+            items = value if isinstance(value, list) else [value]
+            if not value or any(getattr(item, 'stale', False) for item in items):
+                return value
+            cached = (time.time(), value)
+            st.session_state[key] = cached
+        return cached[1]
+    
     def run(self):
         # Setup API key
         api_key = setup_api_key()
@@ -232,15 +264,24 @@ class StockRecommendationApp:
         st.sidebar.markdown("## ⚙️ Settings")
         
         # Analysis depth selection
-        analysis_depth = st.sidebar.selectbox(
+        st.sidebar.selectbox(
             "Analysis depth:",
-            ["Quick Analysis", "Detailed Analysis", "Deep Analysis"]
+            ["Quick Analysis", "Detailed Analysis", "Deep Analysis"],
+            key="analysis_depth"
         )
         
         # News time range
-        news_range = st.sidebar.selectbox(
+        st.sidebar.selectbox(
             "News time range:",
-            ["Last 3 days", "Last 7 days", "Last 30 days"]
+            list(NEWS_RANGE_DAYS),
+            key="news_range"
+        )
+        
+        # Live quotes refresh the dashboard cards without rerunning the app
+        st.sidebar.toggle(
+            "⚡ Live quotes",
+            key="live_quotes",
+            help=f"Poll latest prices every {QUOTE_POLL_INTERVAL:g}s and update the cards in place"
         )
         
         st.sidebar.markdown("---")
@@ -254,9 +295,11 @@ class StockRecommendationApp:
         """Main dashboard"""
         st.markdown("## 🚀 Tech Stocks Investment Overview")
         
-        # Get all stock data
+        # Get all stock data (reruns reuse the session copy instead of refetching)
         with st.spinner("Fetching stock data..."):
-            stocks_data = self.stock_fetcher.get_multiple_stocks_data(DEFAULT_TECH_STOCKS[:6])
+            stocks_data = self._session_cached(
+                'dashboard_stocks', lambda: self.stock_fetcher.get_multiple_stocks_data(DEFAULT_TECH_STOCKS[:6])
+            )
             
             # If unable to get real data, show warning
             if not stocks_data:
@@ -264,22 +307,85 @@ class StockRecommendationApp:
                 return
         
         if stocks_data:
-            # Create stock card grid
-            cols = st.columns(3)
-            for i, stock in enumerate(stocks_data):
-                with cols[i % 3]:
-                    self.display_stock_card(stock)
+            # Local news sentiment for all cards in one batch from the article store (no LLM calls)
+            sentiments = self._session_cached(
+                'dashboard_sentiment',
+                lambda: self.news_collector.get_sentiment_by_symbol(
+                    {stock['symbol']: stock['name'] for stock in stocks_data}
+                ),
+                ttl=NEWS_INGEST_INTERVAL
+            )
+            
+            # Risk metrics against the market indices, recomputed only when a new bar arrives
+            self._load_benchmarks()
+            risk = get_risk_metrics([stock['symbol'] for stock in stocks_data], self.stock_fetcher.history_store)
+            
+            # Latest stored AI recommendation per card, from the local history (no LLM calls)
+            store = get_recommendation_store()
+            recommendations = store.latest_by_symbol([stock['symbol'] for stock in stocks_data]) if store else {}
+            
+            # The shared stream polls only what open live sessions watch and stops when none do
+            stream = get_quote_stream(self.stock_fetcher.get_quotes)
+            session = st.session_state.setdefault('quote_session', uuid.uuid4().hex)
+            if st.session_state.get('live_quotes'):
+                stream.watch({stock['symbol']: stock for stock in stocks_data}, session=session)
+                stream.start()
+            else:
+                stream.release(session)
+                stream = None
+            
+            # Cards are their own fragment: in live mode only they rerun on each tick
+            @st.fragment(run_every=QUOTE_POLL_INTERVAL if stream else None)
+            def stock_cards():
+                quotes = stream.snapshot(session) if stream else None
+                self.display_stock_grid(stocks_data, sentiments, quotes, risk, recommendations)
+            
+            stock_cards()
+        
+        st.markdown("---")
+        
+        # Stock screener over every symbol fetched so far
+        self.display_screener()
+        
+        st.markdown("---")
+        
+        # Historical check of the technical signals
+        self.display_backtest([stock['symbol'] for stock in stocks_data])
+        
+        st.markdown("---")
+        
+        # Cross-asset view of the watchlist
+        self.display_correlation([stock['symbol'] for stock in stocks_data])
         
         st.markdown("---")
         
         # Market sentiment analysis
+        self.display_market_sentiment()
+    
+    @st.fragment
+    def display_market_sentiment(self):
+        """Market sentiment panel; its button reruns only this panel"""
         st.markdown("## 🧠 Market Sentiment Analysis")
         if st.button("Analyze Market Sentiment"):
             with st.spinner("Analyzing market sentiment..."):
-                tech_news = self.news_collector.get_tech_market_news(use_mock=True)  # Use mock data
+                # The day's stored articles feed the rolling summary; only new ones reach the LLM
+                tech_news = self.news_collector.get_todays_news()
+                scope = 'tech_market'
+                if tech_news:
+                    st.caption(f"{len(tech_news)} articles stored today")
+                else:
+                    # Nothing stored today: summarize the latest headlines under their own scope
+                    tech_news = self.news_collector.get_tech_market_news()
+                    scope = 'tech_market_headlines'
+                    st.caption("No articles stored today; using the latest headlines")
+                
+                # Local lexicon score, the LLM only writes the narrative
+                news_score = self.news_collector.score_news(tech_news)
+                st.metric("News Sentiment Score", f"{news_score:+.2f}", sentiment_label(news_score), delta_color="off")
+                
                 analyzer = self.get_analyzer()
                 if analyzer:
-                    sentiment = analyzer.get_market_sentiment(tech_news)
+                    sentiment = analyzer.get_market_sentiment(tech_news, store=self.news_collector.store, scope=scope)
                     st.markdown(sentiment)
                 else:
                     # Show mock market sentiment analysis
@@ -311,12 +417,14 @@ class StockRecommendationApp:
         
         # Get stock data
         with st.spinner(f"Fetching {symbol} data..."):
-            stock_data = self.stock_fetcher.get_stock_data(symbol)
+            stock_data = self._session_cached(f'stock_{symbol}', lambda: self.stock_fetcher.get_stock_data(symbol))
         
         if not stock_data:
             st.error(f"Unable to fetch {symbol} data")
             return
         
+        self.display_data_status(stock_data)
+        
         # Display basic information
         col1, col2, col3, col4 = st.columns(4)
         
@@ -334,10 +442,12 @@ class StockRecommendationApp:
             st.metric("52-Week Low", f"${stock_data['low_52w']}")
         
         with col4:
-            st.metric("Market Cap", stock_data['market_cap'])
+            st.metric("Market Cap", stock_data.market_cap_display)
+        
+        self.display_risk_profile(symbol)
         
         # Price chart
-        self.display_price_chart(stock_data)
+        self.display_chart_panel(stock_data)
         
         # Technical indicators
         col1, col2 = st.columns(2)
@@ -354,6 +464,12 @@ class StockRecommendationApp:
                 ["MACD", f"{tech_analysis['macd']}"],
                 ["Bollinger Upper", f"${tech_analysis['bollinger_upper']}"],
                 ["Bollinger Lower", f"${tech_analysis['bollinger_lower']}"]
+            ] + [
+                # Range/volume indicators from the registry, when the history has OHLCV columns
+                [label, f"{tech_analysis[key]:,}"] for key, label in (
+                    ('atr_14', "ATR (14)"), ('stoch_k', "Stochastic %K"), ('stoch_d', "Stochastic %D"),
+                    ('adx_14', "ADX (14)"), ('vwap_20', "VWAP (20-Day)"), ('obv', "OBV")
+                ) if key in tech_analysis
             ], columns=["Indicator", "Value"])
             
             st.dataframe(metrics_df, use_container_width=True)
@@ -364,56 +480,151 @@ class StockRecommendationApp:
                     st.markdown(f"- {signal}")
         
         with col2:
-            st.markdown("### 📰 Related News")
-            with st.spinner("Fetching related news..."):
-                news_data = self.news_collector.get_stock_specific_news(
-                    symbol, stock_data['name'], use_mock=True  # Use mock data to avoid network issues
-                )
-            
-            if news_data:
-                for i, news in enumerate(news_data[:5]):
-                    st.markdown(f"""
-                    **{i+1}. {news['title']}**
-                    
-                    *Source: {news['source']} | {news['date'].strftime('%Y-%m-%d')}*
-                    
-                    {news.get('summary', '')[:100]}...
-                    
-                    [Read More]({news['link']})
-                    
-                    ---
-                    """)
-            else:
-                st.markdown("No related news available")
+            self.display_related_news(symbol, stock_data['name'])
         
         # AI analysis
         st.markdown("---")
+        self.display_ai_analysis(stock_data)
+    
+    def _load_benchmarks(self):
+        """Make sure the benchmark index histories used for beta are in the history store"""
+        return self._session_cached(
+            'risk_benchmarks', lambda: self.stock_fetcher.get_multiple_stocks_data(RISK_BENCHMARKS)
+        )
+    
+    def display_risk_profile(self, symbol):
+        """Volatility, beta, VaR and drawdown of one stock"""
+        self._load_benchmarks()
+        risk = get_risk_metrics([symbol], self.stock_fetcher.history_store).loc[symbol]
+        if risk.isna().all():
+            return
+        
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Volatility (20d, ann.)", f"{risk['volatility']:.1%}",
+                      help=f"Full history: {risk['volatility_annual']:.1%}")
+        with col2:
+            st.metric("Beta vs S&P 500", f"{risk.get('beta_^GSPC', float('nan')):.2f}",
+                      help=", ".join(f"{name}: {risk.get(f'beta_{index}', float('nan')):.2f}"
+                                     for index, name in BENCHMARK_NAMES.items()))
+        with col3:
+            st.metric(f"1-Day VaR {RISK_CONFIDENCE:.0%}", f"{risk['var_hist']:.2%}",
+                      help=f"Parametric: {risk['var_param']:.2%}, CVaR: {risk['cvar_hist']:.2%} / {risk['cvar_param']:.2%}")
+        with col4:
+            st.metric("Max Drawdown", f"{risk['max_drawdown']:.1%}",
+                      help=f"Current drawdown: {risk['current_drawdown']:.1%}")
+    
+    def _get_related_news(self, symbol, name):
+        """Related news for the selected news time range, cached per session"""
+        days = NEWS_RANGE_DAYS[st.session_state.get('news_range', 'Last 7 days')]
+        return self._session_cached(
+            f'news_{symbol}_{days}',
+            lambda: self.news_collector.get_stock_specific_news(
+                symbol, name, use_mock=True, days=days  # Use mock data to avoid network issues
+            ),
+            ttl=NEWS_INGEST_INTERVAL
+        )
+    
+    @st.fragment(run_every=NEWS_INGEST_INTERVAL)
+    def display_related_news(self, symbol, name):
+        """Related news column, refreshed on the news ingest interval"""
+        st.markdown("### 📰 Related News")
+        with st.spinner("Fetching related news..."):
+            news_data = self._get_related_news(symbol, name)
+        
+        if news_data:
+            for i, news in enumerate(news_data[:5]):
+                st.markdown(f"""
+                **{i+1}. {news['title']}**
+                
+                *Source: {news['source']} | {news['date'].strftime('%Y-%m-%d')}*
+                
+                {news.get('summary', '')[:100]}...
+                
+                [Read More]({news['link']})
+                
+                ---
+                """)
+        else:
+            st.markdown("No related news available")
+    
+    @st.fragment
+    def display_ai_analysis(self, stock_data):
+        """AI recommendation panel; its button reruns only this panel"""
         st.markdown("## 🤖 AI Recommendation Analysis")
         
+        symbol = stock_data['symbol']
+        store = get_recommendation_store()
+        
         if not check_api_key():
             st.error("Please set Gemini API key in the sidebar to enable AI analysis")
-            return
-        
-        if st.button("Start AI Analysis", type="primary"):
+        elif st.button("Start AI Analysis", type="primary"):
             with st.spinner("AI is analyzing stock data..."):
-                # Get news data (if not already)
-                if 'news_data' not in locals():
-                    news_data = self.news_collector.get_stock_specific_news(
-                        symbol, stock_data['name'], use_mock=True  # Use mock data
-                    )
-                
-                # Perform AI analysis
+                news_data = self._get_related_news(symbol, stock_data['name'])
+                self._load_benchmarks()
+                inputs = inputs_hash(stock_data, news_data)
                 analyzer = self.get_analyzer()
-                if analyzer:
-                    analysis_result = analyzer.analyze_stock(stock_data, news_data)
+                
+                # Identical inputs were already analyzed by this model: reuse that result instead of calling the LLM
+                previous = store.find(inputs, analyzer.model_name) if store and analyzer else None
+                if previous:
+                    st.caption(f"Inputs unchanged since the analysis of {previous['created_at']:%Y-%m-%d %H:%M}, showing it")
+                    self.display_analysis_result(previous, stock_data)
+                else:
+                    # Perform AI analysis
+                    if analyzer:
+                        analysis_result = analyzer.analyze_stock(stock_data, news_data)
+                        if analysis_result.get('default'):
+                            st.warning("⚠️ AI analysis failed, showing a generic placeholder (not saved); try again later")
+                        elif store:
+                            store.save(symbol, analysis_result, stock_data['current_price'], inputs, analyzer.model_name)
+                    else:
+                        # Use demo mode (demo results are never stored or reused)
+                        st.info("🔧 Demo mode: Showing mock AI analysis results")
+                        analysis_result = self.get_demo_analysis(stock_data)
                     
                     # Display analysis results
                     self.display_analysis_result(analysis_result, stock_data)
-                else:
-                    # Use demo mode
-                    st.info("🔧 Demo mode: Showing mock AI analysis results")
-                    analysis_result = self.get_demo_analysis(stock_data)
-                    self.display_analysis_result(analysis_result, stock_data)
+                self.display_recommendation_history(symbol)
+                return
+        
+        # Without a new run, show the most recent stored recommendation
+        latest = store.latest(symbol) if store else None
+        if latest:
+            st.caption(f"Last analysis: {latest['created_at']:%Y-%m-%d %H:%M} ({latest['model']})")
+            self.display_analysis_result(latest, stock_data)
+        self.display_recommendation_history(symbol)
+    
+    def display_recommendation_history(self, symbol):
+        """Chart of stored recommendations (target price and action over time) against the price"""
+        store = get_recommendation_store()
+        if store is None or store.count(symbol) < 2:
+            return
+        
+        with st.expander("📜 Recommendation History"):
+            ranges = {"Last 30 days": 30, "Last 90 days": 90, "Last year": 365, "All": None}
+            label = st.radio("Range:", list(ranges), horizontal=True, key=f"recommendation_range_{symbol}")
+            days = ranges[label]
+            history = store.history(symbol, since=time.time() - days * 86400 if days else None)
+            if history.empty:
+                st.info("No recommendations in this range")
+                return
+            
+            fig = go.Figure()
+            fig.add_trace(go.Scatter(
+                x=history['created_at'], y=history['price'], name='Price at analysis', line=dict(color='gray')
+            ))
+            colors = {'Buy': 'green', 'Sell': 'red'}
+            for action, group in history.groupby('action'):
+                fig.add_trace(go.Scatter(
+                    x=group['created_at'], y=group['target_price'], mode='markers', name=f'{action} target',
+                    marker=dict(color=colors.get(action, 'orange'), size=10)
+                ))
+            fig.update_layout(height=350, yaxis_title='Price ($)')
+            st.plotly_chart(fig, use_container_width=True)
+            
+            table = history[['created_at', 'action', 'target_text', 'risk_level', 'price', 'model']]
+            st.dataframe(table.rename(columns={'target_text': 'target'}), use_container_width=True)
     
     def get_demo_analysis(self, stock_data):
         """Get demo mode AI analysis results"""
@@ -528,24 +739,246 @@ Based on the analysis of {symbol}, we provide the following investment recommend
             """
         })
     
-    def display_stock_card(self, stock):
+    @st.fragment
+    def display_screener(self):
+        """Screen the precomputed indicator table with a predicate expression"""
+        st.markdown("## 🔎 Stock Screener")
+        
+        col1, col2, col3 = st.columns([3, 1, 1])
+        with col1:
+            expression = st.text_input(
+                "Screen expression:",
+                value="rsi < 70 and close > sma_50",
+                help="Columns: " + ", ".join(SCREENER_COLUMNS) + ". Combine with and/or/not, e.g. rsi < 30 and close > sma_200"
+            )
+        with col2:
+            sort_by = st.selectbox("Sort by:", list(SCREENER_COLUMNS), index=list(SCREENER_COLUMNS).index('rsi'))
+        with col3:
+            top_k = st.number_input("Top:", min_value=1, max_value=500, value=20)
+        
+        ascending = st.checkbox("Ascending", value=True)
+        
+        try:
+            results = self.stock_fetcher.indicator_table.screen(
+                expression, sort_by=sort_by, ascending=ascending, top_k=int(top_k)
+            )
+        except ValueError as e:
+            st.error(f"Invalid screen expression: {e}")
+            return
+        
+        if results.empty:
+            st.info("No stocks match the screen")
+        else:
+            st.dataframe(results.round(2), use_container_width=True)
+    
+    @st.fragment
+    def display_backtest(self, symbols):
+        """Backtest the technical signal rules over the cached price histories"""
+        st.markdown("## 🧪 Signal Backtest")
+        
+        strategies = {
+            "Price above 20-day MA": ('sma', {'window': 20}),
+            "Price above 50-day MA": ('sma', {'window': 50}),
+            "20/50-day MA cross": ('sma_cross', {}),
+            "RSI oversold/overbought": ('rsi', {}),
+            "Bollinger band reversion": ('bollinger', {'mode': 'reversion'}),
+            "Bollinger band breakout": ('bollinger', {'mode': 'breakout'})
+        }
+        
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            choice = st.selectbox("Signal rule:", list(strategies))
+        with col2:
+            cost_bps = st.number_input("Cost (bps):", min_value=0.0, max_value=100.0, value=5.0)
+        
+        closes = load_closes(symbols, self.stock_fetcher.history_store)
+        if closes.empty:
+            st.info("No price history available for backtesting")
+            return
+        
+        strategy, params = strategies[choice]
+        result = run_backtest(closes, strategy, cost_bps=cost_bps, **params)
+        
+        metrics = result.metrics.copy()
+        for column in ('total_return', 'cagr', 'volatility', 'max_drawdown', 'hit_rate', 'exposure'):
+            metrics[column] = (metrics[column] * 100).round(1)
+        metrics = metrics.round(2).rename(columns={
+            'total_return': 'Total Return %', 'cagr': 'CAGR %', 'volatility': 'Volatility %',
+            'sharpe': 'Sharpe', 'max_drawdown': 'Max Drawdown %', 'hit_rate': 'Hit Rate %',
+            'exposure': 'Exposure %', 'trades': 'Trades', 'turnover': 'Turnover / Year'
+        })
+        st.dataframe(metrics, use_container_width=True)
+        st.line_chart(result.equity)
+        
+        if st.button(f"Sweep {strategy} parameters"):
+            grid = dict(PARAMETER_GRIDS[strategy])
+            if 'mode' in params:
+                grid['mode'] = [params['mode']]
+            table = st.empty()
+            rows = []
+            with st.spinner("Running parameter sweep..."):
+                with ParameterSweep(closes, cost_bps=cost_bps) as runner:
+                    # Rows stream in as workers finish; the table is re-sorted on every update
+                    for row in runner.run(strategy, grid):
+                        rows.append(row)
+                        table.dataframe(
+                            pd.DataFrame(rows).sort_values('mean_sharpe', ascending=False).round(4),
+                            use_container_width=True
+                        )
+    
+    @st.fragment
+    def display_correlation(self, symbols):
+        """Correlation/covariance heatmap of daily returns, updated incrementally per new bar"""
+        st.markdown("## 🔗 Watchlist Correlation")
+        
+        windows = {"Full history": None, "Last 60 days": 60, "Last 20 days": 20}
+        col1, col2 = st.columns(2)
+        with col1:
+            window_label = st.radio("Window:", list(windows), horizontal=True)
+        with col2:
+            matrix_type = st.radio("Matrix:", ["Correlation", "Covariance (annualized)"], horizontal=True)
+        
+        closes = load_closes(symbols, self.stock_fetcher.history_store)
+        if closes.shape[1] < 2:
+            st.info("Need price history for at least two stocks")
+            return
+        
+        # Engines live in the session and only absorb bars added since the last run
+        window = windows[window_label]
+        key = f"correlation_{'_'.join(closes.columns)}_{window}"
+        engine = st.session_state.get(key)
+        if engine is None:
+            engine = CorrelationEngine(closes.columns, window=window)
+            st.session_state[key] = engine
+        engine.sync(closes)
+        
+        if matrix_type == "Correlation":
+            matrix = engine.correlation()
+            zmin, zmax, colorscale = -1, 1, 'RdBu_r'
+            st.metric("Average pairwise correlation", f"{average_correlation(matrix):.2f}")
+        else:
+            matrix = engine.covariance()
+            zmin = zmax = None
+            colorscale = 'Viridis'
+        
+        fig = go.Figure(go.Heatmap(
+            z=matrix.values,
+            x=list(matrix.columns),
+            y=list(matrix.index),
+            zmin=zmin,
+            zmax=zmax,
+            colorscale=colorscale,
+            text=matrix.round(2).values,
+            texttemplate="%{text}",
+            hovertemplate="%{y} / %{x}: %{z:.3f}<extra></extra>"
+        ))
+        fig.update_layout(height=450, yaxis_autorange='reversed')
+        st.plotly_chart(fig, use_container_width=True)
+    
+    def display_data_status(self, stock_data):
+        """Warn when showing cached or generated data"""
+        if stock_data.get('stale'):
+            fetched = stock_data.get('fetched_at')
+            when = datetime.fromtimestamp(fetched).strftime('%H:%M:%S') if fetched else 'an earlier fetch'
+            st.warning(f"⏳ Showing cached data from {when} while fresh data loads in the background")
+        elif stock_data.get('source') == 'mock':
+            st.warning("⚠️ Live data sources are unavailable, showing simulated demo data")
+    
+    def display_stock_grid(self, stocks_data, sentiments, quotes=None, risk=None, recommendations=None):
+        """Stock cards in a three-column grid, with live quotes, risk metrics and stored recommendations when given"""
+        quotes = quotes or {}
+        recommendations = recommendations or {}
+        cols = st.columns(3)
+        for i, stock in enumerate(stocks_data):
+            symbol = stock['symbol']
+            stock_risk = risk.loc[symbol] if risk is not None and symbol in risk.index else None
+            with cols[i % 3]:
+                self.display_stock_card(
+                    stock, sentiments.get(symbol), quotes.get(symbol), stock_risk, recommendations.get(symbol)
+                )
+    
+    def display_stock_card(self, stock, sentiment=None, quote=None, risk=None, recommendation=None):
         """Display stock card"""
-        change_class = "positive" if stock['price_change_pct'] >= 0 else "negative"
-        if stock['price_change_pct'] == 0:
+        if quote and quote.get('source') == 'seed':
+            quote = None  # no tick received yet: show the snapshot as usual
+        price = quote['price'] if quote else stock['current_price']
+        change_pct = quote['change_pct'] if quote else stock['price_change_pct']
+        live_html = ""
+        if quote:
+            updated = datetime.fromtimestamp(quote['updated_at']).strftime('%H:%M:%S')
+            label = "🔧 Demo tick" if quote.get('source') == 'mock' else "⚡ Live"
+            live_html = f'<div class="stock-metric">{label} | Volume: {quote["volume"]:,} | {updated}</div>'
+        elif stock.get('stale'):
+            live_html = '<div class="stock-metric">⏳ Cached, refreshing…</div>'
+        elif stock.get('source') == 'mock':
+            live_html = '<div class="stock-metric">🔧 Demo data</div>'
+        
+        sentiment_html = ""
+        if sentiment is not None:
+            score, articles, is_mock = sentiment
+            label = sentiment_label(score)
+            icon = {'Bullish': '🟢', 'Bearish': '🔴'}.get(label, '🟡')
+            detail = "demo headlines" if is_mock else f"{articles} articles"
+            sentiment_html = f'<div class="stock-metric">News Sentiment: {icon} {label} ({score:+.2f}, {detail})</div>'
+        
+        risk_html = ""
+        if risk is not None and not pd.isna(risk['volatility_annual']):
+            beta = risk.get('beta_^GSPC')
+            beta_text = f" | β {beta:.2f}" if beta is not None and not pd.isna(beta) else ""
+            risk_html = (
+                f'<div class="stock-metric">Vol: {risk["volatility_annual"]:.0%}{beta_text} | '
+                f'VaR {RISK_CONFIDENCE:.0%}: {risk["var_hist"]:.1%} | Max DD: {risk["max_drawdown"]:.0%}</div>'
+            )
+        
+        recommendation_html = ""
+        if recommendation:
+            icon = {'Buy': '🟢', 'Sell': '🔴'}.get(recommendation['action'], '🟡')
+            recommendation_html = (
+                f'<div class="stock-metric">AI: {icon} {recommendation["action"]} | '
+                f'Target {recommendation["target_price"]} | {recommendation["created_at"]:%m-%d}</div>'
+            )
+        
+        change_class = "positive" if change_pct >= 0 else "negative"
+        if change_pct == 0:
             change_class = "neutral"
         
         st.markdown(f"""
         <div class="stock-overview">
             <div class="stock-name">{stock['symbol']} - {stock['name']}</div>
-            <div class="stock-price">${stock['current_price']}</div>
-            <div class="stock-change {change_class}">{stock['price_change_pct']:+.2f}%</div>
-            <div class="stock-metric">Market Cap: {stock['market_cap']}</div>
+            <div class="stock-price">${price}</div>
+            <div class="stock-change {change_class}">{change_pct:+.2f}%</div>
+            <div class="stock-metric">Market Cap: {stock.market_cap_display}</div>
+            {live_html}
+            {sentiment_html}
+            {risk_html}
+            {recommendation_html}
         </div>
         """, unsafe_allow_html=True)
     
-    def display_price_chart(self, stock_data):
-        """Display price chart"""
-        hist = stock_data['price_history']
+    @st.fragment
+    def display_chart_panel(self, stock_data):
+        """Price chart with a timeframe selector; weekly/monthly bars come from the cached daily history"""
+        timeframe = st.radio(
+            "Timeframe:", list(TIMEFRAME_NAMES), format_func=TIMEFRAME_NAMES.get, horizontal=True,
+            key=f"chart_timeframe_{stock_data['symbol']}"
+        )
+        if timeframe == '1D':
+            self.display_price_chart(stock_data)
+            return
+        
+        hist = get_resample_cache().get(stock_data['symbol'], timeframe, stock_data['price_history'])
+        if hist is None or not len(hist):
+            st.info("No price history to resample")
+            return
+        _, indicator_series = self.stock_fetcher._calculate_technical_indicators(hist, return_series=True)
+        self.display_price_chart(stock_data, hist, indicator_series, timeframe)
+    
+    def display_price_chart(self, stock_data, hist=None, indicator_series=None, timeframe='1D'):
+        """Display price chart (daily bars unless resampled bars and their indicators are given)"""
+        if hist is None:
+            hist = stock_data['price_history']
+            indicator_series = stock_data.get('indicator_series')
+        unit = {'1D': 'Day', '1W': 'Week', '1M': 'Month'}[timeframe]
         
         fig = make_subplots(
             rows=2, cols=1,
@@ -567,29 +1000,22 @@ Based on the analysis of {symbol}, we provide the following investment recommend
             row=1, col=1
         )
         
-        # Add moving averages
-        sma_20 = hist['Close'].rolling(window=20).mean()
-        sma_50 = hist['Close'].rolling(window=50).mean()
+        # Add moving averages (reuse the series computed by the indicator engine)
+        if indicator_series is None:
+            _, indicator_series = self.stock_fetcher._calculate_technical_indicators(hist, return_series=True)
         
-        fig.add_trace(
-            go.Scatter(
-                x=hist.index,
-                y=sma_20,
-                name='20-Day MA',
-                line=dict(color='orange')
-            ),
-            row=1, col=1
-        )
-        
-        fig.add_trace(
-            go.Scatter(
-                x=hist.index,
-                y=sma_50,
-                name='50-Day MA',
-                line=dict(color='purple')
-            ),
-            row=1, col=1
-        )
+        # Indicator calculation failed: show price and volume without the moving averages
+        if indicator_series is not None:
+            for window, color in ((20, 'orange'), (50, 'purple')):
+                fig.add_trace(
+                    go.Scatter(
+                        x=hist.index,
+                        y=indicator_series[f'sma_{window}'],
+                        name=f'{window}-{unit} MA',
+                        line=dict(color=color)
+                    ),
+                    row=1, col=1
+                )
         
         # Volume
         fig.add_trace(
@@ -603,7 +1029,7 @@ Based on the analysis of {symbol}, we provide the following investment recommend
         )
         
         fig.update_layout(
-            title=f"{stock_data['symbol']} Price Chart",
+            title=f"{stock_data['symbol']} {TIMEFRAME_NAMES[timeframe]} Price Chart",
             xaxis_rangeslider_visible=False,
             height=600
         )
@@ -685,7 +1111,8 @@ Based on the analysis of {symbol}, we provide the following investment recommend
         
         for index in indices:
             try:
-                data = self.stock_fetcher.get_stock_data(index, period='5d')
+                # Full year rather than 5 days: the stored history also feeds beta
+                data = self.stock_fetcher.get_stock_data(index, period='1y')
                 if data:
                     st.metric(
                         f"{index} Index",
@@ -0,0 +1,170 @@
+"""Arrow IPC files for price histories and indicator tables.
+
+Frames are written in the Arrow IPC file format, uncompressed, with the
+date index as a ``Date`` timestamp column. Readers memory-map the file and
+wrap the column buffers in NumPy arrays without copying, so opening a
+history is independent of its size and every process reading the same file
+shares the same page-cache pages. Writes go to a temporary file that is
+renamed over the old one, so a reader never sees a half-written file and
+existing mappings keep the previous version.
+
+pyarrow is optional: without it ``get_arrow_store()`` returns None and
+callers keep their in-memory paths.
+"""
+import os
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+from config import ARROW_CACHE_DIR
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+ARROW_STREAM_MIME = 'application/vnd.apache.arrow.stream'
+INDEX_COLUMN = 'Date'
+
+# File name parts must not be able to leave the cache directory
+_PERIOD = re.compile(r'^[0-9a-z]+$')
+_SYMBOL = re.compile(r'^[A-Za-z0-9.^=-]+$')
+
+
+def frame_to_table(frame):
+    """Date-indexed DataFrame -> pyarrow Table (index first, as a Date column)"""
+    index = pd.DatetimeIndex(frame.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    arrays = [pa.array(index.values.astype('datetime64[ns]'))]
+    arrays += [pa.array(np.ascontiguousarray(frame[name].to_numpy())) for name in frame.columns]
+    return pa.Table.from_arrays(arrays, names=[INDEX_COLUMN] + [str(name) for name in frame.columns])
+
+
+def table_to_frame(table):
+    """pyarrow Table -> Date-indexed DataFrame over the table's buffers.
+
+    Columns without nulls (NaN is a value, not a null) are zero-copy,
+    read-only NumPy views; anything else is converted with a copy.
+    """
+    columns = {}
+    for name, column in zip(table.column_names, table.columns):
+        chunk = column.combine_chunks() if column.num_chunks != 1 else column.chunk(0)
+        columns[name] = chunk.to_numpy(zero_copy_only=False)
+    index = pd.DatetimeIndex(columns.pop(INDEX_COLUMN), copy=False, name=INDEX_COLUMN)
+    return pd.DataFrame(columns, index=index, copy=False)
+
+
+def write_frame(path, frame):
+    """Write a DataFrame as an Arrow IPC file, atomically replacing path"""
+    table = frame_to_table(frame)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def read_frame(path):
+    """Memory-map an Arrow IPC file and return it as a DataFrame (no deserialization copy)"""
+    with pa.memory_map(path, 'r') as source:
+        table = pa.ipc.open_file(source).read_all()
+    # The table's buffers keep the mapping alive after the file handle is closed
+    return table_to_frame(table)
+
+
+def ipc_stream_bytes(columns):
+    """Columnar dict -> Arrow IPC stream bytes (the HTTP interchange format)"""
+    table = pa.table(columns)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+class ArrowStore:
+    """Directory of memory-mapped Arrow files, one per (kind, period, symbol).
+
+    ``history/<period>/<SYMBOL>.arrow`` holds OHLCV bars and
+    ``indicators/<period>/<SYMBOL>.arrow`` the full indicator series, so a
+    short fetch never replaces a longer history. Mapped frames are reused
+    until the file on disk changes, so repeated reads in one process are
+    dictionary lookups.
+    """
+
+    KINDS = ('history', 'indicators')
+
+    def __init__(self, directory=ARROW_CACHE_DIR):
+        self.directory = directory
+        self._mapped = {}  # path -> (mtime_ns, size, frame)
+        self._lock = threading.Lock()
+
+    def path(self, kind, symbol, period='1y'):
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown Arrow table kind: {kind!r} (expected one of {', '.join(self.KINDS)})")
+        if not _PERIOD.match(period) or not _SYMBOL.match(symbol) or symbol.strip('.') == '':
+            raise ValueError(f"Invalid Arrow file key: {symbol!r}, {period!r}")
+        return os.path.join(self.directory, kind, period, f"{symbol}.arrow")
+
+    def put(self, kind, symbol, frame, period='1y'):
+        path = self.path(kind, symbol, period)
+        write_frame(path, frame)
+        with self._lock:
+            self._mapped.pop(path, None)
+        return path
+
+    def get(self, kind, symbol, period='1y'):
+        """Mapped DataFrame for (kind, symbol, period), or None when no file exists"""
+        path = self.path(kind, symbol, period)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            cached = self._mapped.get(path)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+        frame = read_frame(path)
+        with self._lock:
+            self._mapped[path] = (stat.st_mtime_ns, stat.st_size, frame)
+        return frame
+
+    def put_history(self, symbol, history, period='1y'):
+        return self.put('history', symbol, history, period)
+
+    def get_history(self, symbol, period='1y'):
+        return self.get('history', symbol, period)
+
+    def put_indicators(self, symbol, series, period='1y'):
+        return self.put('indicators', symbol, series, period)
+
+    def get_indicators(self, symbol, period='1y'):
+        return self.get('indicators', symbol, period)
+
+    def symbols(self, kind='history', period='1y'):
+        directory = os.path.join(self.directory, kind, period)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name[:-len('.arrow')] for name in os.listdir(directory) if name.endswith('.arrow'))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_arrow_store():
+    """Return the process-wide ArrowStore, or None without pyarrow or when ARROW_CACHE_DIR is empty"""
+    global _store
+    if _store is None and pa is not None and ARROW_CACHE_DIR:
+        with _store_lock:
+            if _store is None:
+                _store = ArrowStore()
+    return _store
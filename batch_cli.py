@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""Headless batch recommendations for a list of symbols.
+
+Runs fetch -> indicators -> news -> Gemini analysis for every symbol with a
+thread pool and appends one JSON line per symbol to the output file as soon
+as it finishes. News is looked up for BATCH_NEWS_CHUNK symbols at a time
+with a few combined queries instead of one query per symbol. Symbols that already have a successful line in the output
+are skipped, so an interrupted run resumes where it stopped.
+
+    python batch_cli.py AAPL MSFT NVDA -o recommendations.jsonl
+    python batch_cli.py --symbols-file universe.txt --concurrency 8
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+import numpy as np
+
+from config import BATCH_CONCURRENCY, BATCH_NEWS_CHUNK, DEFAULT_TECH_STOCKS
+from gemini_analyzer import GeminiAnalyzer
+from news_collector import NewsCollector
+from stock_data import YFINANCE_PERIODS, StockDataFetcher
+
+
+def read_symbols(args):
+    """Symbols from the command line and/or a file (one per line, '#' comments)"""
+    symbols = list(args.symbols)
+    if args.symbols_file:
+        with open(args.symbols_file) as f:
+            for line in f:
+                line = line.split('#', 1)[0].strip()
+                if line:
+                    symbols.extend(line.replace(',', ' ').split())
+    symbols = symbols or list(DEFAULT_TECH_STOCKS)
+    # Keep the given order, drop duplicates
+    return list(dict.fromkeys(symbol.upper() for symbol in symbols))
+
+
+def load_finished(path):
+    """Symbols that already have a successful result in the output file"""
+    finished = set()
+    if not os.path.exists(path):
+        return finished
+    with open(path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # a line cut short by an interrupted run
+            if record.get('status') == 'ok':
+                finished.add(record['symbol'])
+    return finished
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class BatchRunner:
+    """Process symbols concurrently and stream JSONL results"""
+
+    def __init__(self, analyzer=None, max_news=10, use_mock_news=False, period='1y',
+                 fetcher=None, news_collector=None):
+        self.fetcher = fetcher or StockDataFetcher()
+        self.news_collector = news_collector or NewsCollector()
+        self.analyzer = analyzer
+        self.max_news = max_news
+        self.use_mock_news = use_mock_news
+        self.period = period
+
+    def process(self, symbol, news_batch=None):
+        """Run the full pipeline for one symbol and return its result record.
+
+        ``news_batch`` is a Future of {symbol: articles} from ``fetch_news``;
+        without it (or when it has nothing for symbol) news is looked up alone.
+        """
+        started = time.perf_counter()
+        timings = {}
+
+        stock = self.fetcher.get_stock_data(symbol, period=self.period, budget=None)
+        timings['fetch'] = time.perf_counter() - started
+        if not stock:
+            raise RuntimeError("no stock data")
+
+        mark = time.perf_counter()
+        news = news_batch.result().get(symbol) if news_batch is not None else None
+        if news is None:
+            news = self.news_collector.get_stock_specific_news(
+                symbol, stock['name'], max_results=self.max_news, use_mock=self.use_mock_news
+            )
+        timings['news'] = time.perf_counter() - mark
+
+        record = {
+            'symbol': symbol,
+            'name': stock['name'],
+            'status': 'ok',
+            'source': stock['source'],
+            'stale': stock['stale'],
+            'price': stock['current_price'],
+            'change_pct': stock['price_change_pct'],
+            'market_cap': stock['market_cap'],
+            'pe_ratio': stock['pe_ratio'],
+            'technical': stock['technical_analysis'],
+            'news_count': len(news),
+            'news_mock': any(article.get('mock') for article in news),
+            'news_sentiment': round(self.news_collector.score_news(news), 4),
+            'headlines': [article['title'] for article in news[:3]]
+        }
+        # Simulated data is written for inspection but not marked done, so --resume retries it
+        if stock['source'] == 'mock':
+            record.update(status='error', error="all data sources failed (simulated data)")
+
+        if self.analyzer is not None and record['status'] == 'ok':
+            mark = time.perf_counter()
+            analysis = self.analyzer.analyze_stock(stock, news)
+            timings['analysis'] = time.perf_counter() - mark
+            if analysis.get('default'):
+                # The Gemini call failed and returned its generic placeholder
+                record.update(status='error', error="AI analysis failed")
+            else:
+                record['analysis'] = {key: value for key, value in analysis.items() if key != 'raw_response'}
+
+        timings['total'] = time.perf_counter() - started
+        record['timings'] = {stage: round(seconds, 3) for stage, seconds in timings.items()}
+        record['finished_at'] = datetime.now().isoformat(timespec='seconds')
+        return record
+
+    def fetch_news(self, symbols):
+        """News for a chunk of symbols in one batched lookup; {} on failure (symbols then query alone)"""
+        names = {symbol: self.fetcher.stock_info.get(symbol, symbol) for symbol in symbols}
+        try:
+            return self.news_collector.get_news_for_symbols(
+                names, max_results=self.max_news, use_mock=self.use_mock_news
+            )
+        except Exception as e:
+            print(f"Batched news lookup failed: {e}", file=sys.stderr)
+            return {}
+
+    def run(self, symbols, output, concurrency=BATCH_CONCURRENCY, progress=sys.stderr, records=None,
+            news_chunk=BATCH_NEWS_CHUNK):
+        """Process symbols, appending each result to output as it completes; returns the records.
+
+        Records are appended to ``records`` when given, so the caller keeps
+        the finished ones if the run is interrupted. News for the next chunk
+        of ``news_chunk`` symbols is fetched while earlier symbols process.
+        """
+        records = [] if records is None else records
+        write_lock = threading.Lock()
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        news_executor = ThreadPoolExecutor(max_workers=1)
+        futures = {}
+        for i in range(0, len(symbols), max(news_chunk, 1)):
+            chunk = symbols[i:i + max(news_chunk, 1)]
+            news_batch = news_executor.submit(self.fetch_news, chunk)
+            for symbol in chunk:
+                futures[executor.submit(self._safe_process, symbol, news_batch)] = symbol
+        try:
+            for done, future in enumerate(as_completed(futures), 1):
+                record = future.result()
+                with write_lock:
+                    output.write(json.dumps(record, default=_json_default) + '\n')
+                    output.flush()
+                    os.fsync(output.fileno())
+                records.append(record)
+                status = record.get('analysis', {}).get('action', 'done') if record['status'] == 'ok' else 'ERROR'
+                print(f"[{done}/{len(symbols)}] {record['symbol']}: {status} "
+                      f"({record['timings']['total']:.1f}s)", file=progress)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            news_executor.shutdown(wait=False, cancel_futures=True)
+        return records
+
+    def _safe_process(self, symbol, news_batch=None):
+        started = time.perf_counter()
+        try:
+            return self.process(symbol, news_batch)
+        except Exception as e:
+            return {
+                'symbol': symbol,
+                'status': 'error',
+                'error': str(e),
+                'timings': {'total': round(time.perf_counter() - started, 3)},
+                'finished_at': datetime.now().isoformat(timespec='seconds')
+            }
+
+
+def summarize(records, elapsed, skipped=0):
+    """Throughput and latency summary lines"""
+    ok = [record for record in records if record['status'] == 'ok']
+    lines = [
+        f"Processed {len(records)} symbols in {elapsed:.1f}s: {len(ok)} ok, "
+        f"{len(records) - len(ok)} failed, {skipped} skipped (already done)"
+    ]
+    if records and elapsed > 0:
+        lines.append(f"Throughput: {len(records) / elapsed * 60:.1f} symbols/min")
+    if ok:
+        totals = np.array([record['timings']['total'] for record in ok])
+        p50, p95 = np.percentile(totals, [50, 95])
+        lines.append(f"Latency per symbol: p50 {p50:.2f}s, p95 {p95:.2f}s, max {totals.max():.2f}s")
+        stages = ', '.join(
+            f"{stage} {np.mean([record['timings'][stage] for record in ok]):.2f}s"
+            for stage in ('fetch', 'news', 'analysis') if stage in ok[0]['timings']
+        )
+        lines.append(f"Mean stage time: {stages}")
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch stock recommendations as JSONL")
+    parser.add_argument('symbols', nargs='*', help="symbols to analyze (default: the configured tech stocks)")
+    parser.add_argument('--symbols-file', help="file with one or more symbols per line")
+    parser.add_argument('-o', '--output', default='recommendations.jsonl', help="JSONL output, also the resume checkpoint")
+    parser.add_argument('-c', '--concurrency', type=int, default=BATCH_CONCURRENCY, help="symbols processed in parallel")
+    parser.add_argument('--period', default='1y', choices=YFINANCE_PERIODS, help="price history period")
+    parser.add_argument('--max-news', type=int, default=10, help="news articles per symbol")
+    parser.add_argument('--mock-news', action='store_true', help="use mock news instead of news sources")
+    parser.add_argument('--skip-ai', action='store_true', help="skip Gemini analysis (data, indicators and news only)")
+    parser.add_argument('--restart', action='store_true', help="ignore existing results and start over")
+    args = parser.parse_args(argv)
+
+    analyzer = None
+    if not args.skip_ai:
+        try:
+            analyzer = GeminiAnalyzer()
+        except ValueError as e:
+            print(f"{e}. Set GEMINI_API_KEY or pass --skip-ai.", file=sys.stderr)
+            return 2
+
+    symbols = read_symbols(args)
+    if args.restart and os.path.exists(args.output):
+        os.remove(args.output)
+    finished = load_finished(args.output)
+    pending = [symbol for symbol in symbols if symbol not in finished]
+    skipped = len(symbols) - len(pending)
+    if skipped:
+        print(f"Resuming: {skipped} of {len(symbols)} symbols already done", file=sys.stderr)
+
+    runner = BatchRunner(analyzer, max_news=args.max_news, use_mock_news=args.mock_news, period=args.period)
+    started = time.perf_counter()
+    records = []
+    interrupted = False
+    with open(args.output, 'a') as output:
+        try:
+            runner.run(pending, output, concurrency=max(args.concurrency, 1), records=records)
+        except KeyboardInterrupt:
+            interrupted = True
+            print("Interrupted; finished symbols are saved and will be skipped on the next run", file=sys.stderr)
+
+    for line in summarize(records, time.perf_counter() - started, skipped):
+        print(line, file=sys.stderr)
+    if interrupted:
+        return 130
+    return 0 if all(record['status'] == 'ok' for record in records) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -23,6 +23,57 @@ DEFAULT_TECH_STOCKS = [
     'META', 'NFLX', 'PYPL', 'SQ', 'UBER'
 ]
 
+# Price history storage configuration
+# Store OHLC prices as float32 in the shared history buffers (halves price memory)
+HISTORY_FLOAT32 = os.getenv('HISTORY_FLOAT32', 'true').lower() in ('1', 'true', 'yes')
+
+# Company names for known tickers
+STOCK_NAMES = {
+    'AAPL': 'Apple Inc.',
+    'MSFT': 'Microsoft Corporation',
+    'GOOGL': 'Alphabet Inc.',
+    'AMZN': 'Amazon.com Inc.',
+    'TSLA': 'Tesla Inc.',
+    'NVDA': 'NVIDIA Corporation',
+    'AMD': 'Advanced Micro Devices Inc.',
+    'INTC': 'Intel Corporation',
+    'CRM': 'Salesforce Inc.',
+    'ADBE': 'Adobe Inc.',
+    'META': 'Meta Platforms Inc.',
+    'NFLX': 'Netflix Inc.',
+    'PYPL': 'PayPal Holdings Inc.',
+    'SQ': 'Block Inc.',
+    'UBER': 'Uber Technologies Inc.'
+}
+
+# Extra company aliases used to route news articles to tickers
+COMPANY_ALIASES = {
+    'GOOGL': ['Google', 'YouTube'],
+    'AMZN': ['AWS', 'Amazon Web Services'],
+    'META': ['Facebook', 'Instagram'],
+    'MSFT': ['Azure'],
+    'SQ': ['Square', 'Cash App']
+}
+
+# NewsAPI limits the length of the 'q' parameter
+NEWS_QUERY_MAX_CHARS = 500
+
+# Local news article store (SQLite); set NEWS_DB_PATH to an empty string to disable
+NEWS_DB_PATH = os.getenv('NEWS_DB_PATH', 'news_articles.db')
+NEWS_RETENTION_DAYS = int(os.getenv('NEWS_RETENTION_DAYS', '30'))
+NEWS_MAX_ARTICLES = int(os.getenv('NEWS_MAX_ARTICLES', '50000'))
+# Minimum seconds between two incremental ingestions of the same query
+NEWS_INGEST_INTERVAL = int(os.getenv('NEWS_INGEST_INTERVAL', '300'))
+# Half-life (days) of the recency weight used when ranking local news search results
+NEWS_RECENCY_HALF_LIFE_DAYS = float(os.getenv('NEWS_RECENCY_HALF_LIFE_DAYS', '3'))
+
+# AI recommendation history (SQLite); set RECOMMENDATION_DB_PATH to an empty string to disable
+RECOMMENDATION_DB_PATH = os.getenv('RECOMMENDATION_DB_PATH', 'recommendations.db')
+
+# Memory-mapped Arrow IPC files of price histories and indicator tables (needs pyarrow);
+# set ARROW_CACHE_DIR to an empty string to disable
+ARROW_CACHE_DIR = os.getenv('ARROW_CACHE_DIR', 'arrow_cache')
+
 # News sources configuration
 NEWS_SOURCES = [
     'reuters.com',
@@ -59,6 +110,86 @@ Please provide:
 Please answer in English with clear formatting.
 """
 
+# Stock data fetching: a call waits at most FETCH_BUDGET seconds, then serves the
+# last good (stale) snapshot while the refresh continues in the background,
+# bounded by FETCH_DEADLINE. Retries back off exponentially up to FETCH_BACKOFF_MAX.
+FETCH_BUDGET = float(os.getenv('FETCH_BUDGET', '8'))
+FETCH_DEADLINE = float(os.getenv('FETCH_DEADLINE', '45'))
+FETCH_BACKOFF_BASE = float(os.getenv('FETCH_BACKOFF_BASE', '0.5'))
+FETCH_BACKOFF_MAX = float(os.getenv('FETCH_BACKOFF_MAX', '20'))
+
+# Seconds a longer cached history serves shorter periods (sliced, no fetch) before
+# it is refreshed in the background
+PERIOD_SLICE_MAX_AGE = int(os.getenv('PERIOD_SLICE_MAX_AGE', '300'))
+
+# Seconds the app reuses fetched data within a session before refetching
+SESSION_CACHE_TTL = int(os.getenv('SESSION_CACHE_TTL', '300'))
+
+# HTTP API service (api_server.py)
+API_HOST = os.getenv('API_HOST', '0.0.0.0')
+API_PORT = int(os.getenv('API_PORT', '8080'))
+API_WORKER_THREADS = int(os.getenv('API_WORKER_THREADS', '32'))   # threads for blocking fetch/analysis calls
+API_CACHE_TTL = int(os.getenv('API_CACHE_TTL', '60'))             # seconds a fetched snapshot is served without refresh
+API_MAX_BATCH = int(os.getenv('API_MAX_BATCH', '100'))            # symbols per batch request
+
+# Symbols processed in parallel by the batch CLI, and symbols per batched news lookup
+BATCH_CONCURRENCY = int(os.getenv('BATCH_CONCURRENCY', '4'))
+BATCH_NEWS_CHUNK = int(os.getenv('BATCH_NEWS_CHUNK', '50'))
+
+# Live quote polling cadence in seconds; a session's symbols are dropped from the
+# shared watchlist QUOTE_SESSION_TTL seconds after it last read the quotes
+QUOTE_POLL_INTERVAL = float(os.getenv('QUOTE_POLL_INTERVAL', '5'))
+QUOTE_SESSION_TTL = float(os.getenv('QUOTE_SESSION_TTL', '60'))
+
+# Parameter sweep process pool (0 = one worker per CPU core)
+SWEEP_MAX_WORKERS = int(os.getenv('SWEEP_MAX_WORKERS', '0'))
+
+# Rolling-window/EMA kernels behind the indicators: auto (numba when installed,
+# otherwise NumPy), numba, numpy or pandas
+INDICATOR_BACKEND = os.getenv('INDICATOR_BACKEND', 'auto')
+
+# Risk metrics: betas are measured against these indices; VaR/CVaR are one-day
+# losses at RISK_CONFIDENCE; rolling volatility uses RISK_VOL_WINDOW trading days
+RISK_BENCHMARKS = ['^GSPC', '^IXIC', '^DJI']
+RISK_CONFIDENCE = float(os.getenv('RISK_CONFIDENCE', '0.95'))
+RISK_VOL_WINDOW = int(os.getenv('RISK_VOL_WINDOW', '20'))
+RISK_CACHE_SIZE = int(os.getenv('RISK_CACHE_SIZE', '32'))      # symbol sets whose metrics are kept (LRU)
+
+# Market sentiment summarization (map-reduce over news chunks)
+SUMMARY_CHUNK_SIZE = int(os.getenv('SUMMARY_CHUNK_SIZE', '25'))      # articles per map prompt
+SUMMARY_MAX_WORKERS = int(os.getenv('SUMMARY_MAX_WORKERS', '4'))     # parallel Gemini calls
+SUMMARY_MERGE_FANIN = int(os.getenv('SUMMARY_MERGE_FANIN', '8'))     # partial summaries per merge prompt
+
+MAP_SENTIMENT_PROMPT = """
+As a market analyst, summarize the market sentiment signal in the following {count} {kind}.
+
+{news_summary}
+
+Reply in at most 120 words with:
+- Sentiment (Bullish/Bearish/Neutral)
+- Key drivers
+- Companies or sectors most affected
+- Risks mentioned
+"""
+
+REDUCE_SENTIMENT_PROMPT = """
+As a market analyst, merge the following market sentiment notes into one comprehensive tech market sentiment analysis.
+The notes cover {article_count} news articles in total.
+
+{previous_summary}
+
+New notes:
+{partial_summaries}
+
+Please provide:
+1. Overall market sentiment (Bullish/Bearish/Neutral)
+2. Key factors driving the sentiment
+3. Impact on tech stocks
+4. Key risks for investors to watch
+
+Format your response clearly with headers and bullet points.
+"""
+
 # Nancy Pelosi trading activity analysis
 NANCY_PELOSI_TRADES = {
     'AAPL': {
@@ -126,6 +257,9 @@ Market Cap: {market_cap}
 Technical Indicators:
 {technical_indicators}
 
+Risk Metrics:
+{risk_metrics}
+
 Related News and Analysis:
 {news_summary}
 
@@ -135,7 +269,7 @@ Nancy Pelosi Trading Activity:
 Please provide:
 1. Buy/Sell/Hold recommendation
 2. Target price
-3. Risk level (Low/Medium/High)
+3. Risk level (Low/Medium/High), consistent with the risk metrics above
 4. Investment rationale
 5. Risk warnings
 6. Impact of Nancy Pelosi's trading activity on this stock
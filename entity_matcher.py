@@ -0,0 +1,117 @@
+import re
+import string
+from collections import deque
+
+from config import COMPANY_ALIASES
+
+# ASCII-only lowercasing keeps character offsets identical to the original text
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+# Legal/corporate suffixes stripped from company names to build short aliases
+_NAME_SUFFIXES = re.compile(
+    r'[,\s]+(inc\.?|corp\.?|corporation|holdings|platforms|technologies|company|co\.?|ltd\.?|plc)$',
+    re.IGNORECASE
+)
+
+
+def company_aliases(name):
+    """Derive name aliases, e.g. 'Meta Platforms Inc.' -> ['Meta Platforms Inc.', 'Meta Platforms', 'Meta']"""
+    aliases = [name]
+    short = name
+    while True:
+        stripped = _NAME_SUFFIXES.sub('', short).strip()
+        if stripped == short or not stripped:
+            break
+        short = stripped
+        aliases.append(short)
+    if short.lower().endswith('.com'):
+        aliases.append(short[:-4])
+    return aliases
+
+
+class EntityMatcher:
+    """Aho-Corasick matcher routing text to the symbols it mentions.
+
+    Tickers and single-word aliases only match in their written, Title or
+    UPPER case (so 'SQ' or 'Block' don't fire on every 'block'); multi-word
+    names match case-insensitively. All matches must sit on word boundaries.
+    """
+
+    def __init__(self, stock_info, extra_aliases=COMPANY_ALIASES):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+
+        for symbol, name in stock_info.items():
+            self._add(symbol, symbol, {symbol})
+            names = company_aliases(name) + list(extra_aliases.get(symbol, []))
+            for alias in names:
+                if ' ' in alias:
+                    self._add(alias, symbol, None)
+                else:
+                    self._add(alias, symbol, {alias, alias.title(), alias.upper()})
+
+        self._build()
+
+    def _add(self, pattern, symbol, case_forms):
+        """Insert a pattern into the trie"""
+        state = 0
+        for char in pattern.translate(_ASCII_LOWER):
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append((len(pattern), symbol, case_forms))
+
+    def _build(self):
+        """Compute failure links breadth-first"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                candidate = self._goto[fail].get(char, 0)
+                self._fail[next_state] = candidate if candidate != next_state else 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def match(self, text):
+        """Return the set of symbols mentioned in text"""
+        symbols = set()
+        if not text:
+            return symbols
+
+        lowered = text.translate(_ASCII_LOWER)
+        state = 0
+        for end, char in enumerate(lowered, 1):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+
+            for length, symbol, case_forms in self._output[state]:
+                if symbol in symbols:
+                    continue
+                start = end - length
+                if start > 0 and text[start - 1].isalnum():
+                    continue
+                if end < len(text) and text[end].isalnum():
+                    continue
+                if case_forms is not None and text[start:end] not in case_forms:
+                    continue
+                symbols.add(symbol)
+        return symbols
+
+    def route(self, articles):
+        """Group articles by every symbol their title or summary mentions"""
+        routed = {}
+        for article in articles:
+            text = f"{article.get('title') or ''}\n{article.get('summary') or ''}"
+            for symbol in self.match(text):
+                routed.setdefault(symbol, []).append(article)
+        return routed
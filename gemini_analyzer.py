@@ -1,7 +1,35 @@
 import google.generativeai as genai
-from config import GEMINI_API_KEY, ANALYSIS_PROMPT, ENHANCED_ANALYSIS_PROMPT, NANCY_PELOSI_TRADES
+from config import (
+    GEMINI_API_KEY, ANALYSIS_PROMPT, ENHANCED_ANALYSIS_PROMPT, NANCY_PELOSI_TRADES,
+    SUMMARY_CHUNK_SIZE, SUMMARY_MAX_WORKERS, SUMMARY_MERGE_FANIN,
+    MAP_SENTIMENT_PROMPT, REDUCE_SENTIMENT_PROMPT
+)
 import json
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from news_store import title_hash
+from risk import format_risk_summary, get_risk_metrics
+from singleflight import SingleFlight
+
+# Identical prompts in flight at the same time share one Gemini call
+_prompt_flights = SingleFlight()
+
+# One summary update per scope at a time
+_summary_flights = SingleFlight()
+
+# Market summary when there are no articles to summarize yet
+NO_NEWS_SUMMARY = """
+            **Market Sentiment Analysis**
+            
+            No market news is available yet, so there is nothing to summarize.
+            """
+
+# Rolling market summaries when no article store is configured
+_summaries = {}
+_summaries_lock = threading.Lock()
 
 class GeminiAnalyzer:
     def __init__(self, api_key=None):
@@ -12,10 +40,18 @@ class GeminiAnalyzer:
             raise ValueError("Gemini API key not set")
         
         genai.configure(api_key=self.api_key)
-        self.model = genai.GenerativeModel('gemini-1.5-flash')
+        self.model_name = 'gemini-1.5-flash'
+        self.model = genai.GenerativeModel(self.model_name)
+    
+    def _generate(self, prompt):
+        """Generate text for a prompt, coalescing concurrent identical prompts"""
+        return _prompt_flights.do(
+            (self.model_name, prompt),
+            lambda: self.model.generate_content(prompt).text
+        )
     
-    def analyze_stock(self, stock_data, news_data):
-        """Analyze stock data and provide recommendations"""
+    def analyze_stock(self, stock_data, news_data, risk=None):
+        """Analyze stock data and provide recommendations (risk: a row of get_risk_metrics, looked up when omitted)"""
         try:
             # Prepare technical analysis summary
             tech_analysis = stock_data['technical_analysis']
@@ -28,6 +64,15 @@ class GeminiAnalyzer:
             Technical Signals: {', '.join(tech_analysis['signals'])}
             """
             
+            # Add recent indicator trend from the precomputed series
+            indicator_series = stock_data.get('indicator_series')
+            if indicator_series is not None and not indicator_series.empty:
+                recent = indicator_series.tail(5).round(2)
+                tech_summary += f"""
+            RSI (last 5 sessions): {', '.join(str(v) for v in recent['rsi'].tolist())}
+            MACD (last 5 sessions): {', '.join(str(v) for v in recent['macd'].tolist())}
+            """
+            
             # Prepare news summary
             news_summary = ""
             if news_data:
@@ -38,6 +83,9 @@ class GeminiAnalyzer:
             else:
                 news_summary = "No recent news available"
             
+            # Quantitative risk profile from the shared price histories
+            risk_summary = self._get_risk_summary(stock_data['symbol'], risk)
+            
             # Get Nancy Pelosi trading activity
             pelosi_analysis = self._get_pelosi_analysis(stock_data['symbol'])
             
@@ -46,16 +94,16 @@ class GeminiAnalyzer:
                 current_price=stock_data['current_price'],
                 high_52w=stock_data['high_52w'],
                 low_52w=stock_data['low_52w'],
-                pe_ratio=stock_data['pe_ratio'],
-                market_cap=stock_data['market_cap'],
+                pe_ratio=stock_data.pe_ratio_display,
+                market_cap=stock_data.market_cap_display,
                 technical_indicators=tech_summary,
                 news_summary=news_summary,
+                risk_metrics=risk_summary,
                 pelosi_analysis=pelosi_analysis
             )
             
             # Generate analysis
-            response = self.model.generate_content(prompt)
-            analysis_text = response.text
+            analysis_text = self._generate(prompt)
             
             # Parse the response
             return self._parse_analysis_response(analysis_text, stock_data)
@@ -64,6 +112,18 @@ class GeminiAnalyzer:
             print(f"Error in stock analysis: {e}")
             return self._get_default_analysis(stock_data)
     
+    def _get_risk_summary(self, symbol, risk=None):
+        """Risk metrics formatted for the prompt"""
+        try:
+            if risk is None:
+                risk = get_risk_metrics([symbol]).loc[symbol]
+            if risk.isna().all():
+                return "Risk metrics unavailable"
+            return format_risk_summary(risk)
+        except Exception as e:
+            print(f"Error computing risk metrics for {symbol}: {e}")
+            return "Risk metrics unavailable"
+    
     def _get_pelosi_analysis(self, symbol):
         """Get Nancy Pelosi's trading activity for a specific stock"""
         if symbol in NANCY_PELOSI_TRADES:
@@ -86,32 +146,18 @@ No recent trading activity found for this stock.
 Note: Nancy Pelosi's trading strategy has shown +740.83% return since 2014, significantly outperforming the market (+243.16%).
 """
     
-    def get_market_sentiment(self, news_data):
-        """Analyze market sentiment based on news"""
+    def get_market_sentiment(self, news_data, store=None, scope='tech_market'):
+        """Analyze market sentiment based on news.
+
+        Map-reduce over all articles: new articles are summarized in parallel
+        chunks, the partial summaries are merged hierarchically and folded
+        into a rolling summary (one per scope and day). Articles already
+        covered by the rolling summary are not sent again.
+        """
         try:
-            # Prepare news summary
-            news_summary = "\n".join([
-                f"- {news['title']} ({news['source']})"
-                for news in news_data[:10]
-            ])
-            
-            prompt = f"""
-            As a market analyst, analyze the following tech market news and provide a comprehensive market sentiment analysis:
-            
-            Recent Tech Market News:
-            {news_summary}
-            
-            Please provide:
-            1. Overall market sentiment (Bullish/Bearish/Neutral)
-            2. Key factors driving the sentiment
-            3. Impact on tech stocks
-            4. Key risks for investors to watch
-            
-            Format your response clearly with headers and bullet points.
-            """
-            
-            response = self.model.generate_content(prompt)
-            return response.text
+            return _summary_flights.do(
+                (scope, date.today().isoformat()), self._update_market_summary, news_data, store, scope
+            )
             
         except Exception as e:
             print(f"Error in market sentiment analysis: {e}")
@@ -122,6 +168,83 @@ Note: Nancy Pelosi's trading strategy has shown +740.83% return since 2014, sign
             Please try again later or check your API key configuration.
             """
     
+    def _update_market_summary(self, news_data, store, scope):
+        """Fold articles not yet covered into the rolling summary for today"""
+        key = f"{scope}:{date.today().isoformat()}"
+        if store is not None:
+            previous = store.get_summary(key)
+        else:
+            with _summaries_lock:
+                previous = _summaries.get(key)
+        
+        seen = set(previous['seen']) if previous else set()
+        new_articles = []
+        for news in news_data:
+            digest = title_hash(news['title'])
+            if digest not in seen:
+                seen.add(digest)
+                new_articles.append(news)
+        
+        if not new_articles:
+            # Nothing to fold in: no LLM call (and nothing stored, so the first articles still start a summary)
+            return previous['summary'] if previous else NO_NEWS_SUMMARY
+        
+        # Map: summarize chunks of new articles in parallel
+        chunks = [
+            new_articles[i:i + SUMMARY_CHUNK_SIZE]
+            for i in range(0, len(new_articles), SUMMARY_CHUNK_SIZE)
+        ]
+        with ThreadPoolExecutor(max_workers=SUMMARY_MAX_WORKERS) as pool:
+            partials = list(pool.map(self._summarize_chunk, chunks))
+            
+            # Reduce: merge groups of partial notes until one prompt can hold them
+            while len(partials) > SUMMARY_MERGE_FANIN:
+                groups = [
+                    partials[i:i + SUMMARY_MERGE_FANIN]
+                    for i in range(0, len(partials), SUMMARY_MERGE_FANIN)
+                ]
+                partials = list(pool.map(self._merge_notes, groups))
+        
+        article_count = (previous['article_count'] if previous else 0) + len(new_articles)
+        previous_summary = (
+            f"Running summary so far:\n{previous['summary']}" if previous else "There is no running summary yet."
+        )
+        summary = self._generate(REDUCE_SENTIMENT_PROMPT.format(
+            article_count=article_count,
+            previous_summary=previous_summary,
+            partial_summaries="\n\n".join(partials)
+        ))
+        
+        if store is not None:
+            store.save_summary(key, summary, seen, article_count)
+        else:
+            with _summaries_lock:
+                # Only today's summaries are kept
+                for stale_key in [k for k in _summaries if not k.endswith(date.today().isoformat())]:
+                    del _summaries[stale_key]
+                _summaries[key] = {'summary': summary, 'seen': seen, 'article_count': article_count}
+        return summary
+    
+    def _summarize_chunk(self, news_chunk):
+        """Map step: short sentiment note for one chunk of articles"""
+        news_summary = "\n".join([
+            f"- {news['title']} ({news['source']})"
+            for news in news_chunk
+        ])
+        return self._generate(MAP_SENTIMENT_PROMPT.format(
+            count=len(news_chunk),
+            kind="tech market news headlines",
+            news_summary=news_summary
+        ))
+    
+    def _merge_notes(self, notes):
+        """Intermediate reduce step: merge several notes into one short note"""
+        return self._generate(MAP_SENTIMENT_PROMPT.format(
+            count=len(notes),
+            kind="market sentiment notes",
+            news_summary="\n\n".join(notes)
+        ))
+    
     def _parse_analysis_response(self, response_text, stock_data):
         """Parse AI analysis response"""
         try:
@@ -167,8 +290,9 @@ Note: Nancy Pelosi's trading strategy has shown +740.83% return since 2014, sign
             return self._get_default_analysis(stock_data)
     
     def _get_default_analysis(self, stock_data):
-        """Get default analysis when parsing fails"""
+        """Get default analysis when the call or parsing fails (marked 'default': never store or reuse it)"""
         return {
+            'default': True,
             'action': 'Hold',
             'target_price': f"${stock_data['current_price'] * 1.05:.2f}",
             'risk_level': 'Medium',
@@ -0,0 +1,146 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from config import HISTORY_FLOAT32
+
+OHLC_COLUMNS = ('Open', 'High', 'Low', 'Close')
+
+
+def history_frame(dates, open_, high, low, close, volume):
+    """OHLCV DataFrame shaped like a store view, but private to the caller (never shared).
+
+    Used for simulated histories, which must not replace a symbol's real
+    history in the process-wide store.
+    """
+    dates = pd.DatetimeIndex(dates, name='Date')
+    if dates.tz is not None:
+        dates = dates.tz_localize(None)
+    return pd.DataFrame({
+        'Open': np.asarray(open_, dtype=np.float64),
+        'High': np.asarray(high, dtype=np.float64),
+        'Low': np.asarray(low, dtype=np.float64),
+        'Close': np.asarray(close, dtype=np.float64),
+        'Volume': np.nan_to_num(np.asarray(volume, dtype=np.float64), nan=0.0).clip(min=0).astype(np.uint64)
+    }, index=dates)
+
+
+class _HistoryBuffer:
+    """One contiguous memory block holding a symbol's dates, OHLC and volume columns"""
+
+    __slots__ = ('block', 'dates', 'ohlc', 'volume')
+
+    def __init__(self, dates, ohlc, volume, price_dtype):
+        n = len(dates)
+        price_dtype = np.dtype(price_dtype)
+        volume_dtype = np.dtype(np.uint32 if (n == 0 or volume.max() < 2 ** 32) else np.uint64)
+
+        # Layout: [dates int64 | Open | High | Low | Close | Volume], each column contiguous
+        dates_bytes = n * 8
+        ohlc_bytes = 4 * n * price_dtype.itemsize
+        self.block = np.empty(dates_bytes + ohlc_bytes + n * volume_dtype.itemsize, dtype=np.uint8)
+
+        self.dates = self.block[:dates_bytes].view('datetime64[ns]')
+        self.ohlc = self.block[dates_bytes:dates_bytes + ohlc_bytes].view(price_dtype).reshape(4, n)
+        self.volume = self.block[dates_bytes + ohlc_bytes:].view(volume_dtype)
+
+        self.dates[:] = dates
+        self.ohlc[:] = ohlc
+        self.volume[:] = volume
+
+        # Sessions only ever get read-only views
+        self.block.flags.writeable = False
+        for column in (self.dates, self.ohlc, self.volume):
+            column.flags.writeable = False
+
+    @property
+    def nbytes(self):
+        return self.block.nbytes
+
+    def view(self):
+        """Zero-copy DataFrame view over the block"""
+        index = pd.DatetimeIndex(self.dates, copy=False, name='Date')
+        prices = pd.DataFrame(self.ohlc.T, index=index, columns=list(OHLC_COLUMNS), copy=False)
+        volume = pd.DataFrame({'Volume': self.volume}, index=index, copy=False)
+        return pd.concat([prices, volume], axis=1, copy=False)
+
+
+class PriceHistoryStore:
+    """Process-wide columnar store of daily price histories.
+
+    Each symbol is kept once, in a single contiguous NumPy block, no matter
+    how many sessions request it. ``put``/``get`` hand out read-only,
+    zero-copy DataFrame views over that block, so memory scales with the
+    number of symbols rather than symbols x concurrent users.
+    """
+
+    def __init__(self, use_float32=HISTORY_FLOAT32):
+        self.price_dtype = np.float32 if use_float32 else np.float64
+        self._buffers = {}
+        self._lock = threading.Lock()
+
+    def put(self, symbol, dates, open_, high, low, close, volume):
+        """Store column arrays for a symbol and return a read-only view"""
+        dates = pd.DatetimeIndex(dates)
+        if dates.tz is not None:
+            dates = dates.tz_localize(None)
+        ohlc = np.vstack([
+            np.asarray(open_, dtype=np.float64),
+            np.asarray(high, dtype=np.float64),
+            np.asarray(low, dtype=np.float64),
+            np.asarray(close, dtype=np.float64)
+        ])
+        volume = np.nan_to_num(np.asarray(volume, dtype=np.float64), nan=0.0).clip(min=0)
+
+        buffer = _HistoryBuffer(dates.values.astype('datetime64[ns]'), ohlc, volume, self.price_dtype)
+        with self._lock:
+            self._buffers[symbol] = buffer
+        return buffer.view()
+
+    def put_frame(self, symbol, df):
+        """Store an OHLCV DataFrame (extra columns such as Dividends are dropped)"""
+        return self.put(
+            symbol, df.index,
+            df['Open'].to_numpy(), df['High'].to_numpy(), df['Low'].to_numpy(),
+            df['Close'].to_numpy(), df['Volume'].to_numpy()
+        )
+
+    def get(self, symbol):
+        """Read-only view of a symbol's history, or None"""
+        with self._lock:
+            buffer = self._buffers.get(symbol)
+        return buffer.view() if buffer is not None else None
+
+    def drop(self, symbol):
+        with self._lock:
+            self._buffers.pop(symbol, None)
+
+    def symbols(self):
+        with self._lock:
+            return list(self._buffers)
+
+    def nbytes(self):
+        """Total bytes held by all symbol blocks"""
+        with self._lock:
+            return sum(buffer.nbytes for buffer in self._buffers.values())
+
+    def __contains__(self, symbol):
+        return symbol in self._buffers
+
+    def __len__(self):
+        return len(self._buffers)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_history_store():
+    """Return the process-wide PriceHistoryStore"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = PriceHistoryStore()
+    return _store
@@ -0,0 +1,79 @@
+import numpy as np
+
+
+def _ema_state(closes, span):
+    """(numerator, denominator) of pandas' adjusted EWM (ewm(span=...).mean()) over closes"""
+    decay = 1 - 2.0 / (span + 1)
+    weights = decay ** np.arange(len(closes) - 1, -1, -1)
+    return float(np.dot(weights, closes)), float(weights.sum())
+
+
+class IncrementalIndicators:
+    """Latest-bar technical indicators updated one bar (or tick) at a time.
+
+    Keeps only the last 201 closes plus the running EMA numerator and
+    denominator, so a new bar or a revised last price costs O(window)
+    instead of recomputing the indicators over the full history. Values
+    match StockDataFetcher._calculate_technical_indicators.
+    """
+
+    WINDOW = 200
+    MACD_SPANS = (12, 26)
+
+    def __init__(self, closes):
+        closes = np.asarray(closes, dtype=np.float64)
+        if not len(closes):
+            raise ValueError("IncrementalIndicators needs at least one close")
+        self._closes = closes[-(self.WINDOW + 1):].copy()
+        # EMA states cover every bar except the last one, which may still change
+        self._ema_states = {span: _ema_state(closes[:-1], span) for span in self.MACD_SPANS}
+
+    @property
+    def last_close(self):
+        return float(self._closes[-1])
+
+    def push(self, close):
+        """Append a new bar"""
+        last = self._closes[-1]
+        for span, (numerator, denominator) in self._ema_states.items():
+            decay = 1 - 2.0 / (span + 1)
+            self._ema_states[span] = (numerator * decay + last, denominator * decay + 1)
+        self._closes = np.append(self._closes[-self.WINDOW:], float(close))
+
+    def update_last(self, close):
+        """Revise the close of the current (in-progress) bar"""
+        self._closes[-1] = float(close)
+
+    def _sma(self, window):
+        if len(self._closes) < window:
+            return np.nan
+        return self._closes[-window:].mean()
+
+    def _ema(self, span):
+        decay = 1 - 2.0 / (span + 1)
+        numerator, denominator = self._ema_states[span]
+        return (numerator * decay + self._closes[-1]) / (denominator * decay + 1)
+
+    def values(self):
+        """Current indicator snapshot (same keys as technical_analysis, without signals)"""
+        sma_20 = self._sma(20)
+        std_20 = self._closes[-20:].std(ddof=1) if len(self._closes) >= 20 else np.nan
+
+        deltas = np.diff(self._closes[-15:])
+        rsi = np.nan
+        if len(deltas) == 14:
+            gain = deltas.clip(min=0).mean()
+            loss = (-deltas).clip(min=0).mean()
+            rsi = 100 - 100 / (1 + gain / loss) if loss else 100.0
+        macd = self._ema(12) - self._ema(26)
+
+        return {
+            'close': self.last_close,
+            'sma_20': round(sma_20, 2),
+            'sma_50': round(self._sma(50), 2),
+            'sma_200': round(self._sma(200), 2),
+            'rsi': round(rsi if not np.isnan(rsi) else 50, 2),
+            'macd': round(macd, 2),
+            'bollinger_upper': round(sma_20 + std_20 * 2, 2),
+            'bollinger_lower': round(sma_20 - std_20 * 2, 2)
+        }
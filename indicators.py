@@ -0,0 +1,226 @@
+"""Technical indicator registry evaluated as a dependency graph.
+
+Every indicator is a node declaring the nodes it is computed from. A
+request is resolved into a topological order and each node is evaluated
+once, so intermediates such as the 20-day rolling mean (shared by SMA 20
+and the Bollinger bands) or the true range (shared by ATR and ADX) are
+computed a single time per history. Adding an indicator is a decorated
+function; nothing else needs to change:
+
+    @indicator('momentum_10', deps=('close',))
+    def momentum_10(close):
+        return close - close.shift(10)
+"""
+import numpy as np
+import pandas as pd
+
+import kernels
+
+# OHLCV columns of a history DataFrame, available as source nodes
+SOURCES = {'open': 'Open', 'high': 'High', 'low': 'Low', 'close': 'Close', 'volume': 'Volume'}
+
+
+class Indicator:
+    """A registered node: func(*deps) -> Series aligned on the history index"""
+
+    __slots__ = ('name', 'func', 'deps', 'public')
+
+    def __init__(self, name, func, deps, public):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.public = public
+
+    def __repr__(self):
+        return f"Indicator({self.name!r}, deps={self.deps})"
+
+
+REGISTRY = {}
+
+
+def register(name, func, deps=(), public=True):
+    """Add (or replace) a node; public=False marks an intermediate that is not returned by default"""
+    if name in SOURCES:
+        raise ValueError(f"{name!r} is a source column")
+    REGISTRY[name] = Indicator(name, func, deps, public)
+    return func
+
+
+def indicator(name, deps=(), public=True):
+    """Decorator form of register"""
+    return lambda func: register(name, func, deps, public)
+
+
+def plan(names):
+    """Nodes needed for names (dependencies included) in evaluation order"""
+    order = []
+    state = {}  # name -> 'visiting' | 'done'
+
+    def visit(name, path):
+        if state.get(name) == 'done' or name in SOURCES:
+            return
+        if state.get(name) == 'visiting':
+            raise ValueError(f"Indicator dependency cycle: {' -> '.join(path + (name,))}")
+        if name not in REGISTRY:
+            raise ValueError(f"Unknown indicator: {name!r}")
+        state[name] = 'visiting'
+        for dep in REGISTRY[name].deps:
+            visit(dep, path + (name,))
+        state[name] = 'done'
+        order.append(name)
+
+    for name in names:
+        visit(name, ())
+    return order
+
+
+def sources(name):
+    """Source columns a node ultimately depends on"""
+    if name in SOURCES:
+        return {name}
+    return set().union(*(sources(dep) for dep in REGISTRY[name].deps)) if REGISTRY[name].deps else set()
+
+
+def available(hist, public_only=True):
+    """Registered indicators computable from the columns present in hist"""
+    present = {name for name, column in SOURCES.items() if column in hist.columns}
+    return [
+        name for name, node in REGISTRY.items()
+        if (node.public or not public_only) and sources(name) <= present
+    ]
+
+
+def compute(hist, names=None):
+    """Evaluate indicators over a history DataFrame; returns a DataFrame with one column per name.
+
+    names defaults to every public indicator computable from hist's columns.
+    """
+    names = available(hist) if names is None else list(names)
+    values = {}
+    for name in plan(names):
+        node = REGISTRY[name]
+        args = [hist[SOURCES[dep]] if dep in SOURCES else values[dep] for dep in node.deps]
+        values[name] = node.func(*args)
+    for name in names:
+        if name in SOURCES:
+            values[name] = hist[SOURCES[name]]
+    return pd.DataFrame({name: values[name] for name in names}, index=hist.index)
+
+
+# --- Shared intermediates ---
+# Rolling windows and EMAs run on the configured kernel backend (see kernels.py)
+
+def _kernel(func, *args, **kwargs):
+    """Wrap a kernel so it maps a Series to a Series on the same index"""
+    return lambda series: pd.Series(func(series.to_numpy(dtype=np.float64), *args, **kwargs), index=series.index)
+
+
+def _wilder(series, window=14):
+    """Wilder's smoothing (an EMA with alpha = 1 / window)"""
+    return _kernel(kernels.ema, alpha=1.0 / window, adjust=False)(series)
+
+
+for _window in (20, 50, 200):
+    register(f'sma_{_window}', _kernel(kernels.rolling_mean, _window), deps=('close',))
+register('std_20', _kernel(kernels.rolling_std, 20), deps=('close',), public=False)
+register('delta', lambda close: close.diff(), deps=('close',), public=False)
+register('gain_14', lambda delta: _kernel(kernels.rolling_mean, 14)(delta.where(delta > 0, 0)),
+         deps=('delta',), public=False)
+register('loss_14', lambda delta: _kernel(kernels.rolling_mean, 14)(-delta.where(delta < 0, 0)),
+         deps=('delta',), public=False)
+register('ema_12', _kernel(kernels.ema, span=12), deps=('close',), public=False)
+register('ema_26', _kernel(kernels.ema, span=26), deps=('close',), public=False)
+register('prev_close', lambda close: close.shift(1), deps=('close',), public=False)
+
+
+# --- Core indicators (same definitions as before the registry) ---
+
+@indicator('rsi', deps=('gain_14', 'loss_14'))
+def rsi(gain, loss):
+    return 100 - (100 / (1 + gain / loss))
+
+
+@indicator('macd', deps=('ema_12', 'ema_26'))
+def macd(ema_12, ema_26):
+    return ema_12 - ema_26
+
+
+@indicator('bollinger_upper', deps=('sma_20', 'std_20'))
+def bollinger_upper(sma_20, std_20):
+    return sma_20 + std_20 * 2
+
+
+@indicator('bollinger_lower', deps=('sma_20', 'std_20'))
+def bollinger_lower(sma_20, std_20):
+    return sma_20 - std_20 * 2
+
+
+# --- Range and volume indicators ---
+
+@indicator('true_range', deps=('high', 'low', 'prev_close'), public=False)
+def true_range(high, low, prev_close):
+    return pd.concat([high - low, (high - prev_close).abs(), (low - prev_close).abs()], axis=1).max(axis=1)
+
+
+@indicator('atr_14', deps=('true_range',))
+def atr_14(true_range):
+    return _wilder(true_range)
+
+
+@indicator('lowest_low_14', deps=('low',), public=False)
+def lowest_low_14(low):
+    return _kernel(kernels.rolling_min, 14)(low)
+
+
+@indicator('highest_high_14', deps=('high',), public=False)
+def highest_high_14(high):
+    return _kernel(kernels.rolling_max, 14)(high)
+
+
+@indicator('stoch_k', deps=('close', 'lowest_low_14', 'highest_high_14'))
+def stoch_k(close, lowest_low, highest_high):
+    """Stochastic %K (14)"""
+    return 100 * (close - lowest_low) / (highest_high - lowest_low).replace(0, np.nan)
+
+
+@indicator('stoch_d', deps=('stoch_k',))
+def stoch_d(stoch_k):
+    """Stochastic %D: 3-bar mean of %K"""
+    return _kernel(kernels.rolling_mean, 3)(stoch_k)
+
+
+@indicator('obv', deps=('delta', 'volume'))
+def obv(delta, volume):
+    """On-balance volume"""
+    return (np.sign(delta).fillna(0) * volume.astype(np.float64)).cumsum()
+
+
+@indicator('vwap_20', deps=('high', 'low', 'close', 'volume'))
+def vwap_20(high, low, close, volume):
+    """20-day volume-weighted average of the typical price (daily bars have no intraday session)"""
+    volume = volume.astype(np.float64)
+    weighted = _kernel(kernels.rolling_sum, 20)((high + low + close) / 3 * volume)
+    return weighted / _kernel(kernels.rolling_sum, 20)(volume).replace(0, np.nan)
+
+
+register('up_move', lambda high: high.diff(), deps=('high',), public=False)
+register('down_move', lambda low: -low.diff(), deps=('low',), public=False)
+
+
+@indicator('plus_di_14', deps=('up_move', 'down_move', 'atr_14'), public=False)
+def plus_di_14(up, down, atr):
+    plus_dm = up.where((up > down) & (up > 0), 0.0)
+    return 100 * _wilder(plus_dm) / atr
+
+
+@indicator('minus_di_14', deps=('up_move', 'down_move', 'atr_14'), public=False)
+def minus_di_14(up, down, atr):
+    minus_dm = down.where((down > up) & (down > 0), 0.0)
+    return 100 * _wilder(minus_dm) / atr
+
+
+@indicator('adx_14', deps=('plus_di_14', 'minus_di_14'))
+def adx_14(plus_di, minus_di):
+    """Average directional index (14)"""
+    dx = 100 * (plus_di - minus_di).abs() / (plus_di + minus_di).replace(0, np.nan)
+    return _wilder(dx)
@@ -0,0 +1,395 @@
+"""Rolling-window and EMA kernels behind the indicator registry.
+
+Every kernel works along axis 0 of a 1-D series or a 2-D (bars x symbols)
+array and returns float64 with pandas' semantics (NaN until a window holds
+``window`` valid values). Three interchangeable backends:
+
+    numba   compiled loops, used when numba is installed
+    numpy   vectorized NumPy (cumulative sums, sliding_window_view, chunked EMA)
+    pandas  DataFrame.rolling / ewm, the reference implementation
+
+INDICATOR_BACKEND selects one ('auto' prefers numba, then numpy);
+``python kernels.py`` benchmarks them.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from config import INDICATOR_BACKEND
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+BACKENDS = ('numba', 'numpy', 'pandas')
+
+# Largest growth factor (1 / decay ** n) allowed inside one EMA chunk. Rounding error
+# does not grow with it (partial sums are scaled back by decay ** n); it only has
+# to stay far from float64 overflow.
+_EMA_CHUNK_GROWTH = 1e100
+
+
+def _as_2d(x):
+    values = np.asarray(x, dtype=np.float64)
+    return values.reshape(len(values), -1)
+
+
+def _alpha(span=None, alpha=None):
+    if (span is None) == (alpha is None):
+        raise ValueError("Pass exactly one of span or alpha")
+    alpha = 2.0 / (span + 1) if span is not None else float(alpha)
+    if not 0 < alpha <= 1:
+        raise ValueError(f"EMA alpha must be in (0, 1], got {alpha}")
+    return alpha
+
+
+def _has_interior_nan(values):
+    """True when a column has a NaN after its first valid value"""
+    valid = ~np.isnan(values)
+    started = np.logical_or.accumulate(valid, axis=0)
+    return bool((started & ~valid).any())
+
+
+# --- pandas backend ---
+
+def _pandas_rolling(values, window, method):
+    return getattr(pd.DataFrame(values).rolling(window=window), method)().to_numpy()
+
+
+def _pandas_ema(values, alpha, adjust):
+    return pd.DataFrame(values).ewm(alpha=alpha, adjust=adjust).mean().to_numpy()
+
+
+_PANDAS = {
+    'rolling_sum': lambda values, window: _pandas_rolling(values, window, 'sum'),
+    'rolling_mean': lambda values, window: _pandas_rolling(values, window, 'mean'),
+    'rolling_std': lambda values, window: _pandas_rolling(values, window, 'std'),
+    'rolling_min': lambda values, window: _pandas_rolling(values, window, 'min'),
+    'rolling_max': lambda values, window: _pandas_rolling(values, window, 'max'),
+    'ema': _pandas_ema
+}
+
+
+# --- NumPy backend ---
+
+def _numpy_window_full(values, window):
+    """Mask of trailing windows without NaN (True when there is no NaN at all), and the values with NaN zeroed"""
+    valid = ~np.isnan(values)
+    if valid.all():
+        return True, values
+    counts = np.zeros((len(values) + 1, values.shape[1]), dtype=np.int64)
+    np.cumsum(valid, axis=0, out=counts[1:])
+    return (counts[window:] - counts[:-window]) == window, np.where(valid, values, 0.0)
+
+
+def _numpy_window_sum(filled, window):
+    """Trailing window sums of a NaN-free array (one cumulative sum)"""
+    sums = np.zeros((len(filled) + 1, filled.shape[1]))
+    np.cumsum(filled, axis=0, out=sums[1:])
+    return sums[window:] - sums[:-window]
+
+
+def _numpy_rolling_sum(values, window):
+    result = np.full(values.shape, np.nan)
+    if len(values) >= window:
+        full, filled = _numpy_window_full(values, window)
+        result[window - 1:] = np.where(full, _numpy_window_sum(filled, window), np.nan)
+    return result
+
+
+def _numpy_rolling_mean(values, window):
+    return _numpy_rolling_sum(values, window) / window
+
+
+def _numpy_rolling_std(values, window):
+    result = np.full(values.shape, np.nan)
+    if len(values) >= window and window > 1:
+        # Centering first keeps sum(x^2) - sum(x)^2 / n from cancelling catastrophically
+        with np.errstate(invalid='ignore'):
+            centered = values - np.nanmean(values, axis=0)
+        full, filled = _numpy_window_full(centered, window)
+        sums = _numpy_window_sum(filled, window)
+        squares = _numpy_window_sum(filled * filled, window)
+        variance = np.clip((squares - sums * sums / window) / (window - 1), 0, None)
+        result[window - 1:] = np.where(full, np.sqrt(variance), np.nan)
+    return result
+
+
+def _numpy_rolling_extreme(values, window, reducer):
+    result = np.full(values.shape, np.nan)
+    if len(values) >= window:
+        # (T - window + 1, N, window) strided view: no copy of the input
+        result[window - 1:] = reducer(sliding_window_view(values, window, axis=0), axis=-1)
+    return result
+
+
+def _numpy_recurrence(z, decay):
+    """y[t] = decay * y[t - 1] + z[t] along axis 0, vectorized in chunks.
+
+    Within a chunk the closed form y[j] = decay^j * (decay * carry + cumsum(z[k] / decay^k))
+    turns the loop into a cumulative sum; chunks are short enough that
+    1 / decay^k cannot overflow.
+    """
+    if decay <= 0:
+        return z.copy()
+    chunk = max(1, int(math.log(_EMA_CHUNK_GROWTH) / -math.log(decay))) if decay < 1 else len(z)
+    result = np.empty_like(z)
+    carry = np.zeros(z.shape[1])
+    for start in range(0, len(z), chunk):
+        block = z[start:start + chunk]
+        powers = decay ** np.arange(len(block))
+        result[start:start + len(block)] = (
+            np.cumsum(block / powers[:, None], axis=0) + decay * carry
+        ) * powers[:, None]
+        carry = result[start + len(block) - 1]
+    return result
+
+
+def _numpy_ema(values, alpha, adjust):
+    decay = 1.0 - alpha
+    if adjust and not np.isnan(values).any():
+        # Without leading NaNs the weight sum has a closed form: (1 - decay^(t+1)) / (1 - decay)
+        weights = (1 - decay ** np.arange(1, len(values) + 1)) / alpha
+        return _numpy_recurrence(values, decay) / weights[:, None]
+    valid = ~np.isnan(values)
+    started = np.logical_or.accumulate(valid, axis=0)
+    x = np.where(valid, values, 0.0)
+    if adjust:
+        numerator = _numpy_recurrence(x, decay)
+        denominator = _numpy_recurrence(started.astype(np.float64), decay)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result = numerator / denominator
+    else:
+        first = started & ~np.vstack([np.zeros((1, values.shape[1]), dtype=bool), started[:-1]])
+        result = _numpy_recurrence(np.where(first, x, alpha * x), decay)
+    return np.where(started, result, np.nan)
+
+
+_NUMPY = {
+    'rolling_sum': _numpy_rolling_sum,
+    'rolling_mean': _numpy_rolling_mean,
+    'rolling_std': _numpy_rolling_std,
+    'rolling_min': lambda values, window: _numpy_rolling_extreme(values, window, np.min),
+    'rolling_max': lambda values, window: _numpy_rolling_extreme(values, window, np.max),
+    'ema': _numpy_ema
+}
+
+
+# --- numba backend ---
+
+_NUMBA = None
+
+if njit is not None:
+    # The compiled loops walk one series at a time, so they take and return
+    # (symbols x bars) arrays whose rows are contiguous in memory
+
+    @njit(cache=True)
+    def _numba_rolling_moments(values, window, order):
+        """Trailing window sum (order 1) or sample std (order 2) per series"""
+        cols, rows = values.shape
+        result = np.full((cols, rows), np.nan)
+        for j in range(cols):
+            center = 0.0
+            if order == 2:
+                total, count = 0.0, 0
+                for i in range(rows):
+                    if not np.isnan(values[j, i]):
+                        total += values[j, i]
+                        count += 1
+                center = total / count if count else 0.0
+            s1, s2, valid = 0.0, 0.0, 0
+            for i in range(rows):
+                x = values[j, i]
+                if not np.isnan(x):
+                    x -= center
+                    s1 += x
+                    s2 += x * x
+                    valid += 1
+                if i >= window:
+                    old = values[j, i - window]
+                    if not np.isnan(old):
+                        old -= center
+                        s1 -= old
+                        s2 -= old * old
+                        valid -= 1
+                if i >= window - 1 and valid == window:
+                    if order == 1:
+                        result[j, i] = s1
+                    elif window > 1:
+                        result[j, i] = math.sqrt(max((s2 - s1 * s1 / window) / (window - 1), 0.0))
+        return result
+
+    @njit(cache=True)
+    def _numba_rolling_extreme(values, window, is_max):
+        cols, rows = values.shape
+        result = np.full((cols, rows), np.nan)
+        for j in range(cols):
+            missing = 0  # NaNs in the current window
+            for i in range(rows):
+                if np.isnan(values[j, i]):
+                    missing += 1
+                if i >= window and np.isnan(values[j, i - window]):
+                    missing -= 1
+                if i < window - 1 or missing:
+                    continue
+                best = values[j, i]
+                for k in range(i - window + 1, i):
+                    x = values[j, k]
+                    if (x > best) if is_max else (x < best):
+                        best = x
+                result[j, i] = best
+        return result
+
+    @njit(cache=True)
+    def _numba_ema(values, alpha, adjust):
+        cols, rows = values.shape
+        decay = 1.0 - alpha
+        result = np.full((cols, rows), np.nan)
+        for j in range(cols):
+            numerator, denominator, started = 0.0, 0.0, False
+            for i in range(rows):
+                x = values[j, i]
+                if not started:
+                    if np.isnan(x):
+                        continue
+                    started = True
+                    numerator, denominator = x, 1.0
+                elif adjust:
+                    numerator = numerator * decay + x
+                    denominator = denominator * decay + 1.0
+                else:
+                    numerator = numerator * decay + alpha * x
+                result[j, i] = numerator / denominator
+        return result
+
+    def _by_series(kernel):
+        return lambda values, *args: kernel(np.ascontiguousarray(values.T), *args).T
+
+    _NUMBA = {
+        'rolling_sum': lambda values, window: _by_series(_numba_rolling_moments)(values, window, 1),
+        'rolling_mean': lambda values, window: _by_series(_numba_rolling_moments)(values, window, 1) / window,
+        'rolling_std': lambda values, window: _by_series(_numba_rolling_moments)(values, window, 2),
+        'rolling_min': lambda values, window: _by_series(_numba_rolling_extreme)(values, window, False),
+        'rolling_max': lambda values, window: _by_series(_numba_rolling_extreme)(values, window, True),
+        'ema': _by_series(_numba_ema)
+    }
+
+
+_IMPLEMENTATIONS = {'numba': _NUMBA, 'numpy': _NUMPY, 'pandas': _PANDAS}
+
+
+def resolve_backend(name):
+    """Backend actually used for a configured name ('auto' -> numba when installed, else numpy)"""
+    name = (name or 'auto').lower()
+    if name == 'auto':
+        return 'numba' if _NUMBA is not None else 'numpy'
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown indicator backend: {name!r} (expected auto, {', '.join(BACKENDS)})")
+    if name == 'numba' and _NUMBA is None:
+        print("numba is not installed, falling back to the NumPy indicator backend")
+        return 'numpy'
+    return name
+
+
+_backend = resolve_backend(INDICATOR_BACKEND)
+
+
+def get_backend():
+    return _backend
+
+
+def set_backend(name):
+    """Switch backends at runtime (e.g. for benchmarks); returns the backend in use"""
+    global _backend
+    _backend = resolve_backend(name)
+    return _backend
+
+
+def _run(kernel, x, *args):
+    values = _as_2d(x)
+    return _IMPLEMENTATIONS[_backend][kernel](values, *args).reshape(np.shape(x))
+
+
+def rolling_sum(x, window):
+    return _run('rolling_sum', x, window)
+
+
+def rolling_mean(x, window):
+    return _run('rolling_mean', x, window)
+
+
+def rolling_std(x, window):
+    """Sample standard deviation (ddof=1), like Series.rolling().std()"""
+    return _run('rolling_std', x, window)
+
+
+def rolling_min(x, window):
+    return _run('rolling_min', x, window)
+
+
+def rolling_max(x, window):
+    return _run('rolling_max', x, window)
+
+
+def ema(x, span=None, alpha=None, adjust=True):
+    """Exponential moving average matching Series.ewm(span=..., adjust=...).mean().
+
+    Leading NaNs are skipped; series with gaps after their first value use
+    pandas, whose NaN weighting the compiled and NumPy kernels don't replicate.
+    """
+    alpha = _alpha(span, alpha)
+    values = _as_2d(x)
+    backend = 'pandas' if _has_interior_nan(values) else _backend
+    return _IMPLEMENTATIONS[backend]['ema'](values, alpha, adjust).reshape(np.shape(x))
+
+
+def rsi(close, window=14, wilder=False):
+    """RSI from simple rolling means of gains and losses (as in the dashboard), or Wilder's smoothing"""
+    values = _as_2d(close)
+    delta = np.full(values.shape, np.nan)
+    delta[1:] = values[1:] - values[:-1]
+    # Like pandas' delta.where(delta > 0, 0), an undefined delta counts as 0
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    if wilder:
+        gain, loss = ema(gain, alpha=1.0 / window, adjust=False), ema(loss, alpha=1.0 / window, adjust=False)
+    else:
+        gain, loss = rolling_mean(gain, window), rolling_mean(loss, window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (100 - 100 / (1 + gain / loss)).reshape(np.shape(close))
+
+
+if __name__ == "__main__":
+    import time
+
+    def timed(func, repeat=3):
+        func()  # warm-up (numba compiles on first call)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        return (time.perf_counter() - start) / repeat * 1000
+
+    rng = np.random.default_rng(0)
+    shapes = {'long (50y x 1)': (252 * 50, 1), 'wide (10y x 500)': (252 * 10, 500)}
+    kernels = {
+        'rolling_mean(20)': lambda x: rolling_mean(x, 20),
+        'rolling_std(20)': lambda x: rolling_std(x, 20),
+        'rolling_max(14)': lambda x: rolling_max(x, 14),
+        'ema(span=26)': lambda x: ema(x, span=26),
+        'rsi(14)': lambda x: rsi(x, 14)
+    }
+    backends = [name for name in BACKENDS if _IMPLEMENTATIONS[name] is not None]
+
+    for label, shape in shapes.items():
+        data = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, size=shape), axis=0))
+        print(f"\n{label}: " + "  ".join(f"{name:>9s}" for name in backends))
+        for kernel_name, kernel in kernels.items():
+            timings = []
+            for name in backends:
+                set_backend(name)
+                timings.append(timed(lambda: kernel(data)))
+            print(f"{kernel_name:18s}" + "  ".join(f"{ms:7.1f}ms" for ms in timings)
+                  + f"   x{timings[-1] / min(timings):.1f} vs pandas")
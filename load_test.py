@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Load test for the HTTP API: requests per second and latency percentiles.
+
+    python api_server.py &
+    python load_test.py --concurrency 200 --duration 15
+    python load_test.py --path /v1/indicators/NVDA --path /v1/quotes?symbols=AAPL,MSFT
+"""
+
+import argparse
+import asyncio
+import itertools
+import time
+
+import aiohttp
+import numpy as np
+
+DEFAULT_PATHS = ['/v1/quote/AAPL', '/v1/quote/MSFT', '/v1/indicators/NVDA', '/v1/quotes?symbols=AAPL,MSFT,NVDA']
+
+
+async def _client(session, base_url, paths, deadline, latencies, errors):
+    for path in paths:
+        if time.perf_counter() >= deadline:
+            return
+        started = time.perf_counter()
+        try:
+            async with session.get(base_url + path) as response:
+                await response.read()
+                if response.status >= 400:
+                    errors.append(response.status)
+                    continue
+        except aiohttp.ClientError as e:
+            errors.append(type(e).__name__)
+            continue
+        latencies.append(time.perf_counter() - started)
+
+
+async def run(base_url, paths, concurrency, duration, warmup=True):
+    """Run concurrency clients for duration seconds; returns (latencies, errors, elapsed)"""
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        if warmup:
+            # Populate the server's caches so the test measures steady state
+            for path in paths:
+                async with session.get(base_url + path) as response:
+                    await response.read()
+
+        latencies, errors = [], []
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*(
+            _client(session, base_url, itertools.islice(itertools.cycle(paths), i, None), deadline, latencies, errors)
+            for i in range(concurrency)
+        ))
+        return latencies, errors, time.perf_counter() - started
+
+
+def report(latencies, errors, elapsed, concurrency):
+    total = len(latencies) + len(errors)
+    print(f"Clients: {concurrency}, duration: {elapsed:.1f}s, requests: {total}, errors: {len(errors)}")
+    if latencies:
+        p50, p90, p99 = np.percentile(latencies, [50, 90, 99]) * 1000
+        print(f"Throughput: {len(latencies) / elapsed:.0f} req/s")
+        print(f"Latency: p50 {p50:.1f} ms, p90 {p90:.1f} ms, p99 {p99:.1f} ms, max {max(latencies) * 1000:.1f} ms")
+    if errors:
+        counts = {}
+        for error in errors:
+            counts[error] = counts.get(error, 0) + 1
+        print("Errors: " + ', '.join(f"{error} x{count}" for error, count in counts.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP API load test")
+    parser.add_argument('--url', default='http://127.0.0.1:8080', help="API base URL")
+    parser.add_argument('--path', action='append', help="request path (repeatable, round-robin)")
+    parser.add_argument('-c', '--concurrency', type=int, default=100, help="concurrent clients")
+    parser.add_argument('-d', '--duration', type=float, default=10, help="seconds to run")
+    parser.add_argument('--no-warmup', action='store_true', help="don't prime the server caches first")
+    args = parser.parse_args()
+
+    latencies, errors, elapsed = asyncio.run(
+        run(args.url.rstrip('/'), args.path or DEFAULT_PATHS, args.concurrency, args.duration, not args.no_warmup)
+    )
+    report(latencies, errors, elapsed, args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,25 @@
 import requests
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import random
 import time
 
+from config import NEWS_QUERY_MAX_CHARS, NEWS_INGEST_INTERVAL, NEWS_RETENTION_DAYS
+from entity_matcher import EntityMatcher, company_aliases
+from news_index import NewsIndex, get_news_index
+from news_store import get_news_store
+from sentiment import get_sentiment_scorer
+from singleflight import SingleFlight
+
+# Concurrent identical news queries share one request
+_news_flights = SingleFlight()
+
 class NewsCollector:
-    def __init__(self):
+    def __init__(self, store=None):
+        # Local deduplicated article store (None when disabled)
+        self.store = store if store is not None else get_news_store()
+        # In-process inverted index mirroring the store, for local search
+        self.index = get_news_index(self.store) if self.store is not None else None
+        
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
@@ -17,14 +32,19 @@ class NewsCollector:
             'marketwatch': 'https://www.marketwatch.com'
         }
     
-    def search_news(self, query, max_results=10, use_mock=False):
+    def search_news(self, query, max_results=10, use_mock=False, days=None):
         """Search for news articles"""
         if use_mock:
             return self._get_mock_news(query, max_results)
         
         # Always try to get real news first
         try:
-            news_data = self._search_real_news(query, max_results)
+            if self.index is not None:
+                # Pull newer articles into the store, then answer from the local index
+                self.ingest(query)
+                news_data = self._search_index(query, max_results, days=days)
+            else:
+                news_data = self._search_real_news(query, max_results)
             if news_data:
                 return news_data
         except Exception as e:
@@ -49,7 +69,22 @@ class NewsCollector:
         # Fallback to curated real news
         return self._get_curated_real_news("tech market stocks", max_results)
     
-    def get_stock_specific_news(self, symbol, company_name, max_results=10, use_mock=False):
+    def get_todays_news(self, query="tech market stocks"):
+        """Every stored article published since local midnight, newest first, after ingesting query.
+
+        This is the input of the day's rolling market summary. Returns []
+        without a store or when nothing was stored today.
+        """
+        if self.store is None:
+            return []
+        try:
+            self.ingest(query)
+        except Exception as e:
+            print(f"Error ingesting market news: {e}")
+        start_of_day = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        return self.store.get_recent_news(max_results=self.store.count(), since=start_of_day)
+    
+    def get_stock_specific_news(self, symbol, company_name, max_results=10, use_mock=False, days=None):
         """Get stock-specific news"""
         if use_mock:
             return self._get_mock_stock_news(symbol, company_name, max_results)
@@ -57,17 +92,177 @@ class NewsCollector:
         # Always try to get real stock news first
         try:
             query = f"{symbol} {company_name} stock"
-            news_data = self._search_real_news(query, max_results)
+            if self.store is not None:
+                # Pull only newer articles, then answer from the local index
+                self.ingest(query, symbols=[symbol])
+                self.index.watch({symbol: company_name})
+                news_data = self._search_index(f"{symbol} {company_name}", max_results, days=days, symbol=symbol)
+            else:
+                news_data = self._search_real_news(query, max_results)
             if news_data:
                 return news_data
         except Exception as e:
             print(f"Error fetching real stock news: {e}")
         
-        # Fallback to curated real news
+        # Fallback to mock news (marked 'mock': True)
         return self._get_mock_stock_news(symbol, company_name, max_results)
     
+    def get_news_for_symbols(self, symbols, max_results=10, use_mock=False):
+        """Get news for many stocks in one network pass.
+
+        ``symbols`` maps ticker -> company name (e.g. ``StockDataFetcher.stock_info``).
+        A few combined OR-queries cover the whole universe and each article is
+        routed to every symbol it mentions. Returns {symbol: [articles]}.
+        """
+        if use_mock:
+            return {
+                symbol: self._get_mock_stock_news(symbol, name, max_results)
+                for symbol, name in symbols.items()
+            }
+        
+        matcher = EntityMatcher(symbols)
+        news_by_symbol = {}
+        if self.store is not None:
+            for query in self._build_batch_queries(symbols):
+                self.ingest(query, matcher=matcher)
+            self.index.watch(symbols)
+            for symbol, name in symbols.items():
+                news_by_symbol[symbol] = self._search_index(f"{symbol} {name}", max_results, symbol=symbol)
+        else:
+            articles = []
+            for query in self._build_batch_queries(symbols):
+                try:
+                    articles.extend(self._search_real_news(query, 100))  # NewsAPI max page size
+                except Exception as e:
+                    print(f"Error fetching batched news: {e}")
+            
+            for symbol, routed in matcher.route(articles).items():
+                # Drop duplicates returned by several queries, newest first
+                unique = {news['link'] or news['title']: news for news in routed}
+                news_by_symbol[symbol] = sorted(
+                    unique.values(), key=lambda news: news['date'].timestamp(), reverse=True
+                )[:max_results]
+        
+        # Fallback for symbols nobody wrote about
+        for symbol, name in symbols.items():
+            if not news_by_symbol.get(symbol):
+                news_by_symbol[symbol] = self._get_mock_stock_news(symbol, name, max_results)
+        
+        return news_by_symbol
+    
+    def get_sentiment_by_symbol(self, symbols, days=7, use_mock=False):
+        """Local lexicon sentiment per symbol, without LLM calls.
+
+        ``symbols`` maps ticker -> company name. Returns
+        {symbol: (score, article_count, is_mock)} with scores in (-1, 1).
+        Stored articles are scored in batch and aggregated per day; symbols
+        without stored news fall back to their mock news (is_mock=True).
+        """
+        scorer = get_sentiment_scorer()
+        sentiment = {}
+        if not use_mock and self.store is not None:
+            self.store.score_pending(scorer)
+            daily = self.store.get_daily_sentiment(list(symbols), since=time.time() - days * 86400)
+            if not daily.empty:
+                daily['weighted'] = daily['sentiment'] * daily['articles']
+                totals = daily.groupby('symbol')[['weighted', 'articles']].sum()
+                for symbol, row in totals.iterrows():
+                    sentiment[symbol] = (row['weighted'] / row['articles'], int(row['articles']), False)
+        
+        missing = [symbol for symbol in symbols if symbol not in sentiment]
+        if missing:
+            # Score all fallback articles in one vectorized batch
+            news_lists = [self._get_mock_stock_news(symbol, symbols[symbol], 10) for symbol in missing]
+            scores = scorer.score_articles([news for news_list in news_lists for news in news_list])
+            offset = 0
+            for symbol, news_list in zip(missing, news_lists):
+                chunk = scores[offset:offset + len(news_list)]
+                offset += len(news_list)
+                sentiment[symbol] = (float(chunk.mean()) if len(chunk) else 0.0, len(chunk), True)
+        return sentiment
+    
+    def score_news(self, news_data):
+        """Mean local sentiment score of a list of articles"""
+        if not news_data:
+            return 0.0
+        return float(get_sentiment_scorer().score_articles(news_data).mean())
+    
+    def _build_batch_queries(self, symbols):
+        """Pack ticker/company terms into as few OR-queries as the query length limit allows"""
+        queries = []
+        current = []
+        for symbol, name in symbols.items():
+            short_name = company_aliases(name)[-1]
+            term = f'"{symbol}" OR "{short_name}"' if short_name.lower() != symbol.lower() else f'"{symbol}"'
+            candidate = ' OR '.join(current + [term])
+            if current and len(candidate) > NEWS_QUERY_MAX_CHARS:
+                queries.append(' OR '.join(current))
+                current = [term]
+            else:
+                current.append(term)
+        if current:
+            queries.append(' OR '.join(current))
+        return queries
+    
     def _search_real_news(self, query, max_results):
-        """Search for real news articles using NewsAPI"""
+        """Search for real news articles, coalescing concurrent identical queries"""
+        return _news_flights.do((query, max_results), self._fetch_real_news, query, max_results)
+    
+    def _search_index(self, query, max_results, days=None, symbol=None):
+        """Search the local inverted index, optionally within the last `days` days"""
+        start = time.time() - days * 86400 if days else None
+        return self.index.search(query, top_k=max_results, start=start, symbol=symbol)
+    
+    def ingest(self, query, symbols=(), matcher=None, max_results=100, force=False):
+        """Incrementally pull articles newer than the query's watermark into the local store.
+
+        Articles are tagged with ``symbols`` and, when a matcher is given, with
+        every symbol they mention. Returns the number of new articles.
+        """
+        if self.store is None:
+            return 0
+        return _news_flights.do(
+            ('ingest', query), self._ingest, query, tuple(symbols), matcher, max_results, force
+        )
+    
+    def _ingest(self, query, symbols, matcher, max_results, force):
+        last_published_at, last_checked_at = self.store.get_ingest_state(query)
+        if not force and last_checked_at and time.time() - last_checked_at < NEWS_INGEST_INTERVAL:
+            return 0
+        
+        since = datetime.fromtimestamp(last_published_at + 1, tz=timezone.utc) if last_published_at else None
+        articles = self._fetch_newsapi(query, max_results, since=since)
+        if articles is None:
+            return 0  # Keep the watermark so the next call retries
+        
+        inserted = self.store.add_articles(articles, symbols)
+        if self.index is not None:
+            self.index.add_many(articles, symbols)
+        if matcher is not None:
+            for symbol, routed in matcher.route(articles).items():
+                self.store.add_articles(routed, [symbol])
+                if self.index is not None:
+                    self.index.add_many(routed, [symbol])
+        
+        newest = max((article['date'].timestamp() for article in articles), default=last_published_at)
+        self.store.set_ingest_state(query, newest)
+        if inserted:
+            self.store.prune()
+            if self.index is not None:
+                self.index.remove_older_than(time.time() - NEWS_RETENTION_DAYS * 86400)
+        return inserted
+    
+    def _fetch_real_news(self, query, max_results):
+        """Fetch real news articles, falling back to curated news"""
+        news_list = self._fetch_newsapi(query, max_results)
+        if news_list is not None:
+            return news_list
+        
+        # Fallback to curated real news links
+        return self._get_curated_real_news(query, max_results)
+    
+    def _fetch_newsapi(self, query, max_results, since=None):
+        """Fetch articles from NewsAPI (only those published after `since` if given); None on failure"""
         try:
             # Using NewsAPI (free tier available)
             # You can get a free API key from https://newsapi.org/
@@ -81,6 +276,8 @@ class NewsCollector:
                 'sortBy': 'publishedAt',
                 'pageSize': max_results
             }
+            if since is not None:
+                params['from'] = since.strftime('%Y-%m-%dT%H:%M:%S')
             
             response = requests.get(base_url, params=params, timeout=10)
             
@@ -104,8 +301,7 @@ class NewsCollector:
         except Exception as e:
             print(f"Error fetching real news: {e}")
         
-        # Fallback to curated real news links
-        return self._get_curated_real_news(query, max_results)
+        return None
     
     def _get_curated_real_news(self, query, max_results):
         """Get curated real news with actual working links"""
@@ -162,15 +358,12 @@ class NewsCollector:
             }
         ]
         
-        # Filter news based on query keywords
-        filtered_news = []
-        query_lower = query.lower()
-        
-        for news in real_news:
-            if any(keyword in query_lower for keyword in ['tech', 'stock', 'market', 'ai', 'apple', 'microsoft', 'google', 'tesla', 'nvidia', 'amazon']):
-                filtered_news.append(news)
+        # Rank curated news against the query (titles, summaries and company aliases)
+        curated_index = NewsIndex()
+        curated_index.add_many(real_news)
+        filtered_news = curated_index.search(query, top_k=max_results)
         
-        return filtered_news[:max_results] if filtered_news else real_news[:max_results]
+        return filtered_news if filtered_news else real_news[:max_results]
     
     def _get_mock_news(self, query, max_results):
         """Get mock news data"""
@@ -243,7 +436,7 @@ class NewsCollector:
         return mock_tech_news[:max_results]
     
     def _get_mock_stock_news(self, symbol, company_name, max_results):
-        """Get mock stock-specific news"""
+        """Get mock stock-specific news (every article is marked 'mock': True)"""
         stock_news_templates = {
             'AAPL': [
                 {
@@ -346,11 +539,9 @@ class NewsCollector:
         # Get specific news for the stock, or use generic news
         specific_news = stock_news_templates.get(symbol, [])
         
-        if specific_news:
-            return specific_news[:max_results]
-        else:
+        if not specific_news:
             # Generic stock news
-            return [
+            specific_news = [
                 {
                     'title': f'{company_name} Stock Shows Strong Performance',
                     'source': 'Yahoo Finance',
@@ -365,4 +556,6 @@ class NewsCollector:
                     'summary': f'{company_name} has announced new strategic initiatives aimed at driving future growth and market expansion.',
                     'link': f'https://www.marketwatch.com/investing/stock/{symbol.lower()}'
                 }
-            ][:max_results]
+            ]
+        
+        return [dict(news, mock=True) for news in specific_news[:max_results]]
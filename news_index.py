@@ -0,0 +1,223 @@
+import heapq
+import math
+import re
+import threading
+import time
+import weakref
+
+from config import NEWS_RECENCY_HALF_LIFE_DAYS, STOCK_NAMES
+from entity_matcher import EntityMatcher
+from news_store import title_hash
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+_STOPWORDS = frozenset(
+    'a an and are as at be by for from has have in is it its of on or that the to was were will with'.split()
+)
+
+# BM25 parameters
+_K1 = 1.2
+_B = 0.75
+# Title terms count this many times relative to summary terms
+_TITLE_WEIGHT = 2
+
+
+def tokenize(text):
+    """Lowercase word tokens without stopwords"""
+    return [token for token in _TOKEN.findall((text or '').lower()) if token not in _STOPWORDS]
+
+
+def _entity_token(symbol):
+    # '$' can never come out of the tokenizer, so entity tokens don't collide with words
+    return '$' + symbol.lower()
+
+
+def _epoch(date):
+    return date if isinstance(date, (int, float)) else date.timestamp()
+
+
+class NewsIndex:
+    """In-process inverted index over article titles and summaries.
+
+    Besides word tokens every article is indexed under an entity token for
+    each ticker it mentions (found by EntityMatcher over tickers, company
+    names and aliases) and for each symbol it was tagged with at ingest,
+    and queries are expanded the same way, so 'AAPL', 'Apple' and
+    'Apple Inc.' all hit the same articles. ``watch`` adds tickers beyond
+    the configured ones. Results are ranked by BM25 times an exponential
+    recency weight, optionally restricted to a date range and a symbol,
+    and cut to the top k.
+    """
+
+    def __init__(self, stock_info=STOCK_NAMES, half_life_days=NEWS_RECENCY_HALF_LIFE_DAYS):
+        self.stock_info = dict(stock_info)
+        self.matcher = EntityMatcher(self.stock_info)
+        self.half_life = half_life_days * 86400
+        self._postings = {}   # token -> {doc_id: term frequency}
+        self._docs = {}       # doc_id -> article
+        self._dates = {}      # doc_id -> published epoch seconds
+        self._lengths = {}    # doc_id -> weighted token count
+        self._doc_tokens = {}  # doc_id -> tokens, for removal
+        self._keys = {}       # normalized title hash -> doc_id
+        self._total_length = 0
+        self._next_id = 0
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._docs)
+
+    def add(self, article, symbols=()):
+        """Index an article tagged with symbols; a duplicate (same normalized title) only gains the tags.
+
+        Returns the doc id.
+        """
+        key = title_hash(article['title'])
+        with self._lock:
+            if key in self._keys:
+                doc_id = self._keys[key]
+                self._tag(doc_id, symbols)
+                return doc_id
+
+            doc_id = self._next_id
+            self._next_id += 1
+
+            terms = {}
+            for token in tokenize(article['title']):
+                terms[token] = terms.get(token, 0) + _TITLE_WEIGHT
+            for token in tokenize(article.get('summary')):
+                terms[token] = terms.get(token, 0) + 1
+            text = f"{article['title']}\n{article.get('summary') or ''}"
+            for symbol in self.matcher.match(text) | set(symbols):
+                terms[_entity_token(symbol)] = _TITLE_WEIGHT
+
+            for token, tf in terms.items():
+                self._postings.setdefault(token, {})[doc_id] = tf
+            length = sum(terms.values())
+            self._docs[doc_id] = article
+            self._dates[doc_id] = _epoch(article['date'])
+            self._lengths[doc_id] = length
+            self._doc_tokens[doc_id] = tuple(terms)
+            self._keys[key] = doc_id
+            self._total_length += length
+            return doc_id
+
+    def add_many(self, articles, symbols=()):
+        for article in articles:
+            self.add(article, symbols)
+
+    def watch(self, stock_info):
+        """Also recognize these tickers/company names, in queries and in already indexed articles"""
+        with self._lock:
+            new = {symbol: name for symbol, name in stock_info.items() if symbol not in self.stock_info}
+            if not new:
+                return
+            self.stock_info.update(new)
+            self.matcher = EntityMatcher(self.stock_info)
+            matcher = EntityMatcher(new)
+            for doc_id, article in self._docs.items():
+                self._tag(doc_id, matcher.match(f"{article['title']}\n{article.get('summary') or ''}"))
+
+    def _tag(self, doc_id, symbols):
+        tokens = [token for token in map(_entity_token, symbols) if doc_id not in self._postings.get(token, ())]
+        for token in tokens:
+            self._postings.setdefault(token, {})[doc_id] = _TITLE_WEIGHT
+        if tokens:
+            self._doc_tokens[doc_id] += tuple(tokens)
+            self._lengths[doc_id] += _TITLE_WEIGHT * len(tokens)
+            self._total_length += _TITLE_WEIGHT * len(tokens)
+
+    def remove(self, doc_id):
+        with self._lock:
+            article = self._docs.pop(doc_id, None)
+            if article is None:
+                return
+            for token in self._doc_tokens.pop(doc_id):
+                postings = self._postings[token]
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[token]
+            del self._dates[doc_id]
+            self._total_length -= self._lengths.pop(doc_id)
+            self._keys.pop(title_hash(article['title']), None)
+
+    def remove_older_than(self, cutoff):
+        """Drop articles published before cutoff (datetime or epoch seconds)"""
+        cutoff = _epoch(cutoff)
+        with self._lock:
+            for doc_id in [doc_id for doc_id, date in self._dates.items() if date < cutoff]:
+                self.remove(doc_id)
+
+    def query_tokens(self, query):
+        """Word tokens plus entity tokens for every ticker/company the query mentions"""
+        tokens = set(tokenize(query))
+        tokens.update(_entity_token(symbol) for symbol in self.matcher.match(query))
+        # Bare lowercase tickers ('aapl') in free-text queries
+        tokens.update(
+            token for token in (_entity_token(t) for t in tokenize(query)) if token in self._postings
+        )
+        return tokens
+
+    def search(self, query, top_k=10, start=None, end=None, symbol=None):
+        """Top-k articles for query ranked by BM25 x recency, within [start, end] and for symbol if given"""
+        start = _epoch(start) if start is not None else None
+        end = _epoch(end) if end is not None else None
+        now = time.time()
+
+        with self._lock:
+            required = self._postings.get(_entity_token(symbol), {}) if symbol else None
+            tokens = self.query_tokens(query)
+            n_docs = len(self._docs)
+            if not n_docs:
+                return []
+            avg_length = self._total_length / n_docs
+
+            scores = {}
+            for token in tokens:
+                postings = self._postings.get(token)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    norm = _K1 * (1 - _B + _B * self._lengths[doc_id] / avg_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (_K1 + 1) / (tf + norm)
+
+            # An empty or unmatched query returns the most recent articles of the filtered set
+            candidates = scores.keys() if scores else (required.keys() if required is not None else self._docs.keys())
+
+            ranked = []
+            for doc_id in candidates:
+                if required is not None and doc_id not in required:
+                    continue
+                date = self._dates[doc_id]
+                if (start is not None and date < start) or (end is not None and date > end):
+                    continue
+                recency = 0.5 ** (max(now - date, 0) / self.half_life)
+                ranked.append(((scores.get(doc_id, 1.0)) * recency, doc_id))
+
+            top = heapq.nlargest(top_k, ranked)
+            return [self._docs[doc_id] for _, doc_id in top]
+
+
+_indexes = weakref.WeakKeyDictionary()  # NewsStore -> NewsIndex
+_index_lock = threading.Lock()
+
+
+def load_index(store, index=None):
+    """Index every stored article with its symbol tags"""
+    index = index if index is not None else NewsIndex()
+    articles = store.get_recent_news(max_results=store.count())
+    tags = store.get_symbols_for([article['id'] for article in articles])
+    for article in articles:
+        index.add(article, tags.get(article['id'], ()))
+    return index
+
+
+def get_news_index(store):
+    """Return the NewsIndex mirroring store, loaded from it on first use (one per store per process)"""
+    index = _indexes.get(store)
+    if index is None:
+        with _index_lock:
+            index = _indexes.get(store)
+            if index is None:
+                index = load_index(store)
+                _indexes[store] = index
+    return index
@@ -0,0 +1,258 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from config import NEWS_DB_PATH, NEWS_RETENTION_DAYS, NEWS_MAX_ARTICLES
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    url TEXT,
+    title_hash TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    source TEXT,
+    summary TEXT,
+    published_at REAL NOT NULL,
+    ingested_at REAL NOT NULL,
+    sentiment REAL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS articles_url ON articles(url) WHERE url IS NOT NULL;
+CREATE INDEX IF NOT EXISTS articles_published ON articles(published_at);
+CREATE TABLE IF NOT EXISTS article_symbols (
+    symbol TEXT NOT NULL,
+    article_id INTEGER NOT NULL REFERENCES articles(id) ON DELETE CASCADE,
+    PRIMARY KEY (symbol, article_id)
+);
+CREATE TABLE IF NOT EXISTS ingest_state (
+    query TEXT PRIMARY KEY,
+    last_published_at REAL,
+    last_checked_at REAL
+);
+CREATE TABLE IF NOT EXISTS market_summaries (
+    scope TEXT PRIMARY KEY,
+    summary TEXT NOT NULL,
+    seen TEXT NOT NULL,
+    article_count INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+# Trailing " - Reuters" / " | CNBC" added by aggregators to syndicated titles
+_TITLE_SOURCE_SUFFIX = re.compile(r'\s+[-|–]\s+[^-|–]{1,40}$')
+_NON_WORD = re.compile(r'[^a-z0-9]+')
+
+
+def title_hash(title):
+    """Hash of the normalized title, shared by syndicated copies of the same story"""
+    normalized = _TITLE_SOURCE_SUFFIX.sub('', title.strip()).lower()
+    normalized = _NON_WORD.sub(' ', normalized).strip()
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+
+def _to_epoch(date):
+    return date.timestamp() if isinstance(date, datetime) else float(date)
+
+
+class NewsStore:
+    """Local deduplicated article store backed by SQLite.
+
+    Articles are unique by URL and by normalized-title hash, so the same
+    story syndicated by several outlets is stored once. Per-query watermarks
+    let ingestion request only articles newer than the last seen
+    ``publishedAt``; ``prune`` bounds retention by age and row count.
+    """
+
+    def __init__(self, path=NEWS_DB_PATH):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.executescript(_SCHEMA)
+        columns = {row['name'] for row in self._conn.execute("PRAGMA table_info(articles)")}
+        if 'sentiment' not in columns:
+            # Stores created before sentiment scoring existed
+            self._conn.execute("ALTER TABLE articles ADD COLUMN sentiment REAL")
+        self._lock = threading.Lock()
+
+    def add_articles(self, articles, symbols=()):
+        """Insert articles (skipping duplicates) and tag them with symbols; returns the number of new articles"""
+        inserted = 0
+        now = time.time()
+        with self._lock, self._conn:
+            for article in articles:
+                digest = title_hash(article['title'])
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO articles "
+                    "(url, title_hash, title, source, summary, published_at, ingested_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (article.get('link'), digest, article['title'], article.get('source'),
+                     article.get('summary'), _to_epoch(article['date']), now)
+                )
+                inserted += cursor.rowcount
+                if symbols:
+                    row = self._conn.execute(
+                        "SELECT id FROM articles WHERE title_hash = ? OR url = ?",
+                        (digest, article.get('link'))
+                    ).fetchone()
+                    self._conn.executemany(
+                        "INSERT OR IGNORE INTO article_symbols (symbol, article_id) VALUES (?, ?)",
+                        [(symbol, row['id']) for symbol in symbols]
+                    )
+        return inserted
+
+    def get_ingest_state(self, query):
+        """Return (last_published_at, last_checked_at) epoch seconds for a query, or (None, None)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT last_published_at, last_checked_at FROM ingest_state WHERE query = ?", (query,)
+            ).fetchone()
+        return (row['last_published_at'], row['last_checked_at']) if row else (None, None)
+
+    def set_ingest_state(self, query, last_published_at, last_checked_at=None):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO ingest_state (query, last_published_at, last_checked_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(query) DO UPDATE SET last_published_at = excluded.last_published_at, "
+                "last_checked_at = excluded.last_checked_at",
+                (query, last_published_at, last_checked_at or time.time())
+            )
+
+    def get_symbol_news(self, symbol, max_results=10, since=None):
+        """Newest articles tagged with symbol"""
+        return self._query(
+            "SELECT a.* FROM articles a JOIN article_symbols s ON s.article_id = a.id "
+            "WHERE s.symbol = ? AND a.published_at >= ? ORDER BY a.published_at DESC LIMIT ?",
+            (symbol, _to_epoch(since) if since else 0, max_results)
+        )
+
+    def get_recent_news(self, max_results=100, since=None):
+        """Newest articles across all symbols"""
+        return self._query(
+            "SELECT * FROM articles WHERE published_at >= ? ORDER BY published_at DESC LIMIT ?",
+            (_to_epoch(since) if since else 0, max_results)
+        )
+
+    def get_symbols_for(self, article_ids):
+        """Map article id -> list of tagged symbols"""
+        if not article_ids:
+            return {}
+        article_ids = list(article_ids)
+        symbols = {}
+        # Chunked to stay under SQLite's bound-parameter limit
+        for i in range(0, len(article_ids), 500):
+            chunk = article_ids[i:i + 500]
+            placeholders = ','.join('?' * len(chunk))
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT article_id, symbol FROM article_symbols WHERE article_id IN ({placeholders})",
+                    chunk
+                ).fetchall()
+            for row in rows:
+                symbols.setdefault(row['article_id'], []).append(row['symbol'])
+        return symbols
+
+    def score_pending(self, scorer, batch_size=5000):
+        """Score every article that has no sentiment yet, in batches; returns the number scored"""
+        scored = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT id, title, summary FROM articles WHERE sentiment IS NULL LIMIT ?", (batch_size,)
+                ).fetchall()
+            if not rows:
+                return scored
+            scores = scorer.score_articles([dict(row) for row in rows])
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    "UPDATE articles SET sentiment = ? WHERE id = ?",
+                    [(float(score), row['id']) for score, row in zip(scores, rows)]
+                )
+            scored += len(rows)
+
+    def get_daily_sentiment(self, symbols=None, since=None):
+        """Mean sentiment per symbol and day as a DataFrame (symbol, day, sentiment, articles)"""
+        sql = (
+            "SELECT s.symbol AS symbol, date(a.published_at, 'unixepoch') AS day, "
+            "AVG(a.sentiment) AS sentiment, COUNT(*) AS articles "
+            "FROM articles a JOIN article_symbols s ON s.article_id = a.id "
+            "WHERE a.sentiment IS NOT NULL AND a.published_at >= ?"
+        )
+        params = [_to_epoch(since) if since else 0]
+        if symbols:
+            sql += f" AND s.symbol IN ({','.join('?' * len(symbols))})"
+            params.extend(symbols)
+        sql += " GROUP BY s.symbol, day ORDER BY s.symbol, day"
+        with self._lock:
+            frame = pd.read_sql_query(sql, self._conn, params=params)
+        frame['day'] = pd.to_datetime(frame['day'])
+        return frame
+
+    def get_summary(self, scope):
+        """Rolling market summary for scope: dict(summary, seen, article_count) or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT summary, seen, article_count FROM market_summaries WHERE scope = ?", (scope,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {'summary': row['summary'], 'seen': json.loads(row['seen']), 'article_count': row['article_count']}
+
+    def save_summary(self, scope, summary, seen, article_count):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO market_summaries (scope, summary, seen, article_count, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (scope, summary, json.dumps(list(seen)), article_count, time.time())
+            )
+
+    def prune(self, retention_days=NEWS_RETENTION_DAYS, max_articles=NEWS_MAX_ARTICLES):
+        """Drop articles older than the retention window and keep at most max_articles"""
+        cutoff = time.time() - retention_days * 86400
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM articles WHERE published_at < ?", (cutoff,))
+            self._conn.execute(
+                "DELETE FROM articles WHERE id IN ("
+                "SELECT id FROM articles ORDER BY published_at DESC LIMIT -1 OFFSET ?)",
+                (max_articles,)
+            )
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def _query(self, sql, params):
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._row_to_article(row) for row in rows]
+
+    @staticmethod
+    def _row_to_article(row):
+        return {
+            'id': row['id'],
+            'title': row['title'],
+            'source': row['source'],
+            'date': datetime.fromtimestamp(row['published_at'], tz=timezone.utc),
+            'summary': row['summary'] or '',
+            'link': row['url']
+        }
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_news_store():
+    """Return the process-wide NewsStore, or None when NEWS_DB_PATH is empty"""
+    global _store
+    if _store is None and NEWS_DB_PATH:
+        with _store_lock:
+            if _store is None:
+                _store = NewsStore()
+    return _store
@@ -0,0 +1,141 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from backtest import run_backtest
+from config import SWEEP_MAX_WORKERS
+
+# Default grids around the hard-coded windows in _calculate_technical_indicators
+PARAMETER_GRIDS = {
+    'sma': {'window': [10, 20, 30, 50, 100, 200]},
+    'sma_cross': {'fast': [5, 10, 20, 30], 'slow': [50, 100, 150, 200]},
+    'rsi': {'window': [7, 14, 21, 28], 'oversold': [20, 25, 30, 35], 'overbought': [65, 70, 75, 80]},
+    'macd': {'fast': [8, 12, 16], 'slow': [21, 26, 35, 50]},
+    'bollinger': {'window': [10, 20, 30, 50], 'width': [1.5, 2.0, 2.5, 3.0], 'mode': ['reversion', 'breakout']}
+}
+
+# Set in each worker process by _init_worker
+_worker_shm = None
+_worker_closes = None
+
+
+def expand_grid(grid):
+    """All parameter combinations of a {name: [values]} grid, skipping fast >= slow"""
+    names = list(grid)
+    combinations = []
+    for values in itertools.product(*(grid[name] for name in names)):
+        params = dict(zip(names, values))
+        if 'fast' in params and 'slow' in params and params['fast'] >= params['slow']:
+            continue
+        combinations.append(params)
+    return combinations
+
+
+def _init_worker(name, shape, index, columns):
+    global _worker_shm, _worker_closes
+    # Workers share the parent's resource tracker, so the segment is unlinked once, by the parent
+    _worker_shm = shared_memory.SharedMemory(name=name)
+    close = np.ndarray(shape, dtype=np.float64, buffer=_worker_shm.buf)
+    close.flags.writeable = False
+    _worker_closes = pd.DataFrame(close, index=index, columns=columns, copy=False)
+
+
+def _evaluate(strategy, params, cost_bps):
+    """Backtest one parameter set on the shared universe and summarize it across symbols"""
+    metrics = run_backtest(_worker_closes, strategy, cost_bps=cost_bps, **params).metrics
+    return _summarize(strategy, params, metrics)
+
+
+def _summarize(strategy, params, metrics):
+    row = {'strategy': strategy, 'params': ', '.join(f"{k}={v}" for k, v in params.items())}
+    row.update(params)
+    row.update({
+        'mean_cagr': metrics['cagr'].mean(),
+        'median_cagr': metrics['cagr'].median(),
+        'mean_sharpe': metrics['sharpe'].mean(),
+        'mean_max_drawdown': metrics['max_drawdown'].mean(),
+        'hit_rate': metrics['hit_rate'].mean(),
+        'exposure': metrics['exposure'].mean(),
+        'turnover': metrics['turnover'].mean()
+    })
+    return row
+
+
+class ParameterSweep:
+    """Evaluate grids of indicator parameters across the universe in a process pool.
+
+    The (dates x symbols) close matrix is copied once into a shared-memory
+    segment; workers map it read-only at start-up, so each task only pickles
+    its parameter dict and a one-row summary. Use as a context manager so the
+    pool and the segment are released.
+    """
+
+    def __init__(self, closes, max_workers=SWEEP_MAX_WORKERS or None, cost_bps=0.0):
+        self.cost_bps = cost_bps
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+        values = np.ascontiguousarray(closes.to_numpy(dtype=np.float64))
+        self._shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+        np.ndarray(values.shape, dtype=np.float64, buffer=self._shm.buf)[:] = values
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_init_worker,
+            initargs=(self._shm.name, values.shape, closes.index, closes.columns)
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+            self._shm.close()
+            self._shm.unlink()
+
+    def run(self, strategy, grid=None):
+        """Yield one summary row per parameter set as soon as it finishes"""
+        grid = grid or PARAMETER_GRIDS[strategy]
+        futures = [
+            self._pool.submit(_evaluate, strategy, params, self.cost_bps)
+            for params in expand_grid(grid)
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+
+    def run_all(self, strategies=None):
+        """Yield rows for the default grids of several strategies"""
+        for strategy in strategies or PARAMETER_GRIDS:
+            yield from self.run(strategy)
+
+
+def sweep(closes, strategy, grid=None, max_workers=SWEEP_MAX_WORKERS or None, cost_bps=0.0,
+          sort_by='mean_sharpe'):
+    """Run a sweep to completion and return the results sorted best first"""
+    with ParameterSweep(closes, max_workers=max_workers, cost_bps=cost_bps) as runner:
+        rows = list(runner.run(strategy, grid))
+    return pd.DataFrame(rows).sort_values(sort_by, ascending=False, ignore_index=True)
+
+
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range('2015-01-01', periods=252 * 10)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, size=(len(dates), 500)), axis=0))
+    closes = pd.DataFrame(prices, index=dates, columns=[f"S{i:03d}" for i in range(500)])
+    tasks = len(expand_grid(PARAMETER_GRIDS['rsi']))
+
+    for workers in sorted({1, max(os.cpu_count() // 2, 1), os.cpu_count()}):
+        with ParameterSweep(closes, max_workers=workers) as runner:
+            start = time.perf_counter()
+            rows = list(runner.run('rsi'))
+            elapsed = time.perf_counter() - start
+        print(f"{workers:3d} workers: {tasks} backtests in {elapsed:.2f}s ({tasks / elapsed:.1f}/s)")
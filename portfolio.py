@@ -0,0 +1,186 @@
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+
+
+def log_returns(closes):
+    """Daily log returns of a (dates x symbols) close DataFrame (first row dropped)"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.log(closes / closes.shift(1)).iloc[1:]
+
+
+def _moments(returns, valid):
+    """Pairwise sufficient statistics of a (T, N) block of returns.
+
+    For each pair (i, j), over the rows where both are present:
+    n = count, sx = sum x_i, sxx = sum x_i * x_j, sq = sum x_i ** 2
+    """
+    x = np.where(valid, returns, 0.0)
+    m = valid.astype(np.float64)
+    return m.T @ m, x.T @ m, x.T @ x, (x * x).T @ m
+
+
+def _covariance(n, sx, sxx):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = (sxx - sx * sx.T / n) / (n - 1)
+    return np.where(n > 1, cov, np.nan)
+
+
+def _correlation(n, sx, sxx, sq):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = sxx - sx * sx.T / n
+        var = sq - sx * sx / n          # var of i over the rows shared with j
+        corr = cov / np.sqrt(var * var.T)
+    corr = np.where(n > 1, np.clip(corr, -1.0, 1.0), np.nan)
+    np.fill_diagonal(corr, np.where(np.diag(n) > 1, 1.0, np.nan))
+    return corr
+
+
+class CorrelationEngine:
+    """Return covariance/correlation matrices kept up to date bar by bar.
+
+    The engine stores pairwise sums (counts, sums, cross-products and
+    squares), so adding a bar is one O(N^2) outer-product update instead of
+    an O(T * N^2) rebuild. With ``window`` set, the oldest bar's
+    contribution is subtracted as a new one arrives (rolling matrices); the
+    sums are recomputed from the window every ``window`` bars to keep
+    floating-point drift bounded. Missing prices are handled pairwise, like
+    ``DataFrame.corr()``.
+    """
+
+    def __init__(self, symbols, window=None):
+        self.symbols = list(symbols)
+        self.window = window
+        self.last_date = None
+        self._last_close = None
+        self._rows = deque(maxlen=window) if window else None
+        self._since_refit = 0
+        self._reset()
+
+    def _reset(self):
+        size = len(self.symbols)
+        self._n = np.zeros((size, size))
+        self._sx = np.zeros((size, size))
+        self._sxx = np.zeros((size, size))
+        self._sq = np.zeros((size, size))
+
+    def __len__(self):
+        """Number of return rows in the estimate"""
+        return int(self._n.max()) if self._n.size else 0
+
+    def fit(self, closes):
+        """Rebuild from a (dates x symbols) close DataFrame"""
+        closes = closes[self.symbols]
+        returns = log_returns(closes)
+        values = returns.to_numpy(dtype=np.float64)
+        if self.window:
+            values = values[-self.window:]
+            self._rows.clear()
+            self._rows.extend(values)
+        self._reset()
+        self._add_block(values)
+        self._since_refit = 0
+        self.last_date = closes.index[-1] if len(closes) else None
+        self._last_close = closes.iloc[-1].to_numpy(dtype=np.float64) if len(closes) else None
+        return self
+
+    def push(self, close_row, date=None):
+        """Add one bar of closes (array-like in symbol order, NaN for missing)"""
+        close_row = np.asarray(close_row, dtype=np.float64)
+        if self._last_close is not None:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                row = np.log(close_row / self._last_close)
+            self._push_return(row)
+        self._last_close = close_row
+        self.last_date = date
+
+    def sync(self, closes):
+        """Bring the engine up to date with closes: push only the bars after last_date.
+
+        Falls back to a full fit when the symbols changed or history was rewritten,
+        including a revised close at last_date (e.g. the intraday bar replaced by
+        the settled close).
+        """
+        if list(closes.columns) != self.symbols or self.last_date is None or self.last_date not in closes.index:
+            return self.fit(closes)
+        last_close = closes.loc[self.last_date, self.symbols].to_numpy(dtype=np.float64)
+        if not np.array_equal(last_close, self._last_close, equal_nan=True):
+            return self.fit(closes)
+        new_bars = closes.loc[closes.index > self.last_date, self.symbols]
+        for date, row in zip(new_bars.index, new_bars.to_numpy(dtype=np.float64)):
+            self.push(row, date)
+        return self
+
+    def _push_return(self, row):
+        if self.window:
+            if len(self._rows) == self.window:
+                self._add_block(self._rows[0][None, :], sign=-1.0)
+            self._rows.append(row)
+            self._since_refit += 1
+            if self._since_refit >= self.window:
+                # Recompute from the window to shed accumulated rounding error
+                self._reset()
+                self._add_block(np.array(self._rows))
+                self._since_refit = 0
+                return
+        self._add_block(row[None, :])
+
+    def _add_block(self, values, sign=1.0):
+        if not len(values):
+            return
+        n, sx, sxx, sq = _moments(values, ~np.isnan(values))
+        self._n += sign * n
+        self._sx += sign * sx
+        self._sxx += sign * sxx
+        self._sq += sign * sq
+
+    def covariance(self, annualize=True):
+        cov = _covariance(self._n, self._sx, self._sxx)
+        if annualize:
+            cov = cov * TRADING_DAYS
+        return pd.DataFrame(cov, index=self.symbols, columns=self.symbols)
+
+    def correlation(self):
+        corr = _correlation(self._n, self._sx, self._sxx, self._sq)
+        return pd.DataFrame(corr, index=self.symbols, columns=self.symbols)
+
+
+def rolling_covariance(returns, window):
+    """Rolling covariance matrices for every date as a (T, N, N) array (NaN until window rows).
+
+    Computed from cumulative sums of outer products, so the cost is
+    O(T * N^2) regardless of the window; memory is T * N^2 floats, meant for
+    watchlist-sized universes. Rows must not contain NaN.
+    """
+    x = np.asarray(returns, dtype=np.float64)
+    outer = np.cumsum(x[:, :, None] * x[:, None, :], axis=0)
+    sums = np.cumsum(x, axis=0)
+    zeros = np.zeros((1,) + outer.shape[1:])
+    outer = np.concatenate([zeros, outer])
+    sums = np.concatenate([np.zeros((1, x.shape[1])), sums])
+
+    result = np.full((len(x), x.shape[1], x.shape[1]), np.nan)
+    window_outer = outer[window:] - outer[:-window]
+    window_sums = sums[window:] - sums[:-window]
+    result[window - 1:] = (
+        window_outer - window_sums[:, :, None] * window_sums[:, None, :] / window
+    ) / (window - 1)
+    return result
+
+
+def rolling_correlation(returns, window):
+    """Rolling correlation matrices as a (T, N, N) array"""
+    cov = rolling_covariance(returns, window)
+    std = np.sqrt(np.diagonal(cov, axis1=1, axis2=2))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return cov / (std[:, :, None] * std[:, None, :])
+
+
+def average_correlation(corr):
+    """Mean off-diagonal correlation of a correlation matrix"""
+    values = np.asarray(corr, dtype=np.float64)
+    mask = ~np.eye(len(values), dtype=bool)
+    return float(np.nanmean(values[mask])) if mask.any() else np.nan
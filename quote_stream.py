@@ -0,0 +1,212 @@
+import threading
+import time
+
+import numpy as np
+
+from config import QUOTE_POLL_INTERVAL, QUOTE_SESSION_TTL
+from screener import get_indicator_table
+
+# Fields pushed to the shared state; only the ones that changed are written
+QUOTE_FIELDS = ('price', 'change_pct', 'volume')
+
+
+class QuoteStream:
+    """Live quote mode: polls a quote-only endpoint for the watchlist on a fixed cadence.
+
+    Each poll is one batched request (no history). Only fields that changed
+    are written to the shared state, and every changed price is fed to the
+    IndicatorTable as a tick (revising the current bar, or starting a new bar
+    when the session's previous close rolls over), so indicators stay live
+    without refetching a year of history. Symbols the endpoint can't quote
+    are simulated from their last price when ``fallback_to_mock`` is set
+    (demo only). Each state records its ``source``: 'seed' until a quote
+    arrives, then 'live' or 'mock'. Simulated ticks are never fed to the
+    shared IndicatorTable.
+
+    Symbols watched for a session are kept while the session keeps reading
+    (``snapshot(session)``) and dropped ``session_ttl`` seconds after its
+    last read or on ``release``; symbols watched without a session stay
+    until ``unwatch``. The polling thread exits once nothing is watched.
+    """
+
+    def __init__(self, fetch_quotes, interval=QUOTE_POLL_INTERVAL, table=None, fallback_to_mock=False,
+                 session_ttl=QUOTE_SESSION_TTL):
+        self.fetch_quotes = fetch_quotes
+        self.interval = interval
+        self.table = table if table is not None else get_indicator_table()
+        self.fallback_to_mock = fallback_to_mock
+        self.session_ttl = session_ttl
+        self.version = 0
+        self._state = {}           # symbol -> {price, change_pct, volume, previous_close, updated_at}
+        self._sessions = {}        # session -> [watched symbols, last read time]
+        self._pinned = set()       # symbols watched without a session
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._rng = np.random.default_rng()
+
+    def watch(self, seeds, session=None):
+        """Add symbols to the watchlist; seeds maps symbol -> StockSnapshot (or dict) with the last known values.
+
+        With a session, the seeds replace that session's symbols.
+        """
+        with self._lock:
+            if session is None:
+                self._pinned.update(seeds)
+            else:
+                self._sessions[session] = [set(seeds), time.time()]
+            for symbol, stock in seeds.items():
+                if symbol in self._state:
+                    continue
+                self._state[symbol] = {
+                    'price': stock['current_price'],
+                    'change_pct': stock['price_change_pct'],
+                    'volume': stock['volume'],
+                    'previous_close': stock['previous_close'],
+                    'updated_at': time.time(),
+                    'source': 'seed'
+                }
+
+    def unwatch(self, symbol):
+        with self._lock:
+            self._pinned.discard(symbol)
+            for symbols, _ in self._sessions.values():
+                symbols.discard(symbol)
+            self._state.pop(symbol, None)
+
+    def release(self, session):
+        """Drop a session's symbols (those no other session or pin still wants are unwatched)"""
+        with self._lock:
+            self._sessions.pop(session, None)
+            self._prune(time.time())
+
+    def start(self):
+        """Start the polling thread (idempotent)"""
+        with self._lock:
+            self._stop.clear()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='quote-stream', daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def running(self):
+        return self._thread is not None and not self._stop.is_set()
+
+    def snapshot(self, session=None):
+        """Copy of the current quote state; with a session, also marks it as still reading"""
+        with self._lock:
+            if session in self._sessions:
+                self._sessions[session][1] = time.time()
+            return {symbol: dict(quote) for symbol, quote in self._state.items()}
+
+    def _prune(self, now):
+        """Expire idle sessions and unwatch symbols nobody wants; returns the number still watched"""
+        for session in [session for session, (_, seen) in self._sessions.items() if now - seen > self.session_ttl]:
+            del self._sessions[session]
+        wanted = set(self._pinned)
+        for symbols, _ in self._sessions.values():
+            wanted |= symbols
+        for symbol in [symbol for symbol in self._state if symbol not in wanted]:
+            del self._state[symbol]
+        return len(self._state)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                # Exit (under the lock, so start() can tell) when stopped or nothing is watched
+                if self._stop.is_set() or not self._prune(time.time()):
+                    self._thread = None
+                    return
+            started = time.monotonic()
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"Quote stream poll failed: {e}")
+            self._stop.wait(max(self.interval - (time.monotonic() - started), 0))
+
+    def poll(self):
+        """Fetch one round of quotes and apply the deltas; returns {symbol: {changed field: value}}"""
+        with self._lock:
+            symbols = list(self._state)
+        if not symbols:
+            return {}
+
+        quotes = {symbol: dict(quote, source='live') for symbol, quote in (self.fetch_quotes(symbols) or {}).items()}
+        if self.fallback_to_mock:
+            missing = [symbol for symbol in symbols if symbol not in quotes]
+            if missing:
+                quotes.update(self._mock_quotes(missing))
+
+        changes = {}
+        now = time.time()
+        with self._lock:
+            for symbol, quote in quotes.items():
+                state = self._state.get(symbol)
+                if state is None:
+                    continue
+                previous_close = quote.get('previous_close') or state['previous_close']
+                values = {
+                    'price': round(quote['price'], 2),
+                    'change_pct': round((quote['price'] - previous_close) / previous_close * 100, 2) if previous_close else 0.0,
+                    'volume': quote.get('volume', state['volume'])
+                }
+                delta = {field: value for field, value in values.items() if state[field] != value}
+                new_session = previous_close != state['previous_close']
+                if not delta and not new_session and state['source'] == quote['source']:
+                    continue
+                state.update(delta)
+                state['previous_close'] = previous_close
+                state['updated_at'] = now
+                state['source'] = quote['source']
+                changes[symbol] = (delta, new_session, quote['source'])
+            if changes:
+                self.version += 1
+
+        # Only real quotes reach the process-wide screener table; simulated ticks stay in this stream
+        for symbol, (delta, new_session, source) in changes.items():
+            if source == 'live' and ('price' in delta or new_session):
+                self._feed_indicators(symbol, new_session)
+
+        return {symbol: delta for symbol, (delta, _, _) in changes.items()}
+
+    def _feed_indicators(self, symbol, new_session):
+        with self._lock:
+            if symbol not in self._state:
+                return  # unwatched meanwhile
+            state = dict(self._state[symbol])
+        try:
+            self.table.update_bar(symbol, state['price'], state['volume'], new_bar=new_session)
+            self.table.upsert(symbol, {'price_change_pct': state['change_pct']})
+        except Exception as e:
+            print(f"Failed to update indicators for {symbol}: {e}")
+
+    def _mock_quotes(self, symbols):
+        """Random-walk ticks from the last known price"""
+        with self._lock:
+            states = {symbol: dict(self._state[symbol]) for symbol in symbols if symbol in self._state}
+        return {
+            symbol: {
+                'price': state['price'] * float(np.exp(self._rng.normal(0, 0.0008))),
+                'previous_close': state['previous_close'],
+                'volume': int(state['volume'] + self._rng.integers(0, 50000)),
+                'source': 'mock'
+            }
+            for symbol, state in states.items()
+        }
+
+
+_stream = None
+_stream_lock = threading.Lock()
+
+
+def get_quote_stream(fetch_quotes):
+    """Return the process-wide QuoteStream, shared by all sessions"""
+    global _stream
+    if _stream is None:
+        with _stream_lock:
+            if _stream is None:
+                _stream = QuoteStream(fetch_quotes)
+    return _stream
@@ -0,0 +1,170 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from config import RECOMMENDATION_DB_PATH
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS recommendations (
+    id INTEGER PRIMARY KEY,
+    symbol TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    action TEXT NOT NULL,
+    target_price REAL,
+    target_text TEXT,
+    risk_level TEXT,
+    price REAL,
+    model TEXT,
+    inputs_hash TEXT NOT NULL,
+    reasoning TEXT,
+    risks TEXT,
+    raw_response TEXT
+);
+CREATE INDEX IF NOT EXISTS recommendations_symbol_time ON recommendations(symbol, created_at);
+CREATE INDEX IF NOT EXISTS recommendations_time ON recommendations(created_at);
+CREATE INDEX IF NOT EXISTS recommendations_inputs ON recommendations(inputs_hash);
+"""
+
+_PRICE = re.compile(r'[-+]?\d[\d,]*\.?\d*')
+
+# Columns returned by history queries (raw responses are loaded only with the full record)
+_SUMMARY_COLUMNS = "id, symbol, created_at, action, target_price, target_text, risk_level, price, model, inputs_hash"
+
+
+def parse_price(text):
+    """First number in a target such as '$185.50' or '185 - 190', or None"""
+    if isinstance(text, (int, float)):
+        return float(text)
+    match = _PRICE.search(text or '')
+    return float(match.group().replace(',', '')) if match else None
+
+
+def inputs_hash(stock_data, news_data=()):
+    """Hash of the inputs an analysis was based on: price, indicators and headlines"""
+    payload = {
+        'symbol': stock_data['symbol'],
+        'price': stock_data['current_price'],
+        'technical': stock_data['technical_analysis'],
+        'news': [article['title'] for article in news_data or ()]
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha1(encoded.encode('utf-8')).hexdigest()
+
+
+def _to_epoch(date):
+    return date.timestamp() if isinstance(date, datetime) else float(date)
+
+
+class RecommendationStore:
+    """History of AI recommendations backed by SQLite.
+
+    Every analysis is appended with the inputs hash it was based on, so the
+    latest result per symbol can be shown on page open and the evolution of
+    recommendations charted without calling the LLM again. The
+    (symbol, created_at) index serves both the latest-per-symbol lookup and
+    time-range queries.
+    """
+
+    def __init__(self, path=RECOMMENDATION_DB_PATH):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def save(self, symbol, analysis, price=None, inputs='', model=None, created_at=None):
+        """Append an analysis result (dict from GeminiAnalyzer.analyze_stock); returns its id"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO recommendations (symbol, created_at, action, target_price, target_text, "
+                "risk_level, price, model, inputs_hash, reasoning, risks, raw_response) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (symbol, _to_epoch(created_at) if created_at else time.time(), analysis['action'],
+                 parse_price(analysis.get('target_price')), analysis.get('target_price'),
+                 analysis.get('risk_level'), price, model, inputs, analysis.get('reasoning'),
+                 analysis.get('risks'), analysis.get('raw_response'))
+            )
+        return cursor.lastrowid
+
+    def latest(self, symbol):
+        """Most recent full record for symbol, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM recommendations WHERE symbol = ? ORDER BY created_at DESC LIMIT 1", (symbol,)
+            ).fetchone()
+        return self._row_to_record(row) if row else None
+
+    def find(self, inputs, model=None):
+        """Most recent record computed from identical inputs (by the given model, when set), or None"""
+        query = "SELECT * FROM recommendations WHERE inputs_hash = ?"
+        params = [inputs]
+        if model is not None:
+            query += " AND model = ?"
+            params.append(model)
+        with self._lock:
+            row = self._conn.execute(query + " ORDER BY created_at DESC LIMIT 1", params).fetchone()
+        return self._row_to_record(row) if row else None
+
+    def latest_by_symbol(self, symbols):
+        """Map symbol -> most recent record (without raw response) for the given symbols"""
+        if not symbols:
+            return {}
+        placeholders = ','.join('?' * len(symbols))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_SUMMARY_COLUMNS} FROM recommendations r WHERE symbol IN ({placeholders}) "
+                "AND created_at = (SELECT MAX(created_at) FROM recommendations WHERE symbol = r.symbol)",
+                list(symbols)
+            ).fetchall()
+        return {row['symbol']: self._row_to_record(row) for row in rows}
+
+    def history(self, symbol, since=None, until=None):
+        """Recommendations for symbol in [since, until) as a DataFrame ordered by time"""
+        with self._lock:
+            frame = pd.read_sql_query(
+                f"SELECT {_SUMMARY_COLUMNS} FROM recommendations "
+                "WHERE symbol = ? AND created_at >= ? AND created_at < ? ORDER BY created_at",
+                self._conn,
+                params=(symbol, _to_epoch(since) if since else 0, _to_epoch(until) if until else float('inf'))
+            )
+        # Local time, like the records returned by latest()
+        frame['created_at'] = pd.to_datetime(frame['created_at'].map(datetime.fromtimestamp))
+        return frame
+
+    def count(self, symbol=None):
+        with self._lock:
+            if symbol is None:
+                return self._conn.execute("SELECT COUNT(*) FROM recommendations").fetchone()[0]
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM recommendations WHERE symbol = ?", (symbol,)
+            ).fetchone()[0]
+
+    @staticmethod
+    def _row_to_record(row):
+        record = dict(row)
+        record['created_at'] = datetime.fromtimestamp(record['created_at'])
+        # Same keys as an analysis result, so stored records render like fresh ones
+        record['target_value'] = record['target_price']
+        record['target_price'] = record.pop('target_text') or 'N/A'
+        return record
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_recommendation_store():
+    """Return the process-wide RecommendationStore, or None when RECOMMENDATION_DB_PATH is empty"""
+    global _store
+    if _store is None and RECOMMENDATION_DB_PATH:
+        with _store_lock:
+            if _store is None:
+                _store = RecommendationStore()
+    return _store
@@ -0,0 +1,111 @@
+import threading
+
+import pandas as pd
+
+from history_store import get_history_store
+
+# Timeframe -> pandas resample rule (None = the daily bars themselves).
+# Bars are labeled with the period's end: the Friday of the week, the last day of the month.
+TIMEFRAMES = {'1D': None, '1W': 'W-FRI', '1M': 'ME'}
+TIMEFRAME_NAMES = {'1D': 'Daily', '1W': 'Weekly', '1M': 'Monthly'}
+
+OHLCV_AGGREGATION = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+
+
+def resample_ohlcv(daily, timeframe):
+    """Aggregate daily OHLCV bars to a timeframe (first open, max high, min low, last close, summed volume).
+
+    Periods without any trading day (e.g. a holiday week) are dropped.
+    """
+    rule = TIMEFRAMES.get(timeframe, False)
+    if rule is False:
+        raise ValueError(f"Unknown timeframe: {timeframe!r} (expected one of {', '.join(TIMEFRAMES)})")
+    if rule is None or not len(daily):
+        return daily
+    columns = {column: how for column, how in OHLCV_AGGREGATION.items() if column in daily.columns}
+    bars = daily[list(columns)].resample(rule).agg(columns)
+    return bars[bars['Close'].notna()]
+
+
+class ResampleCache:
+    """Weekly/monthly bars derived from the cached daily histories.
+
+    Each (symbol, timeframe) keeps its bars and the daily range they were
+    built from. When the daily history grows, only the last (possibly
+    partial) period and the periods after it are re-aggregated; for a
+    rolling window whose first date moved forward, leading periods that
+    fell out of the window are dropped and the new first period is
+    re-aggregated. A history that was replaced rather than extended (it
+    starts earlier, or the close at the previously cached last date
+    changed, e.g. after a split adjustment) is rebuilt from scratch. No
+    network calls are made.
+    """
+
+    def __init__(self, store=None):
+        self.store = store if store is not None else get_history_store()
+        self._entries = {}  # (symbol, timeframe) -> (first daily date, last daily date, last close, bars)
+        self._lock = threading.Lock()
+
+    def get(self, symbol, timeframe, daily=None):
+        """Bars of symbol at timeframe, or None when there is no daily history"""
+        if TIMEFRAMES.get(timeframe, False) is None:
+            return daily if daily is not None else self.store.get(symbol)
+        daily = daily if daily is not None else self.store.get(symbol)
+        if daily is None or not len(daily):
+            return None
+
+        key = (symbol, timeframe)
+        with self._lock:
+            entry = self._entries.get(key)
+
+        first, last, last_close = daily.index[0], daily.index[-1], daily['Close'].iloc[-1]
+        if entry is not None and entry[:3] == (first, last, last_close):
+            return entry[3]
+
+        bars = self._extend(entry, daily, timeframe) if entry is not None else None
+        if bars is None:
+            bars = resample_ohlcv(daily, timeframe)
+
+        with self._lock:
+            self._entries[key] = (first, last, last_close, bars)
+        return bars
+
+    @staticmethod
+    def _extend(entry, daily, timeframe):
+        """Bars for daily reusing the cached closed periods, or None when they don't carry over.
+
+        Labels are period-end dates, so a period holds the days after the previous label.
+        """
+        cached_first, cached_last, cached_close, bars = entry
+        if len(bars) < 2 or daily.index[0] < cached_first or cached_last not in daily.index:
+            return None
+        if daily['Close'].loc[cached_last] != cached_close:
+            return None
+        labels = bars.index
+        # First cached period still in the window; it is re-aggregated since its first days may have rolled off
+        head_end = labels.searchsorted(daily.index[0].normalize())
+        if head_end >= len(labels) - 1:
+            return None
+        days = daily.index.normalize()
+        head = resample_ohlcv(daily[days <= labels[head_end]], timeframe)
+        tail = resample_ohlcv(daily[days > labels[-2]], timeframe)
+        return pd.concat([head, bars.iloc[head_end + 1:-1], tail])
+
+    def drop(self, symbol):
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == symbol]:
+                del self._entries[key]
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_resample_cache():
+    """Return the process-wide ResampleCache over the shared history store"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResampleCache()
+    return _cache
@@ -0,0 +1,215 @@
+import threading
+from collections import OrderedDict
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from backtest import load_closes, rolling_std
+from config import RISK_BENCHMARKS, RISK_CACHE_SIZE, RISK_CONFIDENCE, RISK_VOL_WINDOW
+from history_store import get_history_store
+
+TRADING_DAYS = 252
+
+# Display names for the benchmark indices
+BENCHMARK_NAMES = {'^GSPC': 'S&P 500', '^IXIC': 'NASDAQ', '^DJI': 'Dow Jones'}
+
+# Columns of compute_risk_metrics() before the per-benchmark beta_<index> columns
+METRIC_COLUMNS = (
+    'volatility', 'volatility_annual', 'var_hist', 'cvar_hist', 'var_param', 'cvar_param',
+    'max_drawdown', 'current_drawdown', 'observations'
+)
+
+
+def simple_returns(closes):
+    """Daily simple returns of a (T, N) close array (first row NaN, NaN where either close is missing)"""
+    returns = np.full(closes.shape, np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns[1:] = closes[1:] / closes[:-1] - 1
+    return returns
+
+
+def betas(returns, benchmark_returns):
+    """(N, K) betas of every asset to every benchmark, each pair over the days both have a return"""
+    x_valid = ~np.isnan(returns)
+    y_valid = ~np.isnan(benchmark_returns)
+    x = np.where(x_valid, returns, 0.0)
+    y = np.where(y_valid, benchmark_returns, 0.0)
+    x_mask = x_valid.astype(np.float64)
+    y_mask = y_valid.astype(np.float64)
+
+    n = x_mask.T @ y_mask
+    sx = x.T @ y_mask
+    sy = x_mask.T @ y
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = x.T @ y - sx * sy / n
+        var = x_mask.T @ (y * y) - sy * sy / n
+        return np.where(n > 2, cov / var, np.nan)
+
+
+def historical_var(returns, confidence=RISK_CONFIDENCE):
+    """One-day historical VaR and CVaR per column, as positive loss fractions"""
+    alpha = 1 - confidence
+    counts = (~np.isnan(returns)).sum(axis=0)
+    var = np.full(returns.shape[1], np.nan)
+    cvar = np.full(returns.shape[1], np.nan)
+    enough = counts > 0
+    if enough.any():
+        quantile = np.nanquantile(returns[:, enough], alpha, axis=0)
+        tail = returns[:, enough] <= quantile
+        var[enough] = -quantile
+        cvar[enough] = -np.nansum(np.where(tail, returns[:, enough], 0.0), axis=0) / tail.sum(axis=0)
+    return var, cvar
+
+
+def parametric_var(returns, confidence=RISK_CONFIDENCE):
+    """One-day Gaussian VaR and CVaR per column from the sample mean and standard deviation"""
+    alpha = 1 - confidence
+    normal = NormalDist()
+    z = normal.inv_cdf(alpha)
+    with np.errstate(invalid='ignore'):
+        mean = np.nanmean(returns, axis=0)
+        std = np.nanstd(returns, axis=0, ddof=1)
+    var = -(mean + z * std)
+    cvar = -(mean - std * normal.pdf(z) / alpha)
+    return var, cvar
+
+
+def drawdowns(closes):
+    """(max drawdown, current drawdown) per column as negative fractions, gaps carried forward"""
+    filled = pd.DataFrame(closes).ffill().to_numpy()
+    peaks = np.fmax.accumulate(filled, axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drawdown = filled / peaks - 1
+        return np.nanmin(drawdown, axis=0), drawdown[-1]
+
+
+def compute_risk_metrics(closes, benchmark_closes=None, confidence=RISK_CONFIDENCE, vol_window=RISK_VOL_WINDOW):
+    """Risk metrics for every column of a (dates x symbols) close DataFrame in one vectorized pass.
+
+    Columns: rolling and full-sample annualized volatility, beta to each
+    benchmark (aligned on date), historical and parametric one-day VaR/CVaR
+    at ``confidence`` (positive loss fractions) and max/current drawdown.
+    """
+    values = closes.to_numpy(dtype=np.float64)
+    returns = simple_returns(values)
+
+    with np.errstate(invalid='ignore'):
+        volatility = rolling_std(returns, vol_window)[-1] * np.sqrt(TRADING_DAYS)
+        volatility_annual = np.nanstd(returns, axis=0, ddof=1) * np.sqrt(TRADING_DAYS)
+    var_hist, cvar_hist = historical_var(returns, confidence)
+    var_param, cvar_param = parametric_var(returns, confidence)
+    max_drawdown, current_drawdown = drawdowns(values)
+
+    metrics = {
+        'volatility': volatility,
+        'volatility_annual': volatility_annual,
+        'var_hist': var_hist,
+        'cvar_hist': cvar_hist,
+        'var_param': var_param,
+        'cvar_param': cvar_param,
+        'max_drawdown': max_drawdown,
+        'current_drawdown': current_drawdown,
+        'observations': (~np.isnan(returns)).sum(axis=0)
+    }
+
+    if benchmark_closes is not None and benchmark_closes.shape[1]:
+        benchmark_closes = benchmark_closes.reindex(closes.index)
+        benchmark_returns = simple_returns(benchmark_closes.to_numpy(dtype=np.float64))
+        beta = betas(returns, benchmark_returns)
+        for k, benchmark in enumerate(benchmark_closes.columns):
+            metrics[f'beta_{benchmark}'] = beta[:, k]
+
+    return pd.DataFrame(metrics, index=pd.Index(closes.columns, name='symbol'))
+
+
+def format_risk_summary(risk, confidence=RISK_CONFIDENCE):
+    """Plain-text lines describing one symbol's risk metrics (a row of get_risk_metrics)"""
+    level = f"{confidence:.0%}"
+    lines = [
+        f"Volatility ({RISK_VOL_WINDOW}-day, annualized): {risk['volatility']:.1%}",
+        f"Volatility (full history, annualized): {risk['volatility_annual']:.1%}",
+        f"1-Day VaR {level} (historical / parametric): {risk['var_hist']:.2%} / {risk['var_param']:.2%}",
+        f"1-Day CVaR {level} (historical / parametric): {risk['cvar_hist']:.2%} / {risk['cvar_param']:.2%}",
+        f"Max Drawdown: {risk['max_drawdown']:.1%} (currently {risk['current_drawdown']:.1%})"
+    ]
+    for benchmark, name in BENCHMARK_NAMES.items():
+        beta = risk.get(f'beta_{benchmark}')
+        if beta is not None and not np.isnan(beta):
+            lines.append(f"Beta vs {name}: {beta:.2f}")
+    return "\n".join(lines)
+
+
+_cache = OrderedDict()  # key -> (last bars, metrics), least recently used first
+_cache_lock = threading.Lock()
+
+
+def _last_bars(symbols, store):
+    """(last date, last close) of each symbol's history, None when it has none"""
+    bars = []
+    for symbol in symbols:
+        history = store.get(symbol)
+        if history is None or not len(history):
+            bars.append(None)
+        else:
+            bars.append((history.index[-1], float(history['Close'].iloc[-1])))
+    return tuple(bars)
+
+
+def get_risk_metrics(symbols, store=None, benchmarks=RISK_BENCHMARKS, confidence=RISK_CONFIDENCE,
+                     vol_window=RISK_VOL_WINDOW):
+    """Risk metrics for symbols from the shared history store, recomputed only when a new bar arrives.
+
+    Results are cached per symbol set and validated on each history's last
+    bar date and close, so reruns between bars are dictionary lookups while a
+    new bar or a revised last close triggers a recompute. The cache keeps the
+    RISK_CACHE_SIZE most recently used symbol sets. Symbols without history
+    get a row of NaN.
+    """
+    store = store if store is not None else get_history_store()
+    symbols = list(symbols)
+    benchmarks = [benchmark for benchmark in benchmarks if benchmark not in symbols]
+    key = (tuple(symbols), tuple(benchmarks), confidence, vol_window)
+    bars = _last_bars(symbols + benchmarks, store)
+
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None and cached[0] == bars:
+            _cache.move_to_end(key)
+            return cached[1]
+
+    closes = load_closes(symbols + benchmarks, store)
+    present = [symbol for symbol in symbols if symbol in closes.columns]
+    benchmark_closes = closes[[benchmark for benchmark in benchmarks if benchmark in closes.columns]]
+    if present:
+        metrics = compute_risk_metrics(closes[present], benchmark_closes, confidence, vol_window)
+    else:
+        # No history at all (e.g. every source failed): same columns, all NaN
+        columns = list(METRIC_COLUMNS) + [f'beta_{benchmark}' for benchmark in benchmark_closes.columns]
+        metrics = pd.DataFrame(columns=columns, dtype=np.float64)
+    metrics = metrics.reindex(pd.Index(symbols, name='symbol'))
+
+    with _cache_lock:
+        _cache[key] = (bars, metrics)
+        _cache.move_to_end(key)
+        while len(_cache) > RISK_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return metrics
+
+
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range('2015-01-01', periods=TRADING_DAYS * 10)
+    market = rng.normal(0.0003, 0.01, size=len(dates))
+    returns = market[:, None] * rng.uniform(0.5, 1.5, 500) + rng.normal(0, 0.015, size=(len(dates), 500))
+    closes = pd.DataFrame(100 * np.cumprod(1 + returns, axis=0), index=dates,
+                          columns=[f"S{i:03d}" for i in range(500)])
+    index = pd.DataFrame({'^GSPC': 100 * np.cumprod(1 + market)}, index=dates)
+
+    start = time.perf_counter()
+    metrics = compute_risk_metrics(closes, index)
+    elapsed = time.perf_counter() - start
+    print(f"500 symbols x {len(dates)} bars in {elapsed * 1000:.1f} ms")
+    print(metrics.describe().T[['mean', 'min', 'max']].round(3))
@@ -0,0 +1,299 @@
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+from incremental_indicators import IncrementalIndicators
+
+# One row per symbol; every column is a float64 NumPy array
+SCREENER_COLUMNS = (
+    'close', 'price_change_pct', 'volume', 'avg_volume', 'market_cap', 'pe_ratio',
+    'high_52w', 'low_52w', 'sma_20', 'sma_50', 'sma_200', 'rsi', 'macd',
+    'bollinger_upper', 'bollinger_lower'
+)
+
+# Friendlier names accepted in expressions
+COLUMN_ALIASES = {'price': 'close', 'change': 'price_change_pct', 'pe': 'pe_ratio', 'cap': 'market_cap'}
+
+_TOKEN = re.compile(r'\s*(?:(\d+\.?\d*(?:e[+-]?\d+)?[kmbt]?)|([A-Za-z_][A-Za-z0-9_]*)|(<=|>=|==|!=|<|>|[-+*/()]))', re.IGNORECASE)
+_SUFFIX = {'k': 1e3, 'm': 1e6, 'b': 1e9, 't': 1e12}
+_COMPARE = {
+    '<': np.less, '<=': np.less_equal, '>': np.greater,
+    '>=': np.greater_equal, '==': np.equal, '!=': np.not_equal
+}
+_ARITHMETIC = {'+': np.add, '-': np.subtract, '*': np.multiply, '/': np.divide}
+
+
+def _tokenize(expression):
+    tokens = []
+    position = 0
+    expression = expression.strip()
+    while position < len(expression):
+        match = _TOKEN.match(expression, position)
+        if not match or match.end() == position:
+            raise ValueError(f"Unexpected character in screen expression at: {expression[position:]!r}")
+        number, name, operator = match.groups()
+        if number is not None:
+            suffix = number[-1].lower()
+            value = float(number[:-1]) * _SUFFIX[suffix] if suffix in _SUFFIX else float(number)
+            tokens.append(('number', value))
+        elif name is not None:
+            lowered = name.lower()
+            tokens.append(('keyword', lowered) if lowered in ('and', 'or', 'not') else ('name', lowered))
+        else:
+            tokens.append(('op', operator))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent parser compiling an expression into a function of the column dict.
+
+    Grammar:
+        or_expr    := and_expr ('or' and_expr)*
+        and_expr   := not_expr ('and' not_expr)*
+        not_expr   := 'not' not_expr | comparison
+        comparison := sum (('<' | '<=' | '>' | '>=' | '==' | '!=') sum)?
+        sum        := product (('+' | '-') product)*
+        product    := unary (('*' | '/') unary)*
+        unary      := '-' unary | atom
+        atom       := number | column | '(' or_expr ')'
+    """
+
+    def __init__(self, expression, columns):
+        self.tokens = _tokenize(expression)
+        self.position = 0
+        self.columns = columns
+
+    def parse(self):
+        node = self._or()
+        if self.position != len(self.tokens):
+            raise ValueError(f"Unexpected token in screen expression: {self.tokens[self.position][1]!r}")
+        return node
+
+    def _peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def _accept(self, kind, value=None):
+        token_kind, token_value = self._peek()
+        if token_kind == kind and (value is None or token_value == value):
+            self.position += 1
+            return token_value
+        return None
+
+    def _or(self):
+        node = self._and()
+        while self._accept('keyword', 'or'):
+            left, right = node, self._and()
+            node = lambda cols, left=left, right=right: np.logical_or(left(cols), right(cols))
+        return node
+
+    def _and(self):
+        node = self._not()
+        while self._accept('keyword', 'and'):
+            left, right = node, self._not()
+            node = lambda cols, left=left, right=right: np.logical_and(left(cols), right(cols))
+        return node
+
+    def _not(self):
+        if self._accept('keyword', 'not'):
+            operand = self._not()
+            return lambda cols: np.logical_not(operand(cols))
+        return self._comparison()
+
+    def _comparison(self):
+        node = self._sum()
+        token_kind, token_value = self._peek()
+        if token_kind == 'op' and token_value in _COMPARE:
+            self.position += 1
+            left, right, compare = node, self._sum(), _COMPARE[token_value]
+            node = lambda cols: compare(left(cols), right(cols))
+        return node
+
+    def _sum(self):
+        node = self._product()
+        while True:
+            token_kind, token_value = self._peek()
+            if token_kind != 'op' or token_value not in ('+', '-'):
+                return node
+            self.position += 1
+            left, right, operator = node, self._product(), _ARITHMETIC[token_value]
+            node = lambda cols, left=left, right=right, operator=operator: operator(left(cols), right(cols))
+
+    def _product(self):
+        node = self._unary()
+        while True:
+            token_kind, token_value = self._peek()
+            if token_kind != 'op' or token_value not in ('*', '/'):
+                return node
+            self.position += 1
+            left, right, operator = node, self._unary(), _ARITHMETIC[token_value]
+            node = lambda cols, left=left, right=right, operator=operator: operator(left(cols), right(cols))
+
+    def _unary(self):
+        if self._accept('op', '-'):
+            operand = self._unary()
+            return lambda cols: np.negative(operand(cols))
+        return self._atom()
+
+    def _atom(self):
+        number = self._accept('number')
+        if number is not None:
+            return lambda cols: number
+        name = self._accept('name')
+        if name is not None:
+            column = COLUMN_ALIASES.get(name, name)
+            if column not in self.columns:
+                raise ValueError(f"Unknown screen column: {name!r}")
+            return lambda cols: cols[column]
+        if self._accept('op', '('):
+            node = self._or()
+            if not self._accept('op', ')'):
+                raise ValueError("Missing ')' in screen expression")
+            return node
+        raise ValueError("Incomplete screen expression")
+
+
+def compile_expression(expression, columns=SCREENER_COLUMNS):
+    """Compile a predicate such as 'rsi < 30 and close > sma_200' into a vectorized function"""
+    return _Parser(expression, columns).parse()
+
+
+class IndicatorTable:
+    """Precomputed screener table: one row per symbol of indicators and fundamentals.
+
+    Columns are contiguous float64 arrays, so a predicate is evaluated for
+    the whole universe with a handful of NumPy operations. Rows are updated
+    in place: ``update_snapshot`` after a fetch, ``update_bar`` as new bars
+    arrive (using IncrementalIndicators, without touching other symbols).
+    """
+
+    def __init__(self, capacity=256):
+        self._index = {}
+        self._symbols = []
+        self._columns = {name: np.full(capacity, np.nan) for name in SCREENER_COLUMNS}
+        self._live = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._symbols)
+
+    def __contains__(self, symbol):
+        return symbol in self._index
+
+    def _row(self, symbol):
+        row = self._index.get(symbol)
+        if row is None:
+            row = len(self._symbols)
+            capacity = len(self._columns['close'])
+            if row == capacity:
+                for name, column in self._columns.items():
+                    grown = np.full(capacity * 2, np.nan)
+                    grown[:capacity] = column
+                    self._columns[name] = grown
+            self._index[symbol] = row
+            self._symbols.append(symbol)
+        return row
+
+    def upsert(self, symbol, values):
+        """Set column values for a symbol (unknown keys are ignored)"""
+        with self._lock:
+            row = self._row(symbol)
+            for name, value in values.items():
+                if name in self._columns:
+                    self._columns[name][row] = np.nan if value is None else value
+
+    def update_snapshot(self, snapshot):
+        """Refresh a symbol's row from a fetched StockSnapshot"""
+        tech = snapshot['technical_analysis'] or {}
+        values = {name: tech.get(name) for name in SCREENER_COLUMNS if name in tech}
+        values.update({
+            'close': snapshot['current_price'],
+            'price_change_pct': snapshot['price_change_pct'],
+            'volume': snapshot['volume'],
+            'avg_volume': snapshot['avg_volume'],
+            'market_cap': snapshot['market_cap'],
+            'pe_ratio': snapshot['pe_ratio'],
+            'high_52w': snapshot['high_52w'],
+            'low_52w': snapshot['low_52w']
+        })
+        self.upsert(snapshot['symbol'], values)
+
+        history = snapshot['price_history']
+        if history is not None and len(history):
+            with self._lock:
+                self._live[snapshot['symbol']] = IncrementalIndicators(history['Close'].to_numpy())
+
+    def update_bar(self, symbol, close, volume=None, new_bar=True):
+        """Apply a new bar (or a revised last price when new_bar is False) to one row"""
+        with self._lock:
+            state = self._live.get(symbol)
+        if state is None:
+            state = IncrementalIndicators([close])
+            with self._lock:
+                self._live[symbol] = state
+
+        previous_close = state.last_close
+        if new_bar:
+            state.push(close)
+        else:
+            state.update_last(close)
+
+        values = state.values()
+        if new_bar and previous_close:
+            values['price_change_pct'] = round((close - previous_close) / previous_close * 100, 2)
+        if volume is not None:
+            values['volume'] = volume
+        self.upsert(symbol, values)
+        return values
+
+    def columns(self):
+        """Zero-copy views of the populated part of every column"""
+        n = len(self._symbols)
+        return {name: column[:n] for name, column in self._columns.items()}
+
+    def to_frame(self):
+        with self._lock:
+            return pd.DataFrame(self.columns(), index=pd.Index(list(self._symbols), name='symbol'))
+
+    def screen(self, expression=None, sort_by=None, ascending=True, top_k=None):
+        """Rows matching expression, optionally sorted by a column and cut to the top k"""
+        with self._lock:
+            columns = self.columns()
+            symbols = np.array(self._symbols, dtype=object)
+
+            mask = np.ones(len(symbols), dtype=bool)
+            if expression and expression.strip():
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    mask = np.broadcast_to(np.asarray(compile_expression(expression)(columns), dtype=bool), mask.shape)
+            rows = np.flatnonzero(mask)
+
+            if sort_by:
+                sort_by = COLUMN_ALIASES.get(sort_by, sort_by)
+                if sort_by not in columns:
+                    raise ValueError(f"Unknown sort column: {sort_by!r}")
+                keys = columns[sort_by][rows]
+                order = np.argsort(keys if ascending else -keys, kind='stable')
+                rows = rows[order]
+            if top_k is not None:
+                rows = rows[:top_k]
+
+            return pd.DataFrame(
+                {name: column[rows] for name, column in columns.items()},
+                index=pd.Index(symbols[rows], name='symbol')
+            )
+
+
+_table = None
+_table_lock = threading.Lock()
+
+
+def get_indicator_table():
+    """Return the process-wide IndicatorTable"""
+    global _table
+    if _table is None:
+        with _table_lock:
+            if _table is None:
+                _table = IndicatorTable()
+    return _table
@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+
+from news_index import tokenize
+
+# Finance-tuned lexicon (Loughran-McDonald style): term -> polarity weight
+FINANCE_LEXICON = {
+    # Positive
+    'beat': 1.5, 'beats': 1.5, 'surge': 2.0, 'surges': 2.0, 'surged': 2.0, 'soar': 2.0, 'soars': 2.0,
+    'rally': 1.5, 'rallies': 1.5, 'gain': 1.0, 'gains': 1.0, 'growth': 1.0, 'grow': 1.0, 'grows': 1.0,
+    'strong': 1.0, 'stronger': 1.0, 'strengthens': 1.0, 'record': 1.0, 'upgrade': 2.0, 'upgraded': 2.0,
+    'outperform': 1.5, 'outperforms': 1.5, 'bullish': 2.0, 'profit': 1.0, 'profitable': 1.0,
+    'exceed': 1.5, 'exceeds': 1.5, 'exceeded': 1.5, 'expand': 0.5, 'expands': 0.5, 'expansion': 0.5,
+    'boost': 1.0, 'boosts': 1.0, 'rise': 1.0, 'rises': 1.0, 'jump': 1.5, 'jumps': 1.5,
+    'optimistic': 1.5, 'optimism': 1.5, 'recovery': 1.0, 'accelerate': 1.0, 'accelerates': 1.0,
+    'leads': 0.5, 'leadership': 0.5, 'dominate': 1.0, 'dominates': 1.0, 'better': 1.0,
+    'higher': 0.5, 'innovation': 0.5, 'breakthrough': 1.5, 'buyback': 1.0, 'dividend': 0.5,
+    # Negative
+    'miss': -1.5, 'misses': -1.5, 'missed': -1.5, 'plunge': -2.0, 'plunges': -2.0, 'plunged': -2.0,
+    'drop': -1.0, 'drops': -1.0, 'fall': -1.0, 'falls': -1.0, 'fell': -1.0, 'decline': -1.0,
+    'declines': -1.0, 'loss': -1.5, 'losses': -1.5, 'weak': -1.0, 'weaker': -1.0, 'weakness': -1.0,
+    'downgrade': -2.0, 'downgraded': -2.0, 'underperform': -1.5, 'bearish': -2.0, 'lawsuit': -1.5,
+    'probe': -1.0, 'investigation': -1.0, 'fine': -0.5, 'fined': -1.5, 'recall': -1.5,
+    'layoffs': -1.5, 'cut': -1.0, 'cuts': -1.0, 'slow': -1.0, 'slows': -1.0, 'slowed': -1.0,
+    'slowdown': -1.5, 'pressure': -1.0, 'volatility': -0.5, 'volatile': -0.5, 'risk': -0.5,
+    'risks': -0.5, 'uncertainty': -1.0, 'challenges': -0.5, 'concerns': -1.0, 'warning': -1.0,
+    'warns': -1.5, 'bankruptcy': -3.0, 'default': -2.0, 'crash': -2.5, 'selloff': -2.0,
+    'lower': -0.5, 'worse': -1.0, 'disappointing': -1.5, 'delay': -1.0, 'delays': -1.0,
+    'tariff': -0.5, 'tariffs': -0.5, 'regulatory': -0.5, 'antitrust': -1.0
+}
+
+NEGATORS = frozenset(['not', 'no', 'never', 'without', 'despite', 'fails', 'failed'])
+
+# Scores above/below these thresholds are labeled Bullish/Bearish
+BULLISH_THRESHOLD = 0.15
+BEARISH_THRESHOLD = -0.15
+
+# Normalization constant: score = total / sqrt(total^2 + ALPHA), mapping to (-1, 1)
+_ALPHA = 15.0
+
+
+def _day(date):
+    """Calendar day of a naive or tz-aware datetime"""
+    day = pd.Timestamp(date)
+    if day.tzinfo is not None:
+        day = day.tz_convert('UTC').tz_localize(None)
+    return day.normalize()
+
+
+def sentiment_label(score):
+    """Bullish/Bearish/Neutral label for a score in [-1, 1]"""
+    if score is None or np.isnan(score):
+        return 'Neutral'
+    if score > BULLISH_THRESHOLD:
+        return 'Bullish'
+    if score < BEARISH_THRESHOLD:
+        return 'Bearish'
+    return 'Neutral'
+
+
+class SentimentScorer:
+    """Vectorized lexicon-based news sentiment scorer.
+
+    All texts are tokenized into one flat array of vocabulary ids; lexicon
+    weights, negation flips and per-document sums are then computed with
+    NumPy in a single pass, so scoring the whole article store costs no
+    LLM calls.
+    """
+
+    def __init__(self, lexicon=FINANCE_LEXICON, negators=NEGATORS):
+        self.vocab = {term: i for i, term in enumerate(lexicon)}
+        self.weights = np.array(list(lexicon.values()), dtype=np.float64)
+        self.negator_id = len(self.vocab)
+        for negator in negators:
+            self.vocab.setdefault(negator, self.negator_id)
+
+    def score_texts(self, texts):
+        """Scores in (-1, 1) for each text"""
+        n_docs = len(texts)
+        if not n_docs:
+            return np.zeros(0)
+
+        ids = []
+        lengths = []
+        for text in texts:
+            doc_ids = [self.vocab.get(token, -1) for token in tokenize(text)]
+            ids.extend(doc_ids)
+            lengths.append(len(doc_ids))
+        ids = np.asarray(ids, dtype=np.int64)
+        doc_index = np.repeat(np.arange(n_docs), lengths)
+
+        is_negator = ids == self.negator_id
+        hits = (ids >= 0) & ~is_negator
+        weights = np.zeros(len(ids))
+        weights[hits] = self.weights[ids[hits]]
+
+        # A negator immediately before a term (within the same text) flips its polarity
+        negated = np.zeros(len(ids), dtype=bool)
+        if len(ids) > 1:
+            negated[1:] = is_negator[:-1] & (doc_index[1:] == doc_index[:-1])
+        weights[negated] *= -1
+
+        totals = np.bincount(doc_index, weights=weights, minlength=n_docs)
+        return totals / np.sqrt(totals ** 2 + _ALPHA)
+
+    def score_articles(self, articles):
+        """Scores for article dicts (title counted twice, then summary)"""
+        return self.score_texts([
+            f"{article['title']} {article['title']} {article.get('summary') or ''}"
+            for article in articles
+        ])
+
+    def aggregate(self, articles, symbols_by_article, scores=None):
+        """Per-symbol, per-day mean sentiment.
+
+        ``symbols_by_article`` lists the symbols of each article (same order).
+        Returns a DataFrame with columns symbol, day, sentiment, articles.
+        """
+        if scores is None:
+            scores = self.score_articles(articles)
+        rows = [
+            (symbol, _day(article['date']), score)
+            for article, symbols, score in zip(articles, symbols_by_article, scores)
+            for symbol in symbols
+        ]
+        frame = pd.DataFrame(rows, columns=['symbol', 'day', 'score'])
+        return (
+            frame.groupby(['symbol', 'day'])['score']
+            .agg(sentiment='mean', articles='count')
+            .reset_index()
+        )
+
+
+_scorer = None
+
+
+def get_sentiment_scorer():
+    """Shared SentimentScorer instance"""
+    global _scorer
+    if _scorer is None:
+        _scorer = SentimentScorer()
+    return _scorer
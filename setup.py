@@ -5,7 +5,7 @@ setup(
     version="1.0.0",
     packages=find_packages(),
     install_requires=[
-        "streamlit>=1.28.0",
+        "streamlit>=1.37.0",
         "pandas>=2.2.0,<3.0.0",
         "yfinance>=0.2.18",
         "requests>=2.31.0",
@@ -17,6 +17,7 @@ setup(
         "seaborn>=0.12.0",
         "google-generativeai>=0.3.0",
         "python-dotenv>=1.0.0",
+        "aiohttp>=3.9.0",
     ],
     python_requires=">=3.8,<3.13",
     author="Your Name",
@@ -0,0 +1,57 @@
+import threading
+
+
+class _Call:
+    """An in-flight call shared by every caller of the same key"""
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesce concurrent identical calls into one.
+
+    While a call for ``key`` is in flight, other callers with the same key
+    wait for it and receive the same result (or the same exception) instead
+    of starting their own. Once the call finishes the key is released, so
+    the next call fetches fresh data.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) once per concurrent key and share the result"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result
+
+    def in_flight(self, key):
+        """Whether a call for key is currently running"""
+        with self._lock:
+            return key in self._calls
@@ -6,26 +6,142 @@ import time
 import random
 import requests
 import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+from config import (
+    STOCK_NAMES, FETCH_BUDGET, FETCH_DEADLINE, FETCH_BACKOFF_BASE, FETCH_BACKOFF_MAX, PERIOD_SLICE_MAX_AGE
+)
+from stock_snapshot import StockSnapshot
+from history_store import get_history_store, history_frame
+from screener import get_indicator_table
+from indicators import compute as compute_indicators
+from arrow_io import get_arrow_store
+
+# 后台刷新线程池；进程级请求合并：同一 (symbol, period) 同时只有一次刷新在进行
+_refresh_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='stock-refresh')
+_refreshes = {}
+_refresh_lock = threading.RLock()
+
+# 每个 (symbol, period) 上次成功获取的真实数据，超出时间预算或全部数据源失败时返回
+_last_good = {}
+
+# 每个 (symbol, period) 最近一次刷新的结果（含模拟数据），用于 max_age 内直接复用
+_latest = {}
+
+# symbol -> 成功获取过真实数据的最长 period；较短 period 的请求从这份历史切片返回，不再单独请求
+_longest_period = {}
+
+# host -> 冷却结束时间（time.monotonic），来自服务端的 Retry-After
+_host_cooldowns = {}
+_cooldown_lock = threading.Lock()
+
+BACKUP_API_HOST = 'query1.finance.yahoo.com'
+
+
+class DeadlineExceeded(Exception):
+    """剩余时间预算不足以发起请求"""
+
+
+# yfinance 支持的 period（对外接口只接受这些值）
+YFINANCE_PERIODS = ('1d', '5d', '1mo', '3mo', '6mo', '1y', '2y', '5y', '10y', 'ytd', 'max')
+
+# yfinance 的 period：'5d' 按交易日计，'wk'/'mo'/'y' 按自然周/月/年计
+_PERIOD_UNITS = {'wk': 'weeks', 'mo': 'months', 'y': 'years'}
+_PERIOD_DAYS = {'wk': 7, 'mo': 31, 'y': 366}
+
+
+def _period_days(period):
+    """period 覆盖的大致自然日数（用于比较长短）；'max' 为无穷大，无法识别时返回 None"""
+    if period == 'max':
+        return float('inf')
+    if period == 'ytd':
+        return datetime.now().timetuple().tm_yday
+    for unit, days in _PERIOD_DAYS.items():
+        if period.endswith(unit) and period[:-len(unit)].isdigit():
+            return int(period[:-len(unit)]) * days
+    if period.endswith('d') and period[:-1].isdigit():
+        return int(period[:-1]) * 7 / 5
+    return None
+
+
+def _period_start(index, period):
+    """按 period 截取历史时的起始位置（index 为按日期升序的 DatetimeIndex）"""
+    if period == 'max' or not len(index):
+        return 0
+    if period.endswith('d') and period[:-1].isdigit():
+        return max(len(index) - int(period[:-1]), 0)
+    last = index[-1]
+    if period == 'ytd':
+        start = pd.Timestamp(year=last.year, month=1, day=1)
+    else:
+        unit = next(unit for unit in _PERIOD_UNITS if period.endswith(unit))
+        start = last - pd.DateOffset(**{_PERIOD_UNITS[unit]: int(period[:-len(unit)])})
+    return int(index.searchsorted(start, side='right'))
+
+
+def _parse_retry_after(value):
+    """解析 Retry-After 头（秒数或HTTP日期），返回需要等待的秒数"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max((when - datetime.now(when.tzinfo)).total_seconds(), 0.0)
+
+
+def _cooldown_remaining(host):
+    """该 host 还需冷却的秒数"""
+    with _cooldown_lock:
+        return max(_host_cooldowns.get(host, 0) - time.monotonic(), 0.0)
+
+
+def _backoff_delay(attempt):
+    """指数退避（full jitter）：第 attempt 次重试前等待的秒数"""
+    return random.uniform(0, min(FETCH_BACKOFF_MAX, FETCH_BACKOFF_BASE * 2 ** attempt))
+
+
+def _http_get(url, deadline=None, timeout=10, **kwargs):
+    """GET 请求：超时不超过剩余预算，遵守服务端的 Retry-After 冷却"""
+    host = urlparse(url).netloc
+    wait = _cooldown_remaining(host)
+    if wait > 0:
+        raise requests.exceptions.RetryError(f"{host} 要求 {wait:.0f} 秒后重试")
+    if deadline is not None:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise DeadlineExceeded(f"请求 {host} 前时间预算已用完")
+        timeout = min(timeout, remaining)
+    
+    response = requests.get(url, timeout=timeout, **kwargs)
+    if response.status_code in (429, 503):
+        retry_after = _parse_retry_after(response.headers.get('Retry-After'))
+        if retry_after:
+            with _cooldown_lock:
+                _host_cooldowns[host] = time.monotonic() + retry_after
+    response.raise_for_status()
+    return response
 
 class StockDataFetcher:
     def __init__(self):
-        self.stock_info = {
-            'AAPL': 'Apple Inc.',
-            'MSFT': 'Microsoft Corporation',
-            'GOOGL': 'Alphabet Inc.',
-            'AMZN': 'Amazon.com Inc.',
-            'TSLA': 'Tesla Inc.',
-            'NVDA': 'NVIDIA Corporation',
-            'AMD': 'Advanced Micro Devices Inc.',
-            'INTC': 'Intel Corporation',
-            'CRM': 'Salesforce Inc.',
-            'ADBE': 'Adobe Inc.',
-            'META': 'Meta Platforms Inc.',
-            'NFLX': 'Netflix Inc.',
-            'PYPL': 'PayPal Holdings Inc.',
-            'SQ': 'Block Inc.',
-            'UBER': 'Uber Technologies Inc.'
-        }
+        self.stock_info = dict(STOCK_NAMES)
+        
+        # 进程级共享的历史数据存储（所有会话共用同一份只读缓冲区）
+        self.history_store = get_history_store()
+        
+        # 进程级共享的筛选器指标表（每只股票一行）
+        self.indicator_table = get_indicator_table()
+        
+        # 历史和指标序列的 Arrow 文件（内存映射读取，多进程共享同一份页缓存）；未安装 pyarrow 时为 None
+        self.arrow_store = get_arrow_store()
         
         # Robinhood API endpoints
         self.robinhood_base = "https://api.robinhood.com"
@@ -37,25 +153,205 @@ class StockDataFetcher:
             'META': 298.45, 'NFLX': 495.23, 'PYPL': 62.34, 'SQ': 78.90, 'UBER': 42.15
         }
     
-    def get_stock_data(self, symbol, period='1y', max_retries=3):
-        """获取股票基本数据"""
+    def get_stock_data(self, symbol, period='1y', max_retries=3, budget=FETCH_BUDGET, max_age=0):
+        """获取股票基本数据
+
+        最多等待 budget 秒（None 表示一直等待）。超时后返回上次成功获取的数据
+        （stale=True），刷新在后台继续；并发的相同请求共享同一次刷新。
+        上次成功获取的数据不超过 max_age 秒时直接返回，不发起刷新。
+        已缓存更长 period 的真实历史时，直接从中切片（零拷贝视图）返回，不发起请求；
+        那份历史超过 PERIOD_SLICE_MAX_AGE 秒时返回切片（stale=True）并在后台刷新。
+        只有请求的跨度超出已缓存的历史时才按新 period 请求。
+        """
+        fetch_period = self._covering_period(symbol, period)
+        if fetch_period != period:
+            cached = _last_good.get((symbol, fetch_period))
+            if cached is not None:
+                if time.time() - cached.fetched_at > max(max_age, PERIOD_SLICE_MAX_AGE):
+                    self._refresh(symbol, fetch_period, max_retries)
+                    cached = cached.copy(stale=True)
+                return self._slice_period(cached, period)
+        return self._get_period_data(symbol, period, max_retries, budget, max_age)
+    
+    @staticmethod
+    def _covering_period(symbol, period):
+        """已缓存且覆盖 period 的最长 period；没有时返回 period 本身"""
+        requested = _period_days(period)
+        cached = _longest_period.get(symbol)
+        if requested is None or cached is None or _period_days(cached) < requested:
+            return period
+        return cached
+    
+    @staticmethod
+    def _slice_period(data, period):
+        """截取最近 period 的历史和指标序列；iloc 切片是共享缓冲区上的视图，不复制数据"""
+        history = data.price_history
+        if history is None or not len(history):
+            return data
+        start = _period_start(history.index, period)
+        series = data.indicator_series
+        return data.copy(
+            price_history=history.iloc[start:],
+            indicator_series=series.iloc[start:] if series is not None else None
+        )
+    
+    def _get_period_data(self, symbol, period, max_retries, budget, max_age):
+        """按 period 获取数据：max_age 内复用最近结果，否则刷新，超出预算时返回缓存"""
+        latest = _latest.get((symbol, period))
+        if max_age and latest is not None and time.time() - latest.fetched_at <= max_age:
+            return latest
+        
+        future = self._refresh(symbol, period, max_retries)
+        try:
+            return future.result(timeout=budget)
+        except FutureTimeout:
+            cached = _last_good.get((symbol, period))
+            if cached is not None:
+                print(f"{symbol} 获取超出 {budget} 秒预算，返回缓存数据，后台继续刷新")
+                return cached.copy(stale=True)
+            cached = self._load_arrow_snapshot(symbol, period)
+            if cached is not None:
+                print(f"{symbol} 获取超出 {budget} 秒预算，返回 Arrow 文件中的数据，后台继续刷新")
+                return cached
+            print(f"{symbol} 获取超出 {budget} 秒预算且无缓存，返回模拟数据")
+            return self._create_improved_mock_data(symbol)
+    
+    def _refresh(self, symbol, period, max_retries):
+        """启动（或复用进行中的）后台刷新，返回 Future"""
+        key = (symbol, period)
+        with _refresh_lock:
+            future = _refreshes.get(key)
+            if future is None:
+                future = _refresh_pool.submit(self._fetch_stock_data, symbol, period, max_retries)
+                _refreshes[key] = future
+                future.add_done_callback(lambda done: self._release_refresh(key, done))
+        return future
+    
+    @staticmethod
+    def _release_refresh(key, future):
+        with _refresh_lock:
+            if _refreshes.get(key) is future:
+                del _refreshes[key]
+    
+    def _fetch_stock_data(self, symbol, period, max_retries):
+        """获取数据，记录最近一次成功结果，并刷新筛选器指标表中该股票的一行"""
+        deadline = time.monotonic() + FETCH_DEADLINE
+        data = self._fetch_from_sources(symbol, period, max_retries, deadline)
+        data.fetched_at = time.time()
+        
+        if data.source == 'mock':
+            # 真实数据源全部失败时，优先返回上次成功的真实数据，而不是随机模拟数据
+            cached = _last_good.get((symbol, period))
+            if cached is not None:
+                print(f"所有数据源均失败，返回 {symbol} 上次成功获取的数据")
+                return cached.copy(stale=True)
+            cached = self._load_arrow_snapshot(symbol, period)
+            if cached is not None:
+                print(f"所有数据源均失败，返回 Arrow 文件中 {symbol} 上次成功获取的数据")
+                return cached
+        else:
+            _last_good[(symbol, period)] = data
+            with _refresh_lock:
+                longest = _longest_period.get(symbol)
+                if _period_days(period) is not None and (longest is None or _period_days(period) > _period_days(longest)):
+                    _longest_period[symbol] = period
+            self._write_arrow(data, period)
+        _latest[(symbol, period)] = data
+        
+        if data.source == 'mock':
+            # 模拟数据不写入筛选器指标表，避免随机价格和指标与真实数据并列显示
+            return data
+        try:
+            self.indicator_table.update_snapshot(data)
+        except Exception as e:
+            print(f"更新 {symbol} 筛选器数据时出错: {e}")
+        return data
+    
+    def _write_arrow(self, data, period):
+        """把真实数据的历史和指标序列按 (symbol, period) 写成 Arrow 文件，供其他进程和重启后内存映射读取
+
+        文件按 period 区分，较短 period 的获取不会覆盖较长的历史；无法识别的 period 不写入。
+        """
+        if self.arrow_store is None or _period_days(period) is None:
+            return
+        try:
+            self.arrow_store.put_history(data.symbol, data.price_history, period)
+            if data.indicator_series is not None:
+                self.arrow_store.put_indicators(data.symbol, data.indicator_series, period)
+        except Exception as e:
+            print(f"写入 {data.symbol} Arrow 文件时出错: {e}")
+    
+    def _load_arrow_snapshot(self, symbol, period):
+        """由 Arrow 文件中该 period 上次成功获取的历史构造快照（stale=True），没有文件时返回 None
+
+        文件以内存映射方式打开，快照直接引用映射的只读页（零拷贝，也不写入共享历史存储，
+        不会与后台进行中的刷新相互覆盖）；指标序列直接使用文件中的结果，不重新计算。
+        """
+        if self.arrow_store is None or _period_days(period) is None:
+            return None
+        try:
+            hist_data = self.arrow_store.get_history(symbol, period)
+            if hist_data is None or len(hist_data) == 0:
+                return None
+            series = self.arrow_store.get_indicators(symbol, period)
+            fetched_at = os.path.getmtime(self.arrow_store.path('history', symbol, period))
+        except Exception as e:
+            print(f"读取 {symbol} Arrow 文件时出错: {e}")
+            return None
+        
+        if series is not None and not series.index.equals(hist_data.index):
+            series = None
+        
+        current_price = float(hist_data['Close'].iloc[-1])
+        previous_close = float(hist_data['Close'].iloc[-2]) if len(hist_data) > 1 else current_price
+        price_change = current_price - previous_close
+        
+        data = StockSnapshot(
+            symbol=symbol,
+            name=self.stock_info.get(symbol, symbol),
+            current_price=round(current_price, 2),
+            previous_close=round(previous_close, 2),
+            high_52w=round(float(hist_data['High'].max()), 2),
+            low_52w=round(float(hist_data['Low'].min()), 2),
+            volume=int(hist_data['Volume'].iloc[-1]),
+            avg_volume=int(hist_data['Volume'].mean()),
+            pe_ratio=None,
+            market_cap=None,
+            price_change=round(price_change, 2),
+            price_change_pct=round(price_change / previous_close * 100 if previous_close else 0, 2),
+            price_history=hist_data,
+            source='arrow',
+            fetched_at=fetched_at,
+            stale=True
+        )
+        data.technical_analysis, data.indicator_series = self._calculate_technical_indicators(
+            hist_data, return_series=True, series=series
+        )
+        return data
+    
+    def _fetch_from_sources(self, symbol, period, max_retries, deadline=None):
+        """在截止时间内依次尝试各数据源获取股票数据"""
         # 首先尝试使用Robinhood API获取真实数据
-        data = self._get_robinhood_data(symbol)
+        data = self._get_robinhood_data(symbol, deadline)
         if data:
             return data
         
         # 如果Robinhood失败，尝试yfinance
-        data = self._get_yfinance_data(symbol, period)
+        data = self._get_yfinance_data(symbol, period, deadline)
         if data:
             return data
         
-        # 如果yfinance失败，尝试备用API
+        # 如果yfinance失败，尝试备用API（指数退避，遵守 Retry-After，不超过截止时间）
         for attempt in range(max_retries):
             try:
                 if attempt > 0:
-                    time.sleep(random.uniform(1, 3))
+                    delay = max(_backoff_delay(attempt - 1), _cooldown_remaining(BACKUP_API_HOST))
+                    if deadline is not None and time.monotonic() + delay >= deadline:
+                        print(f"{symbol} 重试将超出截止时间，停止重试")
+                        break
+                    time.sleep(delay)
                 
-                data = self._get_backup_api_data(symbol)
+                data = self._get_backup_api_data(symbol, deadline)
                 if data:
                     return data
                     
@@ -66,7 +362,7 @@ class StockDataFetcher:
         print(f"使用改进的模拟数据为 {symbol}")
         return self._create_improved_mock_data(symbol)
     
-    def _get_robinhood_data(self, symbol):
+    def _get_robinhood_data(self, symbol, deadline=None):
         """使用Robinhood API获取真实股票数据"""
         try:
             # Robinhood股票信息API
@@ -79,8 +375,7 @@ class StockDataFetcher:
                 'Accept': 'application/json'
             }
             
-            response = requests.get(url, params=params, headers=headers, timeout=10)
-            response.raise_for_status()
+            response = _http_get(url, deadline, params=params, headers=headers)
             
             data = response.json()
             
@@ -93,27 +388,30 @@ class StockDataFetcher:
                 price_change_pct = (price_change / previous_close) * 100 if previous_close else 0
                 
                 # 获取历史数据
-                hist_data = self._get_robinhood_history(symbol)
+                hist_data = self._get_robinhood_history(symbol, deadline)
                 if hist_data is None:
                     hist_data = self._create_simple_hist_data(symbol, current_price)
                 
-                data = {
-                    'symbol': symbol,
-                    'name': self.stock_info.get(symbol, symbol),
-                    'current_price': round(current_price, 2),
-                    'previous_close': round(previous_close, 2),
-                    'high_52w': round(float(quote.get('high_52_weeks', current_price * 1.2)), 2),
-                    'low_52w': round(float(quote.get('low_52_weeks', current_price * 0.8)), 2),
-                    'volume': int(quote.get('volume', 1000000)),
-                    'avg_volume': int(quote.get('average_volume', 5000000)),
-                    'pe_ratio': quote.get('pe_ratio', 'N/A'),
-                    'market_cap': self._format_market_cap(float(quote.get('market_cap', current_price * 1000000000))),
-                    'price_change': round(price_change, 2),
-                    'price_change_pct': round(price_change_pct, 2),
-                    'price_history': hist_data
-                }
+                data = StockSnapshot(
+                    symbol=symbol,
+                    name=self.stock_info.get(symbol, symbol),
+                    current_price=round(current_price, 2),
+                    previous_close=round(previous_close, 2),
+                    high_52w=round(float(quote.get('high_52_weeks', current_price * 1.2)), 2),
+                    low_52w=round(float(quote.get('low_52_weeks', current_price * 0.8)), 2),
+                    volume=int(quote.get('volume', 1000000)),
+                    avg_volume=int(quote.get('average_volume', 5000000)),
+                    pe_ratio=quote.get('pe_ratio'),
+                    market_cap=float(quote.get('market_cap', current_price * 1000000000)),
+                    price_change=round(price_change, 2),
+                    price_change_pct=round(price_change_pct, 2),
+                    price_history=hist_data,
+                    source='robinhood'
+                )
                 
-                data['technical_analysis'] = self._calculate_technical_indicators(hist_data)
+                data.technical_analysis, data.indicator_series = self._calculate_technical_indicators(
+                    hist_data, return_series=True
+                )
                 
                 print(f"✅ 成功从Robinhood获取 {symbol} 真实数据")
                 return data
@@ -122,7 +420,38 @@ class StockDataFetcher:
             print(f"Robinhood获取 {symbol} 数据时出错: {e}")
             return None
     
-    def _get_robinhood_history(self, symbol):
+    def get_quotes(self, symbols):
+        """批量获取最新报价（仅报价接口，一次请求，不拉取历史数据）
+
+        返回 {symbol: {'price', 'previous_close', 'volume'}}，失败时返回空字典
+        """
+        try:
+            url = f"{self.robinhood_base}/quotes/"
+            params = {'symbols': ','.join(symbols)}
+            headers = {
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+                'Accept': 'application/json'
+            }
+            
+            response = _http_get(url, params=params, headers=headers, timeout=5)
+            
+            quotes = {}
+            for quote in response.json().get('results') or []:
+                if not quote or not quote.get('last_trade_price'):
+                    continue
+                price = float(quote['last_trade_price'])
+                quotes[quote['symbol']] = {
+                    'price': price,
+                    'previous_close': float(quote.get('previous_close') or price),
+                    'volume': int(quote.get('volume') or 0)
+                }
+            return quotes
+            
+        except Exception as e:
+            print(f"批量获取报价时出错: {e}")
+            return {}
+    
+    def _get_robinhood_history(self, symbol, deadline=None):
         """获取Robinhood历史数据"""
         try:
             # 获取股票instrument ID
@@ -130,8 +459,7 @@ class StockDataFetcher:
             params = {'symbol': symbol}
             headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
             
-            response = requests.get(instrument_url, params=params, headers=headers, timeout=10)
-            response.raise_for_status()
+            response = _http_get(instrument_url, deadline, params=params, headers=headers)
             
             instrument_data = response.json()
             if 'results' not in instrument_data or not instrument_data['results']:
@@ -150,27 +478,22 @@ class StockDataFetcher:
                 'bounds': 'regular'
             }
             
-            response = requests.get(hist_url, params=params, headers=headers, timeout=10)
-            response.raise_for_status()
+            response = _http_get(hist_url, deadline, params=params, headers=headers)
             
             hist_data = response.json()
             
             if 'historicals' in hist_data and hist_data['historicals']:
-                # 转换为DataFrame格式
-                df_data = []
-                for point in hist_data['historicals']:
-                    df_data.append({
-                        'Date': datetime.strptime(point['begins_at'][:10], '%Y-%m-%d'),
-                        'Open': float(point['open_price']),
-                        'High': float(point['high_price']),
-                        'Low': float(point['low_price']),
-                        'Close': float(point['close_price']),
-                        'Volume': int(point['volume'])
-                    })
-                
-                df = pd.DataFrame(df_data)
-                df.set_index('Date', inplace=True)
-                return df
+                # 按列写入共享历史存储
+                points = hist_data['historicals']
+                return self.history_store.put(
+                    symbol,
+                    [point['begins_at'][:10] for point in points],
+                    [float(point['open_price']) for point in points],
+                    [float(point['high_price']) for point in points],
+                    [float(point['low_price']) for point in points],
+                    [float(point['close_price']) for point in points],
+                    [int(point['volume']) for point in points]
+                )
             
             return None
             
@@ -178,55 +501,66 @@ class StockDataFetcher:
             print(f"获取 {symbol} Robinhood历史数据时出错: {e}")
             return None
 
-    def _get_yfinance_data(self, symbol, period):
+    def _get_yfinance_data(self, symbol, period, deadline=None):
         """使用yfinance获取真实股票数据"""
         try:
             # 获取股票信息
             ticker = yf.Ticker(symbol)
             
             # 获取历史数据
-            hist_data = ticker.history(period=period)
+            timeout = 10
+            if deadline is not None:
+                timeout = min(timeout, deadline - time.monotonic())
+                if timeout <= 0:
+                    raise DeadlineExceeded("请求yfinance前时间预算已用完")
+            hist_data = ticker.history(period=period, timeout=timeout)
             
             if hist_data.empty:
                 print(f"yfinance无法获取 {symbol} 的历史数据")
                 return None
             
+            # 写入共享历史存储，后续只使用只读视图
+            hist_data = self.history_store.put_frame(symbol, hist_data)
+            
             # 获取基本信息
             info = ticker.info
             
             # 计算当前价格和变化
-            current_price = hist_data['Close'].iloc[-1]
-            previous_close = hist_data['Close'].iloc[-2] if len(hist_data) > 1 else current_price
+            current_price = float(hist_data['Close'].iloc[-1])
+            previous_close = float(hist_data['Close'].iloc[-2]) if len(hist_data) > 1 else current_price
             price_change = current_price - previous_close
             price_change_pct = (price_change / previous_close) * 100 if previous_close != 0 else 0
             
             # 计算52周高低点
-            high_52w = hist_data['High'].max()
-            low_52w = hist_data['Low'].min()
+            high_52w = float(hist_data['High'].max())
+            low_52w = float(hist_data['Low'].min())
             
             # 获取最新交易量
             volume = hist_data['Volume'].iloc[-1]
             avg_volume = hist_data['Volume'].mean()
             
             # 格式化数据
-            data = {
-                'symbol': symbol,
-                'name': self.stock_info.get(symbol, symbol),
-                'current_price': round(current_price, 2),
-                'previous_close': round(previous_close, 2),
-                'high_52w': round(high_52w, 2),
-                'low_52w': round(low_52w, 2),
-                'volume': int(volume),
-                'avg_volume': int(avg_volume),
-                'pe_ratio': info.get('trailingPE', 'N/A'),
-                'market_cap': self._format_market_cap(info.get('marketCap', 0)),
-                'price_change': round(price_change, 2),
-                'price_change_pct': round(price_change_pct, 2),
-                'price_history': hist_data
-            }
+            data = StockSnapshot(
+                symbol=symbol,
+                name=self.stock_info.get(symbol, symbol),
+                current_price=round(current_price, 2),
+                previous_close=round(previous_close, 2),
+                high_52w=round(high_52w, 2),
+                low_52w=round(low_52w, 2),
+                volume=int(volume),
+                avg_volume=int(avg_volume),
+                pe_ratio=info.get('trailingPE'),
+                market_cap=info.get('marketCap'),
+                price_change=round(price_change, 2),
+                price_change_pct=round(price_change_pct, 2),
+                price_history=hist_data,
+                source='yfinance'
+            )
             
             # 计算技术指标
-            data['technical_analysis'] = self._calculate_technical_indicators(hist_data)
+            data.technical_analysis, data.indicator_series = self._calculate_technical_indicators(
+                hist_data, return_series=True
+            )
             
             print(f"✅ 成功从yfinance获取 {symbol} 真实数据")
             return data
@@ -235,17 +569,16 @@ class StockDataFetcher:
             print(f"yfinance获取 {symbol} 数据时出错: {e}")
             return None
     
-    def _get_backup_api_data(self, symbol):
+    def _get_backup_api_data(self, symbol, deadline=None):
         """备用API获取数据"""
         try:
             # 使用Yahoo Finance API
-            url = f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}"
+            url = f"https://{BACKUP_API_HOST}/v8/finance/chart/{symbol}"
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
             }
             
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
+            response = _http_get(url, deadline, headers=headers)
             
             data = response.json()
             
@@ -258,23 +591,26 @@ class StockDataFetcher:
                 price_change = current_price - previous_close
                 price_change_pct = (price_change / previous_close) * 100 if previous_close else 0
                 
-                data = {
-                    'symbol': symbol,
-                    'name': self.stock_info.get(symbol, symbol),
-                    'current_price': round(current_price, 2),
-                    'previous_close': round(previous_close, 2),
-                    'high_52w': round(meta.get('fiftyTwoWeekHigh', current_price * 1.2), 2),
-                    'low_52w': round(meta.get('fiftyTwoWeekLow', current_price * 0.8), 2),
-                    'volume': meta.get('volume', 1000000),
-                    'avg_volume': meta.get('regularMarketVolume', 5000000),
-                    'pe_ratio': 'N/A',
-                    'market_cap': self._format_market_cap(meta.get('marketCap', current_price * 1000000000)),
-                    'price_change': round(price_change, 2),
-                    'price_change_pct': round(price_change_pct, 2),
-                    'price_history': self._create_simple_hist_data(symbol, current_price)
-                }
+                data = StockSnapshot(
+                    symbol=symbol,
+                    name=self.stock_info.get(symbol, symbol),
+                    current_price=round(current_price, 2),
+                    previous_close=round(previous_close, 2),
+                    high_52w=round(meta.get('fiftyTwoWeekHigh', current_price * 1.2), 2),
+                    low_52w=round(meta.get('fiftyTwoWeekLow', current_price * 0.8), 2),
+                    volume=meta.get('volume', 1000000),
+                    avg_volume=meta.get('regularMarketVolume', 5000000),
+                    pe_ratio=None,
+                    market_cap=meta.get('marketCap', current_price * 1000000000),
+                    price_change=round(price_change, 2),
+                    price_change_pct=round(price_change_pct, 2),
+                    price_history=self._create_simple_hist_data(symbol, current_price),
+                    source='backup'
+                )
                 
-                data['technical_analysis'] = self._calculate_technical_indicators(data['price_history'])
+                data.technical_analysis, data.indicator_series = self._calculate_technical_indicators(
+                    data.price_history, return_series=True
+                )
                 
                 print(f"✅ 成功从备用API获取 {symbol} 真实数据")
                 return data
@@ -305,45 +641,50 @@ class StockDataFetcher:
         # 创建模拟历史数据
         dates = pd.date_range(end=datetime.now(), periods=252, freq='D')
         
-        # 基于当前价格创建合理的历史数据
-        mock_hist = pd.DataFrame({
-            'Open': [current_price + random.uniform(-base_price * 0.02, base_price * 0.02) for _ in range(252)],
-            'High': [current_price + random.uniform(0, base_price * 0.03) for _ in range(252)],
-            'Low': [current_price + random.uniform(-base_price * 0.03, 0) for _ in range(252)],
-            'Close': [current_price + random.uniform(-base_price * 0.015, base_price * 0.015) for _ in range(252)],
-            'Volume': [random.randint(int(base_price * 10000), int(base_price * 50000)) for _ in range(252)]
-        }, index=dates)
+        # 基于当前价格创建合理的历史数据（向量化生成）；模拟数据只属于这个快照，
+        # 不写入共享历史存储，以免覆盖该股票的真实历史
+        mock_hist = history_frame(
+            dates,
+            current_price + np.random.uniform(-base_price * 0.02, base_price * 0.02, 252),
+            current_price + np.random.uniform(0, base_price * 0.03, 252),
+            current_price + np.random.uniform(-base_price * 0.03, 0, 252),
+            current_price + np.random.uniform(-base_price * 0.015, base_price * 0.015, 252),
+            np.random.randint(int(base_price * 10000), int(base_price * 50000), 252)
+        )
         
-        data = {
-            'symbol': symbol,
-            'name': self.stock_info.get(symbol, symbol),
-            'current_price': round(current_price, 2),
-            'previous_close': round(current_price - price_change, 2),
-            'high_52w': round(high_52w, 2),
-            'low_52w': round(low_52w, 2),
-            'volume': random.randint(int(base_price * 10000), int(base_price * 50000)),
-            'avg_volume': random.randint(int(base_price * 15000), int(base_price * 40000)),
-            'pe_ratio': random.randint(15, 35),
-            'market_cap': self._format_market_cap(current_price * random.randint(5000000000, 50000000000)),
-            'price_change': round(price_change, 2),
-            'price_change_pct': round(price_change_pct, 2),
-            'price_history': mock_hist
-        }
+        data = StockSnapshot(
+            symbol=symbol,
+            name=self.stock_info.get(symbol, symbol),
+            current_price=round(current_price, 2),
+            previous_close=round(current_price - price_change, 2),
+            high_52w=round(high_52w, 2),
+            low_52w=round(low_52w, 2),
+            volume=random.randint(int(base_price * 10000), int(base_price * 50000)),
+            avg_volume=random.randint(int(base_price * 15000), int(base_price * 40000)),
+            pe_ratio=random.randint(15, 35),
+            market_cap=current_price * random.randint(5000000000, 50000000000),
+            price_change=round(price_change, 2),
+            price_change_pct=round(price_change_pct, 2),
+            price_history=mock_hist,
+            source='mock'
+        )
         
-        data['technical_analysis'] = self._calculate_technical_indicators(mock_hist)
+        data.technical_analysis, data.indicator_series = self._calculate_technical_indicators(
+            mock_hist, return_series=True
+        )
         return data
     
     def _create_simple_hist_data(self, symbol, current_price):
-        """为备用API创建简单的历史数据"""
+        """为备用API创建简单的历史数据（模拟的平直走势，不写入共享历史存储）"""
         dates = pd.date_range(end=datetime.now(), periods=252, freq='D')
-        hist_data = pd.DataFrame({
-            'Open': [current_price] * 252,
-            'High': [current_price * 1.01] * 252,
-            'Low': [current_price * 0.99] * 252,
-            'Close': [current_price] * 252,
-            'Volume': [1000000] * 252
-        }, index=dates)
-        return hist_data
+        return history_frame(
+            dates,
+            np.full(252, current_price),
+            np.full(252, current_price * 1.01),
+            np.full(252, current_price * 0.99),
+            np.full(252, current_price),
+            np.full(252, 1000000)
+        )
     
     def get_multiple_stocks_data(self, symbols, max_concurrent=3):
         """获取多只股票数据，限制并发数"""
@@ -363,53 +704,37 @@ class StockDataFetcher:
         
         return results
     
-    def _format_market_cap(self, market_cap):
-        """格式化市值显示"""
-        if market_cap == 0 or market_cap == 'N/A':
-            return 'N/A'
-        
-        if market_cap >= 1e12:
-            return f"${market_cap/1e12:.2f}T"
-        elif market_cap >= 1e9:
-            return f"${market_cap/1e9:.2f}B"
-        elif market_cap >= 1e6:
-            return f"${market_cap/1e6:.2f}M"
-        else:
-            return f"${market_cap:,.0f}"
-    
-    def _calculate_technical_indicators(self, hist):
-        """计算技术指标"""
+    def _calculate_technical_indicators(self, hist, return_series=False, series=None):
+        """计算技术指标
+
+        return_series为True时返回 (指标快照, 完整指标序列DataFrame)，
+        供图表、分析和筛选器直接复用，无需重复计算滚动窗口。
+        指标定义在 indicators.py 的注册表中，新增指标无需修改此函数。
+        已有完整指标序列（如从 Arrow 文件读取）时传入 series，不再重新计算。
+        """
         indicators = {}
         
         try:
-            # 移动平均线
-            indicators['sma_20'] = round(hist['Close'].rolling(window=20).mean().iloc[-1], 2)
-            indicators['sma_50'] = round(hist['Close'].rolling(window=50).mean().iloc[-1], 2)
-            indicators['sma_200'] = round(hist['Close'].rolling(window=200).mean().iloc[-1], 2)
-            
-            # RSI
-            delta = hist['Close'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-            rs = gain / loss
-            rsi_value = 100 - (100 / (1 + rs.iloc[-1]))
-            indicators['rsi'] = round(rsi_value if not pd.isna(rsi_value) else 50, 2)
+            close = hist['Close']
             
-            # MACD
-            exp1 = hist['Close'].ewm(span=12).mean()
-            exp2 = hist['Close'].ewm(span=26).mean()
-            macd_value = exp1.iloc[-1] - exp2.iloc[-1]
+            # 按依赖图一次性计算所有可用指标，共享的中间结果（滚动均值、标准差、差分等）只算一次
+            if series is None:
+                series = compute_indicators(hist)
+            latest = series.iloc[-1]
+            for name in series.columns:
+                indicators[name] = round(latest[name], 2)
+            
+            rsi_value = latest['rsi']
+            indicators['rsi'] = round(rsi_value if not pd.isna(rsi_value) else 50, 2)
+            macd_value = latest['macd']
             indicators['macd'] = round(macd_value if not pd.isna(macd_value) else 0, 2)
             
-            # 布林带
-            sma_20 = hist['Close'].rolling(window=20).mean()
-            std_20 = hist['Close'].rolling(window=20).std()
-            indicators['bollinger_upper'] = round(sma_20.iloc[-1] + (std_20.iloc[-1] * 2), 2)
-            indicators['bollinger_lower'] = round(sma_20.iloc[-1] - (std_20.iloc[-1] * 2), 2)
+            if not return_series:
+                series = None
             
             # 技术信号
             signals = []
-            current_price = hist['Close'].iloc[-1]
+            current_price = close.iloc[-1]
             
             # Moving average signals
             if current_price > indicators['sma_20']:
@@ -449,5 +774,8 @@ class StockDataFetcher:
                 'bollinger_lower': 0,
                 'signals': ['Technical indicator calculation failed']
             }
+            series = None
         
+        if return_series:
+            return indicators, series
         return indicators
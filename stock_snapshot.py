@@ -0,0 +1,113 @@
+import math
+
+
+def format_market_cap(market_cap):
+    """Format a numeric market cap for display"""
+    if market_cap is None or market_cap == 0:
+        return 'N/A'
+
+    if market_cap >= 1e12:
+        return f"${market_cap/1e12:.2f}T"
+    elif market_cap >= 1e9:
+        return f"${market_cap/1e9:.2f}B"
+    elif market_cap >= 1e6:
+        return f"${market_cap/1e6:.2f}M"
+    else:
+        return f"${market_cap:,.0f}"
+
+
+def _to_float(value):
+    """Convert provider values ('N/A', None, numpy scalars, strings) to float or None"""
+    if value is None or value == 'N/A':
+        return None
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(value) else value
+
+
+class StockSnapshot:
+    """Compact, typed stock record.
+
+    Numeric fields stay numeric and are only formatted at display time.
+    ``price_history`` and ``indicator_series`` are references to shared
+    buffers, never per-snapshot copies. Dict-style access (``snapshot['symbol']``)
+    is kept so existing callers keep working. ``source`` names the provider
+    ('mock' for generated data) and ``stale`` marks a last-good copy served
+    while a refresh runs in the background.
+    """
+
+    __slots__ = (
+        'symbol', 'name', 'current_price', 'previous_close', 'high_52w', 'low_52w',
+        'volume', 'avg_volume', 'pe_ratio', 'market_cap', 'price_change',
+        'price_change_pct', 'price_history', 'technical_analysis', 'indicator_series',
+        'source', 'fetched_at', 'stale'
+    )
+
+    def __init__(self, symbol, name, current_price, previous_close, high_52w, low_52w,
+                 volume, avg_volume, pe_ratio, market_cap, price_change, price_change_pct,
+                 price_history, technical_analysis=None, indicator_series=None,
+                 source=None, fetched_at=None, stale=False):
+        self.symbol = symbol
+        self.name = name
+        self.current_price = float(current_price)
+        self.previous_close = float(previous_close)
+        self.high_52w = float(high_52w)
+        self.low_52w = float(low_52w)
+        self.volume = int(volume)
+        self.avg_volume = int(avg_volume)
+        self.pe_ratio = _to_float(pe_ratio)
+        self.market_cap = _to_float(market_cap)
+        self.price_change = float(price_change)
+        self.price_change_pct = float(price_change_pct)
+        self.price_history = price_history
+        self.technical_analysis = technical_analysis
+        self.indicator_series = indicator_series
+        self.source = source
+        self.fetched_at = fetched_at
+        self.stale = stale
+
+    @property
+    def market_cap_display(self):
+        """Market cap formatted as $x.xxT/B/M"""
+        return format_market_cap(self.market_cap)
+
+    @property
+    def pe_ratio_display(self):
+        """P/E ratio formatted for display"""
+        return 'N/A' if self.pe_ratio is None else f"{self.pe_ratio:.2f}"
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in self.__slots__
+
+    def get(self, key, default=None):
+        """Dict-style get"""
+        return getattr(self, key, default) if key in self.__slots__ else default
+
+    def keys(self):
+        return self.__slots__
+
+    def copy(self, **changes):
+        """Shallow copy with some fields replaced (history and series stay shared)"""
+        clone = object.__new__(StockSnapshot)
+        for key in self.__slots__:
+            setattr(clone, key, changes.get(key, getattr(self, key)))
+        return clone
+
+    def to_dict(self, include_history=False):
+        """Plain dict of the scalar fields (optionally with the history/series references)"""
+        data = {key: getattr(self, key) for key in self.__slots__}
+        if not include_history:
+            data.pop('price_history')
+            data.pop('indicator_series')
+        return data
+
+    def __repr__(self):
+        stale = ", stale" if self.stale else ""
+        return f"StockSnapshot({self.symbol}, price={self.current_price}, change={self.price_change_pct:+.2f}%{stale})"
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+
+import asyncio
+import json
+
+from aiohttp.test_utils import TestClient, TestServer
+
+import api_server
+from api_server import StockAPI
+from stock_data import StockDataFetcher
+
+UNKNOWN = 'ZZZZ'
+
+
+class StubFetcher:
+    """Deterministic snapshots: real-looking data for known symbols, generated mock data otherwise"""
+
+    def __init__(self):
+        self.fetcher = StockDataFetcher()
+        self.calls = []
+
+    def get_stock_data(self, symbol, period='1y', budget=None, max_age=None):
+        self.calls.append((symbol, period))
+        data = self.fetcher._create_improved_mock_data(symbol)
+        return data if symbol == UNKNOWN else data.copy(source='yfinance')
+
+
+class StubNews:
+    def get_stock_specific_news(self, symbol, company_name, max_results=10, days=None):
+        return [{'title': f'{symbol} beats estimates', 'source': 'Test', 'date': '2024-01-02', 'link': ''}]
+
+    def score_news(self, news):
+        return 0.5
+
+
+def call(method, path, **kwargs):
+    """(status, content type, body bytes) for one request against a fresh app"""
+    api = StockAPI(fetcher=StubFetcher(), news_collector=StubNews(), max_workers=2)
+
+    async def go():
+        async with TestClient(TestServer(api.make_app())) as client:
+            response = await client.request(method, path, **kwargs)
+            return response.status, response.content_type, await response.read()
+
+    return asyncio.run(go())
+
+
+def call_json(method, path, **kwargs):
+    status, _, body = call(method, path, **kwargs)
+    return status, json.loads(body)
+
+
+def test_quote_history_and_news():
+    status, quote = call_json('GET', '/v1/quote/aapl')
+    assert status == 200 and quote['symbol'] == 'AAPL' and quote['source'] == 'yfinance'
+
+    status, history = call_json('GET', '/v1/history/AAPL?timeframe=1w&period=6mo')
+    assert status == 200 and history['timeframe'] == '1W' and history['period'] == '6mo'
+    assert len(history['date']) == len(history['close']) > 0
+
+    status, news = call_json('GET', '/v1/news/AAPL?max=5')
+    assert status == 200 and news['sentiment'] == 0.5 and len(news['articles']) == 1 and news['mock'] is False
+
+
+def test_bad_requests_return_400():
+    assert call('GET', '/v1/quote/BAD$SYM')[0] == 400
+    assert call('GET', '/v1/history/AAPL?timeframe=5M')[0] == 400
+    assert call('GET', '/v1/history/AAPL?period=7y')[0] == 400
+    assert call('GET', '/v1/news/AAPL?max=many')[0] == 400
+    assert call('GET', '/v1/quotes?symbols=')[0] == 400
+    assert call('POST', '/v1/batch', data='not json')[0] == 400
+    status, body = call_json('POST', '/v1/batch', json={'symbols': ['AAPL'], 'fields': ['prices']})
+    assert status == 400 and 'prices' in body['error']
+
+
+def test_mock_only_symbols_return_404():
+    for path in (f'/v1/quote/{UNKNOWN}', f'/v1/history/{UNKNOWN}', f'/v1/indicators/{UNKNOWN}'):
+        status, body = call_json('GET', path)
+        assert status == 404 and UNKNOWN in body['error']
+
+    status, body = call_json('GET', f'/v1/quotes?symbols=AAPL,{UNKNOWN}')
+    assert status == 404 and body['error'] == f"No market data for {UNKNOWN}"
+
+    status, body = call_json('POST', '/v1/batch', json={'symbols': ['AAPL', UNKNOWN]})
+    assert status == 200
+    known, unknown = body['results']
+    assert known['quote']['symbol'] == 'AAPL' and 'indicators' in known
+    assert unknown == {'symbol': UNKNOWN, 'error': f"No market data for {UNKNOWN}"}
+
+
+def test_arrow_without_pyarrow_returns_406():
+    pa = api_server.pa
+    api_server.pa = None
+    try:
+        status, _, _ = call('GET', '/v1/history/AAPL?format=arrow')
+        assert status == 406
+        # Non-table endpoints ignore the format
+        assert call('GET', '/v1/quote/AAPL?format=arrow')[0] == 200
+    finally:
+        api_server.pa = pa
+
+
+def test_arrow_output():
+    if api_server.pa is None:
+        return
+    status, content_type, body = call('GET', '/v1/history/AAPL?format=arrow')
+    assert status == 200 and content_type == api_server.ARROW_STREAM_MIME
+    table = api_server.pa.ipc.open_stream(body).read_all()
+    assert table.column_names[:2] == ['date', 'open'] and table.num_rows > 0
+
+
+if __name__ == "__main__":
+    test_quote_history_and_news()
+    test_bad_requests_return_400()
+    test_mock_only_symbols_return_404()
+    test_arrow_without_pyarrow_returns_406()
+    test_arrow_output()
+    print("api_server tests passed")
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pa = pytest.importorskip('pyarrow', exc_type=ImportError)
+
+import stock_data
+from arrow_io import ArrowStore, read_frame, write_frame
+from history_store import PriceHistoryStore
+from indicators import compute as compute_indicators
+from stock_data import StockDataFetcher
+
+
+def make_history(n_bars=300, seed=5):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2023-01-02', periods=n_bars)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n_bars)))
+    return PriceHistoryStore().put(
+        'TEST', dates, close, close * 1.01, close * 0.99, close, rng.integers(1_000, 5_000, n_bars)
+    )
+
+
+def test_round_trip_is_memory_mapped(tmp_path):
+    history = make_history()
+    series = compute_indicators(history)
+    write_frame(str(tmp_path / 'history.arrow'), history)
+    write_frame(str(tmp_path / 'indicators.arrow'), series)
+
+    allocated = pa.total_allocated_bytes()
+    mapped_history = read_frame(str(tmp_path / 'history.arrow'))
+    mapped_series = read_frame(str(tmp_path / 'indicators.arrow'))
+    # Column data stays in the mapped file instead of Arrow's memory pool
+    assert pa.total_allocated_bytes() == allocated
+
+    pd.testing.assert_frame_equal(mapped_history, history, check_freq=False)
+    pd.testing.assert_frame_equal(mapped_series, series, check_freq=False)
+    assert mapped_history['Close'].dtype == history['Close'].dtype
+    assert not mapped_history['Close'].to_numpy().flags.writeable
+
+
+def test_store_reuses_mapping_until_file_changes(tmp_path):
+    store = ArrowStore(str(tmp_path))
+    history = make_history()
+    assert store.get_history('TEST') is None
+
+    store.put_history('TEST', history)
+    first = store.get_history('TEST')
+    assert store.get_history('TEST') is first
+    assert store.symbols() == ['TEST']
+
+    store.put_history('TEST', history.iloc[:-10])
+    second = store.get_history('TEST')
+    assert len(second) == len(history) - 10
+    # The replaced file stays readable through the earlier mapping
+    assert len(first) == len(history) and first['Close'].iloc[-1] == history['Close'].iloc[-1]
+    assert not [name for name in os.listdir(tmp_path / 'history') if name.endswith('.tmp')]
+
+    with pytest.raises(ValueError):
+        store.path('quotes', 'TEST')
+    with pytest.raises(ValueError):
+        store.path('history', 'TEST', '../1y')
+
+
+def test_files_are_kept_per_period(tmp_path):
+    store = ArrowStore(str(tmp_path))
+    history = make_history()
+    store.put_history('TEST', history, '1y')
+    store.put_history('TEST', history.iloc[-5:], '5d')
+    assert len(store.get_history('TEST', '1y')) == len(history)
+    assert len(store.get_history('TEST', '5d')) == 5
+    assert store.symbols(period='5d') == ['TEST']
+
+
+def test_fetcher_falls_back_to_arrow_files(tmp_path):
+    fetcher = StockDataFetcher()
+    fetcher.arrow_store = ArrowStore(str(tmp_path))
+    live = {'up': True}
+
+    def fetch(symbol, period, max_retries, deadline=None):
+        data = fetcher._create_improved_mock_data(symbol)
+        return data.copy(source='yfinance') if live['up'] else data
+
+    fetcher._fetch_from_sources = fetch
+    real = fetcher.get_stock_data('ARROWTEST', budget=None)
+    assert fetcher.arrow_store.symbols('indicators') == ['ARROWTEST']
+
+    # A fresh process: no in-memory last-good snapshot, every source down
+    stock_data._last_good.pop(('ARROWTEST', '1y'))
+    live['up'] = False
+    restored = fetcher.get_stock_data('ARROWTEST', budget=None)
+
+    assert restored.source == 'arrow' and restored.stale
+    assert restored.current_price == round(float(real.price_history['Close'].iloc[-1]), 2)
+    assert restored.technical_analysis['rsi'] == real.technical_analysis['rsi']
+    assert restored.price_history['Close'].equals(real.price_history['Close'])
+    # Served straight from the mapped file, without a copy into the shared store
+    assert restored.price_history is fetcher.arrow_store.get_history('ARROWTEST', '1y')
+    assert fetcher.history_store.get('ARROWTEST') is None
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+
+    for test in (test_round_trip_is_memory_mapped, test_store_reuses_mapping_until_file_changes,
+                 test_files_are_kept_per_period, test_fetcher_falls_back_to_arrow_files):
+        with tempfile.TemporaryDirectory() as directory:
+            test(Path(directory))
+    print("arrow_io tests passed")
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+
+import numpy as np
+import pandas as pd
+
+from backtest import rolling_mean, rolling_rsi, rolling_std, rsi_signal, run_backtest
+
+
+def make_closes(n_bars=400, n_symbols=3, seed=1):
+    rng = np.random.default_rng(seed)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, size=(n_bars, n_symbols)), axis=0))
+    closes = pd.DataFrame(prices, index=pd.bdate_range('2020-01-01', periods=n_bars))
+    closes.iloc[:50, 1] = np.nan  # listed later
+    return closes
+
+
+def test_rolling_windows_match_pandas():
+    closes = make_closes()
+    values = closes.to_numpy()
+    for column in closes:
+        close = closes[column]
+        delta = close.diff()
+        rs = delta.where(delta > 0, 0).rolling(14).mean() / (-delta.where(delta < 0, 0)).rolling(14).mean()
+
+        np.testing.assert_allclose(rolling_mean(values, 20)[:, column], close.rolling(20).mean(), atol=1e-9)
+        np.testing.assert_allclose(rolling_std(values, 20)[:, column], close.rolling(20).std(), atol=1e-6)
+        np.testing.assert_allclose(rolling_rsi(values)[:, column], 100 - 100 / (1 + rs), atol=1e-9)
+
+
+def test_rsi_positions_match_bar_by_bar_loop():
+    values = make_closes().to_numpy()
+    rsi = rolling_rsi(values)[:, 0]
+    position, expected = 0, []
+    for value in rsi:
+        if value < 30:
+            position = 1
+        elif value > 70:
+            position = 0
+        expected.append(position)
+    np.testing.assert_array_equal(rsi_signal(values)[:, 0], expected)
+
+
+def test_backtest_trades_next_bar_and_charges_costs():
+    closes = pd.DataFrame({'A': [10.0, 11.0, 12.0, 11.0, 13.0]})
+    result = run_backtest(closes, 'sma_cross', cost_bps=100, fast=1, slow=2)
+
+    # Signals at bars 1 and 3 become position changes one bar later
+    assert result.positions['A'].tolist() == [0, 0, 1, 1, 0]
+    assert result.metrics.loc['A', 'trades'] == 2
+    expected = (12 / 11 - 0.01) * (11 / 12) * (1 - 0.01) - 1
+    assert np.isclose(result.metrics.loc['A', 'total_return'], expected)
+
+
+if __name__ == "__main__":
+    test_rolling_windows_match_pandas()
+    test_rsi_positions_match_bar_by_bar_loop()
+    test_backtest_trades_next_bar_and_charges_costs()
+    print("✅ Backtest tests passed")
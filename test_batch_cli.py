@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+import io
+import json
+
+from batch_cli import BatchRunner, load_finished
+from stock_data import StockDataFetcher
+
+
+class StubFetcher:
+    def __init__(self):
+        self.fetcher = StockDataFetcher()
+        self.stock_info = self.fetcher.stock_info
+
+    def get_stock_data(self, symbol, period='1y', budget=None):
+        data = self.fetcher._create_improved_mock_data(symbol)
+        return data if symbol == 'MOCK' else data.copy(source='yfinance')
+
+
+class StubNews:
+    def __init__(self):
+        self.batches = []
+        self.single = []
+
+    def get_news_for_symbols(self, symbols, max_results=10, use_mock=False):
+        self.batches.append(sorted(symbols))
+        return {symbol: [{'title': f'{symbol} headline', 'source': 'test'}] for symbol in symbols}
+
+    def get_stock_specific_news(self, symbol, name, max_results=10, use_mock=False):
+        self.single.append(symbol)
+        return [{'title': f'{symbol} headline', 'source': 'test'}]
+
+    def score_news(self, news):
+        return 0.0
+
+
+class StubAnalyzer:
+    def analyze_stock(self, stock, news):
+        if stock['symbol'] == 'FAIL':
+            return {'default': True, 'action': 'Hold', 'raw_response': ''}
+        return {'action': 'Buy', 'target_price': '$1', 'raw_response': 'Buy'}
+
+
+def test_failed_analysis_and_mock_data_are_retried(tmp_path):
+    news = StubNews()
+    runner = BatchRunner(StubAnalyzer(), fetcher=StubFetcher(), news_collector=news)
+
+    records = []
+    path = tmp_path / 'out.jsonl'
+    with open(path, 'w') as output:
+        runner.run(['AAPL', 'FAIL', 'MOCK'], output, concurrency=2, progress=io.StringIO(), records=records,
+                   news_chunk=2)
+    # One batched news lookup per chunk, no per-symbol queries
+    assert news.batches == [['AAPL', 'FAIL'], ['MOCK']] and news.single == []
+
+    status = {record['symbol']: record['status'] for record in records}
+    assert status == {'AAPL': 'ok', 'FAIL': 'error', 'MOCK': 'error'}
+    assert len(path.read_text().splitlines()) == 3
+    assert load_finished(str(path)) == {'AAPL'}
+    failed = next(json.loads(line) for line in path.read_text().splitlines() if 'FAIL' in line)
+    assert 'analysis' not in failed
+
+
+if __name__ == "__main__":
+    import pathlib
+    import tempfile
+    with tempfile.TemporaryDirectory() as directory:
+        test_failed_analysis_and_mock_data_are_retried(pathlib.Path(directory))
+    print("batch cli tests passed")
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+import threading
+
+from config import SUMMARY_CHUNK_SIZE, SUMMARY_MERGE_FANIN
+from gemini_analyzer import NO_NEWS_SUMMARY, GeminiAnalyzer
+from stock_data import StockDataFetcher
+
+
+def make_analyzer(generate):
+    analyzer = GeminiAnalyzer(api_key='test-key')
+    analyzer._generate = generate
+    return analyzer
+
+
+def failing_generate(prompt):
+    raise RuntimeError("429 rate limited")
+
+
+def test_failed_call_returns_marked_default():
+    stock = StockDataFetcher()._create_improved_mock_data('AAPL')
+    analyzer = make_analyzer(failing_generate)
+    result = analyzer.analyze_stock(stock, [], risk=None)
+    assert result['default'] is True and result['action'] == 'Hold'
+
+
+class RecordingGenerate:
+    """Stub LLM: numbered map/merge notes, and the reduce prompt echoed back as the summary"""
+
+    def __init__(self):
+        self.prompts = []
+        self._lock = threading.Lock()
+
+    def __call__(self, prompt):
+        with self._lock:
+            self.prompts.append(prompt)
+            if 'New notes:' in prompt:
+                return f"SUMMARY[{prompt}]"
+            return f"NOTE{len(self.prompts)}"
+
+    def kinds(self):
+        kinds = []
+        for prompt in self.prompts:
+            if 'New notes:' in prompt:
+                kinds.append('reduce')
+            elif 'market sentiment notes' in prompt:
+                kinds.append('merge')
+            else:
+                kinds.append('map')
+        return kinds
+
+
+def headlines(start, count):
+    return [{'title': f'Headline number {i}', 'source': 'Test'} for i in range(start, start + count)]
+
+
+def test_market_summary_map_merge_reduce_fold():
+    generate = RecordingGenerate()
+    analyzer = make_analyzer(generate)
+    chunks = SUMMARY_MERGE_FANIN + 2
+    news = headlines(0, SUMMARY_CHUNK_SIZE * chunks)
+
+    summary = analyzer.get_market_sentiment(news, scope='test_fold')
+    kinds = generate.kinds()
+    # One map per chunk, one merge round (fan-in groups), then a single reduce
+    assert kinds.count('map') == chunks and kinds.count('merge') == 2 and kinds[-1] == 'reduce'
+    assert f"cover {len(news)} news articles" in summary and "no running summary yet" in summary
+
+    # Seen articles are not sent again; only the new ones are folded into the running summary
+    generate.prompts.clear()
+    updated = analyzer.get_market_sentiment(news + headlines(len(news), 3), scope='test_fold')
+    assert generate.kinds() == ['map', 'reduce']
+    assert f"cover {len(news) + 3} news articles" in updated and summary in updated
+
+    generate.prompts.clear()
+    assert analyzer.get_market_sentiment(news, scope='test_fold') == updated
+    assert generate.prompts == []
+
+
+def test_no_news_summary_skips_llm():
+    generate = RecordingGenerate()
+    analyzer = make_analyzer(generate)
+    assert analyzer.get_market_sentiment([], scope='test_empty') == NO_NEWS_SUMMARY
+    assert generate.prompts == []
+
+
+if __name__ == "__main__":
+    test_failed_call_returns_marked_default()
+    test_market_summary_map_merge_reduce_fold()
+    test_no_news_summary_skips_llm()
+    print("gemini analyzer tests passed")
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import indicators
+
+
+def make_history(n_bars=300, seed=11):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2023-01-02', periods=n_bars)
+    close = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.02, n_bars))), index=dates)
+    return pd.DataFrame({
+        'Open': close.shift(1).fillna(100),
+        'High': close * (1 + rng.uniform(0, 0.02, n_bars)),
+        'Low': close * (1 - rng.uniform(0, 0.02, n_bars)),
+        'Close': close,
+        'Volume': rng.integers(1_000_000, 5_000_000, n_bars)
+    })
+
+
+def test_registry_matches_direct_formulas():
+    hist = make_history()
+    close, high, low = hist['Close'], hist['High'], hist['Low']
+    series = indicators.compute(hist)
+
+    pd.testing.assert_series_equal(series['bollinger_upper'], close.rolling(20).mean() + close.rolling(20).std() * 2,
+                                   check_names=False)
+    pd.testing.assert_series_equal(series['macd'], close.ewm(span=12).mean() - close.ewm(span=26).mean(),
+                                   check_names=False)
+
+    # ATR with Wilder smoothing written as a loop
+    true_range = np.fmax(high - low, np.fmax((high - close.shift()).abs(), (low - close.shift()).abs()))
+    atr = [true_range.iloc[0]]
+    for value in true_range.iloc[1:]:
+        atr.append(atr[-1] + (value - atr[-1]) / 14)
+    np.testing.assert_allclose(series['atr_14'], atr)
+    assert series['stoch_k'].dropna().between(0, 100).all()
+    assert series['adx_14'].dropna().between(0, 100).all()
+
+    # Close-only histories get only the indicators they can support
+    assert 'atr_14' not in indicators.compute(hist[['Close']]).columns
+
+
+def test_plugins_share_intermediates():
+    hist = make_history()
+    calls = []
+    original = indicators.REGISTRY['sma_20']
+    indicators.register('sma_20', lambda close: calls.append(1) or close.rolling(20).mean(), deps=('close',))
+    indicators.register('sma_20_gap', lambda close, sma: close / sma - 1, deps=('close', 'sma_20'))
+    try:
+        series = indicators.compute(hist, ['sma_20', 'bollinger_lower', 'sma_20_gap'])
+        assert len(calls) == 1
+        assert series['sma_20_gap'].iloc[-1] == pytest.approx(hist['Close'].iloc[-1] / series['sma_20'].iloc[-1] - 1)
+
+        indicators.register('loop_a', lambda x: x, deps=('loop_b',))
+        indicators.register('loop_b', lambda x: x, deps=('loop_a',))
+        with pytest.raises(ValueError, match="cycle"):
+            indicators.plan(['loop_a'])
+    finally:
+        indicators.REGISTRY['sma_20'] = original
+        for name in ('sma_20_gap', 'loop_a', 'loop_b'):
+            indicators.REGISTRY.pop(name, None)
+
+
+if __name__ == "__main__":
+    test_registry_matches_direct_formulas()
+    test_plugins_share_intermediates()
+    print("✅ Indicator tests passed")
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import kernels
+
+BACKENDS = [name for name in kernels.BACKENDS if kernels._IMPLEMENTATIONS[name] is not None]
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request):
+    previous = kernels.get_backend()
+    yield kernels.set_backend(request.param)
+    kernels.set_backend(previous)
+
+
+def test_kernels_match_pandas(backend):
+    rng = np.random.default_rng(2)
+    values = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, size=(600, 3)), axis=0))
+    values[:30, 1] = np.nan   # listed later
+    frame = pd.DataFrame(values)
+
+    np.testing.assert_allclose(kernels.rolling_mean(values, 20), frame.rolling(20).mean(), rtol=1e-10)
+    np.testing.assert_allclose(kernels.rolling_std(values, 20), frame.rolling(20).std(), rtol=1e-8)
+    np.testing.assert_allclose(kernels.rolling_max(values, 14), frame.rolling(14).max())
+    np.testing.assert_allclose(kernels.ema(values, span=26), frame.ewm(span=26).mean(), rtol=1e-12)
+    np.testing.assert_allclose(kernels.ema(values, alpha=1 / 14, adjust=False),
+                               frame.ewm(alpha=1 / 14, adjust=False).mean(), rtol=1e-12)
+    assert kernels.rolling_mean(values[:, 0], 5).shape == (600,)
+
+    # A gap after the first value is delegated to pandas' NaN weighting
+    values[300, 2] = np.nan
+    np.testing.assert_allclose(kernels.ema(values[:, 2], span=12), frame[2].mask(frame.index == 300).ewm(span=12).mean())
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        kernels.resolve_backend('fortran')
+
+
+if __name__ == "__main__":
+    for name in BACKENDS:
+        kernels.set_backend(name)
+        test_kernels_match_pandas(name)
+    test_unknown_backend_is_rejected()
+    print("✅ Kernel tests passed")
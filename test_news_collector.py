@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+
+from datetime import datetime, timedelta, timezone
+
+from news_collector import NewsCollector
+from news_store import NewsStore
+
+
+def test_sentiment_reads_store_and_flags_mock_fallback(tmp_path):
+    store = NewsStore(str(tmp_path / 'news.db'))
+    store.add_articles([{
+        'title': 'Apple shares surge to record high on strong iPhone demand',
+        'link': 'https://example.com/apple-record', 'source': 'Example',
+        'summary': 'Analysts upgrade the stock after a strong quarter.',
+        'date': datetime.now(timezone.utc)
+    }], symbols=['AAPL'])
+    collector = NewsCollector(store=store)
+
+    sentiment = collector.get_sentiment_by_symbol({'AAPL': 'Apple Inc.', 'MSFT': 'Microsoft Corporation'})
+    score, articles, is_mock = sentiment['AAPL']
+    assert articles == 1 and not is_mock and score > 0
+    assert sentiment['MSFT'][2] is True
+
+    assert all(value[2] for value in collector.get_sentiment_by_symbol({'AAPL': 'Apple Inc.'}, use_mock=True).values())
+
+
+def test_symbol_news_uses_store_tags_per_store(tmp_path):
+    store = NewsStore(str(tmp_path / 'news.db'))
+    store.add_articles([{
+        'title': 'Database giant raises cloud guidance', 'link': 'https://example.com/orcl',
+        'source': 'Example', 'summary': '', 'date': datetime.now(timezone.utc)
+    }], symbols=['ORCL'])
+    collector = NewsCollector(store=store)
+    collector._fetch_newsapi = lambda query, max_results, since=None: []
+
+    news = collector.get_stock_specific_news('ORCL', 'Oracle Corporation')
+    assert [article['title'] for article in news] == ['Database giant raises cloud guidance']
+    assert not news[0].get('mock')
+
+    batched = collector.get_news_for_symbols({'ORCL': 'Oracle Corporation', 'SNOW': 'Snowflake Inc.'})
+    assert batched['ORCL'] == news
+    assert all(article['mock'] for article in batched['SNOW'])
+
+    # Another store gets its own index
+    other = NewsCollector(store=NewsStore(str(tmp_path / 'other.db')))
+    other._fetch_newsapi = collector._fetch_newsapi
+    assert other.index is not collector.index
+    assert all(article['mock'] for article in other.get_stock_specific_news('ORCL', 'Oracle Corporation'))
+
+
+def test_todays_news_reads_the_store(tmp_path):
+    store = NewsStore(str(tmp_path / 'news.db'))
+    now = datetime.now(timezone.utc)
+    store.add_articles([
+        {'title': f'Market story {i}', 'link': f'https://example.com/{i}', 'source': 'Example',
+         'summary': '', 'date': now} for i in range(120)
+    ] + [{'title': 'Old story', 'link': 'https://example.com/old', 'source': 'Example',
+          'summary': '', 'date': now - timedelta(days=2)}])
+    collector = NewsCollector(store=store)
+    queries = []
+    collector._fetch_newsapi = lambda query, max_results, since=None: queries.append(query) or []
+
+    news = collector.get_todays_news()
+    assert queries == ['tech market stocks']
+    assert len(news) == 120 and 'Old story' not in {article['title'] for article in news}
+    empty = NewsCollector(store=NewsStore(str(tmp_path / 'empty.db')))
+    empty._fetch_newsapi = collector._fetch_newsapi
+    assert empty.get_todays_news() == []
+
+
+if __name__ == "__main__":
+    import pathlib
+    import tempfile
+    with tempfile.TemporaryDirectory() as directory:
+        test_sentiment_reads_store_and_flags_mock_fallback(pathlib.Path(directory))
+    with tempfile.TemporaryDirectory() as directory:
+        test_symbol_news_uses_store_tags_per_store(pathlib.Path(directory))
+    with tempfile.TemporaryDirectory() as directory:
+        test_todays_news_reads_the_store(pathlib.Path(directory))
+    print("news collector tests passed")
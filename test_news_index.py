@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+import time
+
+from news_index import NewsIndex
+
+DAY = 86400
+STOCKS = {'AAPL': 'Apple Inc.', 'MSFT': 'Microsoft Corporation', 'NVDA': 'NVIDIA Corporation'}
+
+
+def build_index(now):
+    index = NewsIndex(stock_info=STOCKS, half_life_days=3)
+    index.add_many([
+        {'title': 'Apple unveils new iPhone', 'summary': 'The phone ships next month.', 'date': now - 9 * DAY},
+        {'title': 'Apple unveils new iPhone camera', 'summary': 'Pre-orders open today.', 'date': now - 60},
+        {'title': 'Chip stocks rally as NVIDIA beats', 'summary': 'Microsoft also gains.', 'date': now - 2 * DAY},
+        {'title': 'Microsoft expands cloud deal', 'summary': 'Azure revenue climbs.', 'date': now - DAY},
+        {'title': 'Apple unveils new iPhone - Reuters', 'summary': 'Duplicate copy.', 'date': now}
+    ])
+    return index
+
+
+def test_bm25_times_recency_ranking():
+    now = time.time()
+    index = build_index(now)
+    assert len(index) == 4  # the syndicated copy is a duplicate
+
+    titles = [article['title'] for article in index.search('iphone', top_k=5)]
+    # Same terms, the fresh article outranks the nine-day-old one
+    assert titles == ['Apple unveils new iPhone camera', 'Apple unveils new iPhone']
+
+    # More matched terms outweigh a few days of recency
+    assert index.search('chip rally cloud')[0]['title'] == 'Chip stocks rally as NVIDIA beats'
+    assert index.search('iphone', start=now - 3 * DAY)[0]['title'] == 'Apple unveils new iPhone camera'
+    assert len(index.search('iphone', start=now - 3 * DAY)) == 1
+
+
+def test_entity_queries_and_symbol_filter():
+    now = time.time()
+    index = build_index(now)
+
+    # Ticker, company name and alias all map to the $msft entity token
+    by_ticker = {article['title'] for article in index.search('MSFT')}
+    assert by_ticker == {'Chip stocks rally as NVIDIA beats', 'Microsoft expands cloud deal'}
+    assert {article['title'] for article in index.search('Microsoft Corporation')} == by_ticker
+
+    # The symbol filter keeps only articles mentioning it, also for an empty query (newest first)
+    assert [article['title'] for article in index.search('', symbol='MSFT')] == \
+        ['Microsoft expands cloud deal', 'Chip stocks rally as NVIDIA beats']
+    assert index.search('iphone', symbol='MSFT') == []
+    assert [article['title'] for article in index.search('beats', symbol='NVDA')] == ['Chip stocks rally as NVIDIA beats']
+
+
+def test_ingest_tags_and_watched_symbols():
+    now = time.time()
+    index = build_index(now)
+    # Tagged at ingest although the text never names the company
+    index.add({'title': 'Database giant raises guidance', 'summary': '', 'date': now - 60}, ['ORCL'])
+    assert [article['title'] for article in index.search('', symbol='ORCL')] == ['Database giant raises guidance']
+    # A duplicate copy only adds its tags
+    index.add({'title': 'Database giant raises guidance - CNBC', 'summary': '', 'date': now}, ['SAP'])
+    assert len(index) == 5 and index.search('guidance', symbol='SAP')
+
+    # Tickers outside the configured ones are matched once watched, also in indexed articles
+    index.add({'title': 'Snowflake shares jump on outlook', 'summary': '', 'date': now - 30})
+    assert index.search('', symbol='SNOW') == []
+    index.watch({'SNOW': 'Snowflake Inc.'})
+    assert [article['title'] for article in index.search('Snowflake Inc.', symbol='SNOW')] == \
+        ['Snowflake shares jump on outlook']
+
+
+if __name__ == "__main__":
+    test_bm25_times_recency_ranking()
+    test_entity_queries_and_symbol_filter()
+    test_ingest_tags_and_watched_symbols()
+    print("news index tests passed")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+import time
+from datetime import datetime, timedelta, timezone
+
+from news_collector import NewsCollector
+from news_store import NewsStore, title_hash
+
+
+def article(title, link=None, hours_ago=1):
+    return {'title': title, 'link': link, 'source': 'Test', 'summary': '',
+            'date': datetime.now(timezone.utc) - timedelta(hours=hours_ago)}
+
+
+def test_duplicates_by_title_and_url(tmp_path):
+    store = NewsStore(str(tmp_path / 'news.db'))
+    assert title_hash('Apple beats estimates - Reuters') == title_hash('Apple Beats Estimates!  | CNBC')
+
+    assert store.add_articles([
+        article('Apple beats estimates - Reuters', 'https://a.com/1'),
+        article('Apple Beats Estimates | CNBC', 'https://b.com/2'),   # same story, syndicated
+        article('A different headline', 'https://a.com/1'),            # same URL
+        article('No link one'),
+        article('No link two')                                         # NULL URLs never collide
+    ], symbols=['AAPL']) == 3
+    assert store.count() == 3
+
+    # Re-adding a duplicate inserts nothing but still tags the stored article
+    assert store.add_articles([article('Apple beats estimates', 'https://c.com/3')], symbols=['MSFT']) == 0
+    assert [a['title'] for a in store.get_symbol_news('MSFT')] == ['Apple beats estimates - Reuters']
+
+
+def test_watermark_and_ingest_interval(tmp_path):
+    store = NewsStore(str(tmp_path / 'news.db'))
+    collector = NewsCollector(store=store)
+    calls = []
+    batches = [
+        [article('First story', 'https://a.com/1', hours_ago=3), article('Second story', 'https://a.com/2', hours_ago=2)],
+        None,                                           # provider failure
+        [article('Third story', 'https://a.com/3', hours_ago=1)]
+    ]
+
+    def fetch(query, max_results, since=None):
+        calls.append(since)
+        return batches[len(calls) - 1]
+
+    collector._fetch_newsapi = fetch
+    assert collector.ingest('apple', ['AAPL']) == 2
+    newest = store.get_ingest_state('apple')[0]
+
+    # Throttled by NEWS_INGEST_INTERVAL: no request at all
+    assert collector.ingest('apple', ['AAPL']) == 0
+    assert len(calls) == 1
+
+    # A failed request keeps the watermark, so the next one asks for the same range
+    assert collector.ingest('apple', ['AAPL'], force=True) == 0
+    assert store.get_ingest_state('apple')[0] == newest
+    assert collector.ingest('apple', ['AAPL'], force=True) == 1
+    assert calls[0] is None
+    assert calls[1] == calls[2] == datetime.fromtimestamp(newest + 1, tz=timezone.utc)
+    assert store.get_ingest_state('apple')[0] > newest
+
+
+def test_prune_by_age_and_count(tmp_path):
+    store = NewsStore(str(tmp_path / 'news.db'))
+    store.add_articles([article(f'Story {i}', f'https://a.com/{i}', hours_ago=i * 24) for i in range(10)],
+                       symbols=['AAPL'])
+    store.prune(retention_days=5.5, max_articles=100)
+    assert store.count() == 6
+
+    store.prune(retention_days=30, max_articles=2)
+    assert [a['title'] for a in store.get_recent_news()] == ['Story 0', 'Story 1']
+    # Symbol tags of pruned articles go with them
+    assert len(store.get_symbol_news('AAPL', max_results=100)) == 2
+    assert store.get_recent_news(since=time.time() + 60) == []
+
+
+if __name__ == "__main__":
+    import pathlib
+    import tempfile
+    for test in (test_duplicates_by_title_and_url, test_watermark_and_ingest_interval, test_prune_by_age_and_count):
+        with tempfile.TemporaryDirectory() as directory:
+            test(pathlib.Path(directory))
+    print("news store tests passed")
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+
+import numpy as np
+import pandas as pd
+
+from portfolio import CorrelationEngine, log_returns, rolling_correlation
+
+
+def make_closes(n_bars=400, seed=3):
+    rng = np.random.default_rng(seed)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, size=(n_bars, 5)), axis=0))
+    closes = pd.DataFrame(prices, index=pd.bdate_range('2022-01-03', periods=n_bars), columns=list('ABCDE'))
+    closes.iloc[:80, 2] = np.nan   # listed later
+    closes.iloc[200, 4] = np.nan   # missing bar
+    return closes
+
+
+def test_incremental_updates_match_full_rebuild():
+    closes = make_closes()
+    returns = log_returns(closes)
+
+    engine = CorrelationEngine(closes.columns).fit(closes.iloc[:150])
+    engine.sync(closes)
+    np.testing.assert_allclose(engine.correlation(), returns.corr(), atol=1e-12)
+    np.testing.assert_allclose(engine.covariance(annualize=False), returns.cov(), atol=1e-12)
+
+
+def test_rolling_window_drops_old_bars():
+    closes = make_closes()
+    returns = log_returns(closes)
+
+    engine = CorrelationEngine(closes.columns, window=60).fit(closes.iloc[:100])
+    engine.sync(closes)
+    assert len(engine) == 60
+    np.testing.assert_allclose(engine.correlation(), returns.iloc[-60:].corr(), atol=1e-12)
+
+    complete = returns.iloc[100:].drop(columns=['E']).to_numpy()
+    rolling = rolling_correlation(complete, 30)
+    np.testing.assert_allclose(rolling[-1], np.corrcoef(complete[-30:].T), atol=1e-12)
+
+
+def test_sync_refits_when_last_close_is_revised():
+    closes = make_closes()
+    engine = CorrelationEngine(closes.columns).fit(closes.iloc[:150])
+
+    # The last seen bar settles at a different close before the next bars arrive
+    revised = closes.copy()
+    revised.iloc[149, 0] *= 1.05
+    engine.sync(revised)
+    np.testing.assert_allclose(engine.correlation(), log_returns(revised).corr(), atol=1e-12)
+    assert engine.last_date == revised.index[-1]
+
+
+if __name__ == "__main__":
+    test_incremental_updates_match_full_rebuild()
+    test_rolling_window_drops_old_bars()
+    test_sync_refits_when_last_close_is_revised()
+    print("✅ Portfolio tests passed")
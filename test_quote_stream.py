@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+
+import time
+
+from quote_stream import QuoteStream
+
+
+class RecordingTable:
+    def __init__(self):
+        self.bars = []
+
+    def update_bar(self, symbol, price, volume, new_bar=False):
+        self.bars.append((symbol, price))
+
+    def upsert(self, symbol, values):
+        pass
+
+
+def seed(price):
+    return {'current_price': price, 'price_change_pct': 0.0, 'volume': 1000, 'previous_close': price}
+
+
+def test_only_live_quotes_reach_the_shared_table():
+    table = RecordingTable()
+    stream = QuoteStream(lambda symbols: {'AAPL': {'price': 101.0, 'previous_close': 100.0}},
+                         table=table, fallback_to_mock=True)
+    stream.watch({'AAPL': seed(100.0), 'MSFT': seed(300.0)})
+    assert stream.snapshot()['MSFT']['source'] == 'seed'
+
+    changes = stream.poll()
+    quotes = stream.snapshot()
+    assert set(changes) == {'AAPL', 'MSFT'}
+    assert quotes['AAPL']['source'] == 'live' and quotes['MSFT']['source'] == 'mock'
+    assert table.bars == [('AAPL', 101.0)]
+
+
+def test_mock_ticks_are_off_by_default():
+    table = RecordingTable()
+    stream = QuoteStream(lambda symbols: {}, table=table)
+    stream.watch({'MSFT': seed(300.0)})
+    assert stream.poll() == {}
+    assert stream.snapshot()['MSFT']['source'] == 'seed'
+    assert table.bars == []
+
+
+def test_sessions_expire_and_the_thread_stops():
+    polled = []
+
+    def fetch(symbols):
+        polled.append(sorted(symbols))
+        return {}
+
+    stream = QuoteStream(fetch, interval=0.01, table=RecordingTable(), session_ttl=0.2)
+    stream.watch({'AAPL': seed(100.0), 'MSFT': seed(300.0)}, session='a')
+    stream.watch({'MSFT': seed(300.0)}, session='b')
+    stream.release('a')
+    assert set(stream.snapshot()) == {'MSFT'}
+
+    stream.start()
+    waited = 0
+    while stream.running and waited < 200:
+        time.sleep(0.01)
+        waited += 1
+    # Session 'b' stopped reading: its symbols expired and the thread exited
+    assert not stream.running and stream.snapshot() == {}
+    assert polled and polled[0] == ['MSFT']
+
+    # A new session starts it again
+    stream.watch({'NVDA': seed(400.0)}, session='c')
+    stream.start()
+    assert stream.running
+    stream.release('c')
+
+
+if __name__ == "__main__":
+    test_only_live_quotes_reach_the_shared_table()
+    test_mock_ticks_are_off_by_default()
+    test_sessions_expire_and_the_thread_stops()
+    print("quote stream tests passed")
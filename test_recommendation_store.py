@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+
+from datetime import datetime, timedelta
+
+from recommendation_store import RecommendationStore, parse_price
+
+
+def analysis(action, target):
+    return {'action': action, 'target_price': target, 'risk_level': 'Medium',
+            'reasoning': 'r', 'risks': 'k', 'raw_response': f'{action} {target}'}
+
+
+def test_latest_and_time_range_queries(tmp_path):
+    store = RecommendationStore(str(tmp_path / 'recommendations.db'))
+    start = datetime(2024, 1, 1)
+    for day, (action, target) in enumerate([('Buy', '$190.50'), ('Hold', '$1,185'), ('Sell', 'N/A')]):
+        store.save('AAPL', analysis(action, target), price=180 + day, inputs=f'h{day}',
+                   model='demo', created_at=start + timedelta(days=day))
+    store.save('MSFT', analysis('Buy', '$420'), inputs='m', created_at=start)
+
+    latest = store.latest('AAPL')
+    assert latest['action'] == 'Sell' and latest['target_price'] == 'N/A' and latest['raw_response'] == 'Sell N/A'
+    assert {symbol: record['action'] for symbol, record in store.latest_by_symbol(['AAPL', 'MSFT', 'NVDA']).items()} \
+        == {'AAPL': 'Sell', 'MSFT': 'Buy'}
+    assert store.find('h1')['target_value'] == 1185.0
+    # Demo results are never reused for a real model's request
+    assert store.find('h1', model='demo') is not None
+    assert store.find('h1', model='gemini-1.5-flash') is None
+
+    history = store.history('AAPL', since=start + timedelta(hours=12), until=start + timedelta(days=2))
+    assert list(history['action']) == ['Hold']
+    assert list(store.history('AAPL')['target_price'].isna()) == [False, False, True]
+
+
+def test_parse_price():
+    assert parse_price('$1,234.50') == 1234.5
+    assert parse_price('185 - 190') == 185.0
+    assert parse_price(None) is None
+
+
+if __name__ == "__main__":
+    import pathlib
+    import tempfile
+    with tempfile.TemporaryDirectory() as directory:
+        test_latest_and_time_range_queries(pathlib.Path(directory))
+    test_parse_price()
+    print("✅ Recommendation store tests passed")
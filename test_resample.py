@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import resample
+from history_store import PriceHistoryStore
+from resample import ResampleCache, resample_ohlcv
+
+
+def make_daily(n_bars=300, seed=4):
+    rng = np.random.default_rng(seed)
+    # Stamped at the close like live sources, with a holiday gap
+    dates = pd.bdate_range('2023-01-02', periods=n_bars) + pd.Timedelta(hours=16)
+    dates = dates.delete(np.s_[40:45])
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(dates))))
+    return pd.DataFrame({
+        'Open': close * (1 + rng.normal(0, 0.005, len(dates))),
+        'High': close * 1.01, 'Low': close * 0.99, 'Close': close,
+        'Volume': rng.integers(1_000, 5_000, len(dates)).astype(float)
+    }, index=dates)
+
+
+def test_weekly_bars_aggregate_ohlcv():
+    daily = make_daily()
+    weekly = resample_ohlcv(daily, '1W')
+    assert (weekly.index.dayofweek == 4).all()
+
+    for label, bar in weekly.iloc[[0, 7, -1]].iterrows():
+        days = daily[(daily.index.normalize() > label - pd.Timedelta(days=7)) & (daily.index.normalize() <= label)]
+        assert bar['Open'] == days['Open'].iloc[0] and bar['Close'] == days['Close'].iloc[-1]
+        assert bar['High'] == days['High'].max() and bar['Low'] == days['Low'].min()
+        assert bar['Volume'] == days['Volume'].sum()
+    assert weekly['Volume'].sum() == daily['Volume'].sum()
+
+    with pytest.raises(ValueError):
+        resample_ohlcv(daily, '5m')
+
+
+def test_cache_updates_incrementally():
+    daily = make_daily()
+    store = PriceHistoryStore(use_float32=False)
+    cache = ResampleCache(store)
+
+    store.put_frame('AAPL', daily.iloc[:200])
+    first = cache.get('AAPL', '1M')
+    assert cache.get('AAPL', '1M') is first
+
+    # New bars extend the open month and add new ones
+    store.put_frame('AAPL', daily)
+    for timeframe in ('1W', '1M'):
+        pd.testing.assert_frame_equal(cache.get('AAPL', timeframe), resample_ohlcv(store.get('AAPL'), timeframe))
+
+    # A revised last close updates the open period
+    revised = daily.copy()
+    revised.iloc[-1, revised.columns.get_loc('Close')] *= 1.1
+    store.put_frame('AAPL', revised)
+    assert cache.get('AAPL', '1W')['Close'].iloc[-1] == pytest.approx(revised['Close'].iloc[-1])
+    assert cache.get('MSFT', '1W') is None
+
+
+def test_cache_rebuilds_rewritten_history():
+    daily = make_daily()
+    store = PriceHistoryStore(use_float32=False)
+    cache = ResampleCache(store)
+
+    store.put_frame('AAPL', daily.iloc[:200])
+    cache.get('AAPL', '1W')
+
+    # Split-adjusted and extended in one refresh: closed weeks change too
+    adjusted = daily.copy()
+    adjusted[['Open', 'High', 'Low', 'Close']] *= 0.5
+    store.put_frame('AAPL', adjusted)
+    pd.testing.assert_frame_equal(cache.get('AAPL', '1W'), resample_ohlcv(store.get('AAPL'), '1W'))
+
+
+def test_rolling_window_updates_incrementally():
+    daily = make_daily()
+    store = PriceHistoryStore(use_float32=False)
+    cache = ResampleCache(store)
+    aggregated = []
+
+    def recording(frame, timeframe):
+        aggregated.append(len(frame))
+        return resample_ohlcv(frame, timeframe)
+
+    resample.resample_ohlcv = recording
+    try:
+        store.put_frame('AAPL', daily.iloc[:200])
+        cache.get('AAPL', '1W')
+        cache.get('AAPL', '1M')
+        # A rolling window: one new bar in, the oldest bars out (first date moves forward)
+        for start in (1, 2, 8, 30):
+            store.put_frame('AAPL', daily.iloc[start:200 + start])
+            for timeframe in ('1W', '1M'):
+                pd.testing.assert_frame_equal(cache.get('AAPL', timeframe), resample_ohlcv(store.get('AAPL'), timeframe))
+    finally:
+        resample.resample_ohlcv = resample_ohlcv
+    # Only the first and the open periods were re-aggregated, never the whole window
+    assert aggregated[:2] == [200, 200] and max(aggregated[2:]) <= 46
+
+
+if __name__ == "__main__":
+    test_weekly_bars_aggregate_ohlcv()
+    test_cache_updates_incrementally()
+    test_cache_rebuilds_rewritten_history()
+    test_rolling_window_updates_incrementally()
+    print("✅ Resample tests passed")
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+
+import numpy as np
+import pandas as pd
+
+from history_store import PriceHistoryStore
+import risk
+from risk import compute_risk_metrics, get_risk_metrics
+
+
+def make_closes(n_bars=300, seed=5):
+    rng = np.random.default_rng(seed)
+    market = rng.normal(0.0005, 0.01, n_bars)
+    returns = market[:, None] * np.array([0.8, 1.5, 1.0]) + rng.normal(0, 0.01, size=(n_bars, 3))
+    dates = pd.bdate_range('2023-01-02', periods=n_bars)
+    closes = pd.DataFrame(100 * np.cumprod(1 + returns, axis=0), index=dates, columns=['A', 'B', 'C'])
+    closes.iloc[:40, 2] = np.nan  # listed later
+    index = pd.DataFrame({'^GSPC': 100 * np.cumprod(1 + market)}, index=dates)
+    return closes, index
+
+
+def test_metrics_match_pandas():
+    closes, index = make_closes()
+    metrics = compute_risk_metrics(closes, index, confidence=0.95, vol_window=20)
+    returns = closes.pct_change(fill_method=None)
+    market = index['^GSPC'].pct_change()
+
+    for symbol in closes:
+        r = returns[symbol].dropna()
+        beta = r.cov(market[r.index]) / market[r.index].var()
+        quantile = r.quantile(0.05)
+        assert np.isclose(metrics.loc[symbol, 'beta_^GSPC'], beta)
+        assert np.isclose(metrics.loc[symbol, 'volatility'], returns[symbol].tail(20).std() * np.sqrt(252))
+        assert np.isclose(metrics.loc[symbol, 'var_hist'], -quantile)
+        assert np.isclose(metrics.loc[symbol, 'cvar_hist'], -r[r <= quantile].mean())
+        close = closes[symbol].dropna()
+        assert np.isclose(metrics.loc[symbol, 'max_drawdown'], (close / close.cummax() - 1).min())
+
+    assert metrics.loc['B', 'beta_^GSPC'] > metrics.loc['A', 'beta_^GSPC']
+    assert (metrics['cvar_param'] > metrics['var_param']).all()
+
+
+def test_cached_until_a_new_bar_arrives():
+    closes, index = make_closes()
+    store = PriceHistoryStore()
+    for symbol, series in list(closes.items()) + list(index.items()):
+        series = series.dropna()
+        store.put(symbol, series.index, series, series, series, series, np.zeros(len(series)))
+
+    first = get_risk_metrics(['A', 'B', 'X'], store, benchmarks=['^GSPC'])
+    assert get_risk_metrics(['A', 'B', 'X'], store, benchmarks=['^GSPC']) is first
+    assert first.loc['X'].isna().all()
+
+    # Nothing stored for any symbol: still one NaN row per symbol with every column
+    missing = get_risk_metrics(['X', 'Y'], store, benchmarks=['^GSPC'])
+    assert list(missing.index) == ['X', 'Y'] and list(missing.columns) == list(first.columns)
+    assert missing.isna().all().all()
+
+    series = closes['A']
+    dates = series.index.append(pd.DatetimeIndex([series.index[-1] + pd.offsets.BDay()]))
+    extended = np.append(series.to_numpy(), series.iloc[-1] * 0.9)
+    store.put('A', dates, extended, extended, extended, extended, np.zeros(len(extended)))
+    second = get_risk_metrics(['A', 'B', 'X'], store, benchmarks=['^GSPC'])
+    assert second is not first
+
+    # Same last date, revised last close (the settled close replacing an intraday bar)
+    extended[-1] = series.iloc[-1] * 1.1
+    store.put('A', dates, extended, extended, extended, extended, np.zeros(len(extended)))
+    third = get_risk_metrics(['A', 'B', 'X'], store, benchmarks=['^GSPC'])
+    assert third is not second
+    assert third.loc['A', 'volatility'] != second.loc['A', 'volatility']
+
+
+def test_cache_is_bounded_lru():
+    closes, index = make_closes()
+    store = PriceHistoryStore()
+    for symbol, series in list(closes.items()) + list(index.items()):
+        series = series.dropna()
+        store.put(symbol, series.index, series, series, series, series, np.zeros(len(series)))
+
+    risk._cache.clear()
+    first = get_risk_metrics(['A'], store, benchmarks=['^GSPC'])
+    for window in range(2, risk.RISK_CACHE_SIZE + 1):
+        get_risk_metrics(['B'], store, benchmarks=['^GSPC'], vol_window=window)
+        # Using ['A'] keeps it the most recently used entry
+        assert get_risk_metrics(['A'], store, benchmarks=['^GSPC']) is first
+    get_risk_metrics(['C'], store, benchmarks=['^GSPC'])
+    assert len(risk._cache) == risk.RISK_CACHE_SIZE
+    assert get_risk_metrics(['A'], store, benchmarks=['^GSPC']) is first
+    assert (('B',), ('^GSPC',), risk.RISK_CONFIDENCE, 2) not in risk._cache
+
+
+if __name__ == "__main__":
+    test_metrics_match_pandas()
+    test_cached_until_a_new_bar_arrives()
+    test_cache_is_bounded_lru()
+    print("✅ Risk tests passed")
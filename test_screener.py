@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from incremental_indicators import IncrementalIndicators
+from screener import IndicatorTable, compile_expression
+from stock_data import StockDataFetcher
+
+
+def build_table():
+    table = IndicatorTable(capacity=2)
+    table.upsert('AAPL', {'close': 175.0, 'rsi': 25.0, 'sma_200': 160.0, 'market_cap': 2.7e12})
+    table.upsert('MSFT', {'close': 330.0, 'rsi': 55.0, 'sma_200': 340.0, 'market_cap': 2.5e12})
+    table.upsert('INTC', {'close': 34.0, 'rsi': 28.0, 'sma_200': 40.0, 'market_cap': 1.4e11})
+    return table
+
+
+def test_screen_filters_sorts_and_limits():
+    table = build_table()
+
+    oversold = table.screen("rsi < 30 and close > sma_200")
+    assert list(oversold.index) == ['AAPL']
+
+    by_rsi = table.screen("rsi < 60 and cap > 1b", sort_by='rsi', ascending=False, top_k=2)
+    assert list(by_rsi.index) == ['MSFT', 'INTC']
+
+    assert list(table.screen("not (rsi < 30) or price / sma_200 > 1.05").index) == ['AAPL', 'MSFT']
+
+
+def test_invalid_expressions_raise_value_error():
+    for expression in ["rsi <", "unknown > 1", "(rsi > 1", "rsi ? 2"]:
+        with pytest.raises(ValueError):
+            compile_expression(expression)
+
+
+def test_incremental_indicators_match_full_recompute():
+    closes = 100 + np.cumsum(np.random.default_rng(7).normal(size=300))
+    expected = StockDataFetcher()._calculate_technical_indicators(pd.DataFrame({'Close': closes}))
+
+    incremental = IncrementalIndicators(closes[:250])
+    for close in closes[250:]:
+        incremental.push(close)
+    values = incremental.values()
+
+    for key in ('sma_20', 'sma_50', 'sma_200', 'rsi', 'macd', 'bollinger_upper', 'bollinger_lower'):
+        assert values[key] == pytest.approx(expected[key], abs=0.011)
+
+
+if __name__ == "__main__":
+    test_screen_filters_sorts_and_limits()
+    test_invalid_expressions_raise_value_error()
+    test_incremental_indicators_match_full_recompute()
+    print("✅ Screener tests passed")
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+
+import threading
+import time
+
+from singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_fetch():
+    flights = SingleFlight()
+    calls = []
+
+    def slow_fetch(symbol):
+        calls.append(symbol)
+        time.sleep(0.2)
+        return {'symbol': symbol}
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(flights.do(('AAPL', '1y'), slow_fetch, 'AAPL')))
+        for _ in range(10)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == ['AAPL']
+    assert len(results) == 10
+    assert all(result is results[0] for result in results)
+    assert not flights.in_flight(('AAPL', '1y'))
+
+
+def test_errors_are_shared_and_key_is_released():
+    flights = SingleFlight()
+    started = threading.Event()
+
+    def failing_fetch():
+        started.set()
+        time.sleep(0.1)
+        raise RuntimeError("provider down")
+
+    errors = []
+
+    def call():
+        try:
+            flights.do('news', failing_fetch)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait()
+    follower = threading.Thread(target=call)
+    follower.start()
+    leader.join()
+    follower.join()
+
+    assert errors == ['provider down', 'provider down']
+    assert flights.do('news', lambda: 'fresh') == 'fresh'
+
+
+if __name__ == "__main__":
+    test_concurrent_calls_share_one_fetch()
+    test_errors_are_shared_and_key_is_released()
+    print("✅ SingleFlight tests passed")
@@ -1,6 +1,15 @@
 #!/usr/bin/env python3
 
-from stock_data import StockDataFetcher
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import numpy as np
+import pandas as pd
+
+import stock_data
+from stock_data import StockDataFetcher, _backoff_delay, _parse_retry_after
 
 def test_stock_data():
     fetcher = StockDataFetcher()
@@ -15,12 +24,141 @@ def test_stock_data():
         print(f"   价格变化: ${data['price_change']} ({data['price_change_pct']:.2f}%)")
         print(f"   52周高: ${data['high_52w']}")
         print(f"   52周低: ${data['low_52w']}")
-        print(f"   市值: {data['market_cap']}")
+        print(f"   市值: {data.market_cap_display}")
         print(f"   成交量: {data['volume']:,}")
         return True
     else:
         print("❌ 获取GOOGL数据失败")
         return False
 
+def test_shorter_periods_slice_the_longest_history():
+    fetcher = StockDataFetcher()
+    fetched = []
+
+    def fetch(symbol, period, max_retries, deadline=None):
+        fetched.append(period)
+        return fetcher._create_improved_mock_data(symbol).copy(source='yfinance')
+
+    fetcher._fetch_from_sources = fetch
+
+    full = fetcher.get_stock_data('PERIODTEST', period='1y', budget=None)
+    five_days = fetcher.get_stock_data('PERIODTEST', period='5d', budget=None)
+    month = fetcher.get_stock_data('PERIODTEST', period='1mo', budget=None)
+    assert fetched == ['1y'] and not five_days.stale
+
+    history = full.price_history
+    assert len(five_days.price_history) == 5
+    assert five_days.price_history.index[-1] == history.index[-1]
+    assert np.shares_memory(five_days.price_history['Close'].to_numpy(), history['Close'].to_numpy())
+    assert five_days.indicator_series.index.equals(five_days.price_history.index)
+    assert 28 <= len(month.price_history) <= 31
+    assert five_days.current_price == full.current_price
+
+    # A span beyond the cached history is fetched with the requested period
+    fetcher.get_stock_data('PERIODTEST', period='2y', budget=None)
+    fetcher.get_stock_data('PERIODTEST', period='1y', budget=None)
+    assert fetched == ['1y', '2y']
+
+    # An old covering history is served stale while it refreshes in the background
+    stock_data._last_good[('PERIODTEST', '2y')].fetched_at -= stock_data.PERIOD_SLICE_MAX_AGE + 1
+    assert fetcher.get_stock_data('PERIODTEST', period='5d', budget=None).stale
+    waited = 0
+    while len(fetched) < 3 and waited < 500:
+        time.sleep(0.01)
+        waited += 1
+    assert fetched == ['1y', '2y', '2y']
+
+
+def test_mock_results_do_not_cover_shorter_periods():
+    fetcher = StockDataFetcher()
+    fetched = []
+
+    def fetch_mock(symbol, period, max_retries, deadline=None):
+        fetched.append(period)
+        return fetcher._create_improved_mock_data(symbol)
+
+    fetcher._fetch_from_sources = fetch_mock
+    fetcher.get_stock_data('MOCKPERIOD', period='1y', budget=None)
+    fetcher.get_stock_data('MOCKPERIOD', period='5d', budget=None)
+    assert fetched == ['1y', '5d'] and 'MOCKPERIOD' not in stock_data._longest_period
+    # Simulated prices never reach the shared screener table
+    assert 'MOCKPERIOD' not in fetcher.indicator_table
+
+
+def test_mock_data_never_replaces_stored_history():
+    fetcher = StockDataFetcher()
+    real = fetcher.history_store.put(
+        'MOCKTEST', pd.bdate_range('2024-01-01', periods=30),
+        np.full(30, 10.0), np.full(30, 11.0), np.full(30, 9.0), np.arange(30.0), np.full(30, 1000)
+    )
+
+    mock = fetcher._create_improved_mock_data('MOCKTEST')
+    simulated = fetcher._create_simple_hist_data('MOCKTEST', 123.0)
+
+    stored = fetcher.history_store.get('MOCKTEST')
+    assert stored.equals(real)
+    assert not np.shares_memory(mock.price_history['Close'].to_numpy(), stored['Close'].to_numpy())
+    assert len(simulated) == 252 and (simulated['Close'] == 123.0).all()
+    assert list(mock.price_history.columns) == list(stored.columns)
+
+
+def test_parse_retry_after():
+    assert _parse_retry_after('120') == 120.0
+    assert _parse_retry_after('-5') == 0.0
+    assert _parse_retry_after(None) is None
+    assert _parse_retry_after('soon') is None
+    when = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=90), usegmt=True)
+    assert 80 <= _parse_retry_after(when) <= 90
+    past = format_datetime(datetime.now(timezone.utc) - timedelta(hours=1), usegmt=True)
+    assert _parse_retry_after(past) == 0.0
+
+
+def test_backoff_delay_is_full_jitter_and_capped():
+    for attempt in range(12):
+        cap = min(stock_data.FETCH_BACKOFF_MAX, stock_data.FETCH_BACKOFF_BASE * 2 ** attempt)
+        delays = [_backoff_delay(attempt) for _ in range(200)]
+        assert all(0 <= delay <= cap for delay in delays)
+        assert len(set(delays)) > 1
+    assert max(_backoff_delay(50) for _ in range(200)) <= stock_data.FETCH_BACKOFF_MAX
+
+
+def test_budget_timeout_serves_cache_and_never_touches_store():
+    fetcher = StockDataFetcher()
+    fetcher.arrow_store = None
+    release = threading.Event()
+    live = {'blocking': False}
+
+    def fetch(symbol, period, max_retries, deadline=None):
+        if live['blocking']:
+            release.wait(5)
+        return fetcher._create_improved_mock_data(symbol).copy(source='yfinance')
+
+    fetcher._fetch_from_sources = fetch
+    fresh = fetcher.get_stock_data('BUDGETTEST', budget=None)
+    assert not fresh.stale
+
+    live['blocking'] = True
+    stale = fetcher.get_stock_data('BUDGETTEST', budget=0.05)
+    assert stale.stale and stale.current_price == fresh.current_price
+
+    # No cached snapshot: a mock snapshot is returned without writing the shared store
+    mock = fetcher.get_stock_data('BUDGETNEW', budget=0.05)
+    assert mock.source == 'mock'
+    assert fetcher.history_store.get('BUDGETNEW') is None
+
+    # The refresh keeps running in the background and later calls share it
+    refresh = fetcher._refresh('BUDGETTEST', '1y', 3)
+    release.set()
+    refreshed = refresh.result(timeout=5)
+    assert not refreshed.stale and refreshed.fetched_at > fresh.fetched_at
+    fetcher._refresh('BUDGETNEW', '1y', 3).result(timeout=5)
+
+
 if __name__ == "__main__":
     test_stock_data()
+    test_shorter_periods_slice_the_longest_history()
+    test_mock_results_do_not_cover_shorter_periods()
+    test_mock_data_never_replaces_stored_history()
+    test_parse_retry_after()
+    test_backoff_delay_is_full_jitter_and_capped()
+    test_budget_timeout_serves_cache_and_never_touches_store()